@@ -1,12 +1,18 @@
 """Meet core API endpoints"""
 
+import hashlib
+from functools import lru_cache
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
 
 from rest_framework import exceptions as drf_exceptions
 from rest_framework import views as drf_views
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 
 
 def exception_handler(exc, context):
@@ -31,10 +37,12 @@ def exception_handler(exc, context):
     return drf_views.exception_handler(exc, context)
 
 
-# pylint: disable=unused-argument
-@api_view(["GET"])
-def get_frontend_configuration(request):
-    """Returns the frontend configuration dict as configured in settings."""
+@lru_cache(maxsize=1)
+def get_frontend_configuration_content():
+    """Serialize the frontend configuration, which only depends on settings.
+
+    It is serialized once per process, along with its strong ETag.
+    """
     frontend_configuration = {
         "LANGUAGE_CODE": settings.LANGUAGE_CODE,
         "recording": {
@@ -57,4 +65,24 @@ def get_frontend_configuration(request):
         },
     }
     frontend_configuration.update(settings.FRONTEND_CONFIGURATION)
-    return Response(frontend_configuration)
+    content = JSONRenderer().render(frontend_configuration)
+    return content, quote_etag(hashlib.sha256(content).hexdigest())
+
+
+@require_safe
+def get_frontend_configuration(request):
+    """Returns the frontend configuration dict as configured in settings.
+
+    The configuration is fetched on each page load, and is the same for all users
+    until the next deployment. It is served without going through DRF, and can be
+    cached by browsers and CDNs, then revalidated with its ETag.
+    """
+    content, etag = get_frontend_configuration_content()
+    # The content is already serialized, JsonResponse would serialize it again
+    response = HttpResponse(content, content_type="application/json")  # pylint: disable=http-response-with-content-type-json
+    response.headers["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.FRONTEND_CONFIGURATION_MAX_AGE
+    )
+    # Return a 304 response, with the same cache headers, if the ETag matches
+    return get_conditional_response(request, etag=etag, response=response)
@@ -0,0 +1,136 @@
+"""Pagination of the Meet core API."""
+
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+
+from rest_framework import exceptions as drf_exceptions
+from rest_framework import pagination
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """Cursor pagination on the `(created_at, id)` keyset, newest objects first.
+
+    Pages are selected with a range condition matching a composite index instead of
+    an offset, and objects are never counted, so that response time does not depend
+    on the depth of the page nor on the total number of objects.
+    """
+
+    ordering = ("-created_at", "-id")
+    max_page_size = 100
+    page_size_query_param = "page_size"
+
+    def __init__(self):
+        self.next_position = None
+        self.previous_position = None
+
+    @staticmethod
+    def _encode_position(instance):
+        """Encode the keyset of an object as a cursor position."""
+        return f"{instance.created_at.isoformat():s}|{instance.pk!s}"
+
+    def _decode_position(self, position):
+        """Decode a cursor position into a creation date and a primary key."""
+        try:
+            created_at, pk = position.split("|")
+            return datetime.fromisoformat(created_at), uuid.UUID(pk)
+        except ValueError as exc:
+            raise drf_exceptions.NotFound(self.invalid_cursor_message) from exc
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Fetch one more object than the page size to know if there is a next page."""
+        # pylint: disable=attribute-defined-outside-init
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        if position is not None:
+            created_at, pk = self._decode_position(position)
+            # The redundant bound on "created_at" lets Postgres scan the index range
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(pk__gt=pk),
+                    created_at__gte=created_at,
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(pk__lt=pk),
+                    created_at__lte=created_at,
+                )
+
+        ordering = ("created_at", "id") if reverse else self.ordering
+        results = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        if self.page and has_next:
+            self.next_position = self._encode_position(self.page[-1])
+        if self.page and has_previous:
+            self.previous_position = self._encode_position(self.page[0])
+
+        return self.page
+
+    def get_next_link(self):
+        """Return the link to the page of older objects, if any."""
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        """Return the link to the page of newer objects, if any."""
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
+
+
+class Pagination(pagination.PageNumberPagination):
+    """Pagination to display no more than 100 objects per page.
+
+    Pages are numbered by default. Passing a `cursor` query parameter, empty to get
+    the first page, switches to keyset pagination sorted by creation date, which is
+    recommended to browse large collections.
+    """
+
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_pagination_class = KeysetPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate with a cursor when one is given, with page numbers otherwise."""
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        """Return the response matching the pagination mode used."""
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        """Document the cursor query parameter along with page numbers."""
+        cursor_paginator = self.cursor_pagination_class()
+        return super().get_schema_operation_parameters(view) + [
+            parameter
+            for parameter in cursor_paginator.get_schema_operation_parameters(view)
+            if parameter["name"] == cursor_paginator.cursor_query_param
+        ]
@@ -2,6 +2,7 @@
 
 import uuid
 
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
@@ -10,6 +11,9 @@ from timezone_field.rest_framework import TimeZoneSerializerField
 
 from core import models, utils
 
+# Maximum number of accesses that can be upserted or deleted in a single request
+BULK_ACCESSES_MAX_SIZE = 1000
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Serialize users."""
@@ -87,6 +91,90 @@ class ResourceAccessSerializer(
         return super().update(instance, validated_data)
 
 
+class BulkResourceAccessItemSerializer(serializers.Serializer):
+    """Validate the role of a user in a bulk update of resource accesses."""
+
+    user = serializers.UUIDField()
+    role = serializers.ChoiceField(choices=models.RoleChoices.choices)
+
+    def create(self, validated_data):
+        """Not implemented as this is a validation-only serializer."""
+        raise NotImplementedError("BulkResourceAccessItemSerializer is validation-only")
+
+    def update(self, instance, validated_data):
+        """Not implemented as this is a validation-only serializer."""
+        raise NotImplementedError("BulkResourceAccessItemSerializer is validation-only")
+
+
+class BulkResourceAccessSerializer(
+    ResourceAccessSerializerMixin, serializers.Serializer
+):
+    """Validate a bulk update of the accesses of a resource."""
+
+    resource = serializers.PrimaryKeyRelatedField(
+        queryset=models.Resource.objects.all()
+    )
+    accesses = BulkResourceAccessItemSerializer(
+        many=True, required=False, default=list, max_length=BULK_ACCESSES_MAX_SIZE
+    )
+    deleted_users = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        default=list,
+        max_length=BULK_ACCESSES_MAX_SIZE,
+    )
+
+    def validate(self, data):
+        """
+        Check each user appears once and exists, with a single query for all users.
+        Rights on the accesses are checked when applying them, under lock.
+        """
+        user_ids = [access["user"] for access in data["accesses"]]
+        deleted_users = data["deleted_users"]
+
+        if not user_ids and not deleted_users:
+            raise serializers.ValidationError("No access to update or delete.")
+
+        if len(set(user_ids)) != len(user_ids):
+            raise serializers.ValidationError(
+                {"accesses": "Each user can only appear once."}
+            )
+
+        if len(set(deleted_users)) != len(deleted_users) or set(
+            deleted_users
+        ).intersection(user_ids):
+            raise serializers.ValidationError(
+                {"deleted_users": "Each user can only appear once."}
+            )
+
+        unknown_users = set(user_ids).difference(
+            models.User.objects.filter(id__in=user_ids).values_list("id", flat=True)
+        )
+        if unknown_users:
+            raise serializers.ValidationError(
+                {
+                    "accesses": [
+                        f"User {user_id!s} does not exist."
+                        for user_id in sorted(unknown_users)
+                    ]
+                }
+            )
+
+        return {
+            "resource": data["resource"],
+            "accesses": {access["user"]: access["role"] for access in data["accesses"]},
+            "deleted_users": deleted_users,
+        }
+
+    def create(self, validated_data):
+        """Not implemented as this is a validation-only serializer."""
+        raise NotImplementedError("BulkResourceAccessSerializer is validation-only")
+
+    def update(self, instance, validated_data):
+        """Not implemented as this is a validation-only serializer."""
+        raise NotImplementedError("BulkResourceAccessSerializer is validation-only")
+
+
 class NestedResourceAccessSerializer(ResourceAccessSerializer):
     """Serialize Room accesses for the API with full nested user."""
 
@@ -102,6 +190,37 @@ class ListRoomSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "slug"]
 
 
+class UserRoomSerializer(ListRoomSerializer):
+    """
+    Serialize the rooms of the logged-in user for the list API endpoint.
+
+    The user's role must be annotated on each room as "user_role". Unlike the detail
+    serializer, accesses and LiveKit credentials are not included, to keep the cost
+    of a page independent of the number of rooms.
+    """
+
+    class Meta:
+        model = models.Room
+        fields = ["id", "name", "slug", "configuration", "access_level", "pin_code"]
+        read_only_fields = ["id", "slug", "pin_code"]
+
+    def to_representation(self, instance):
+        """Add the configuration and the "is_administrable" flag from the role."""
+        output = super().to_representation(instance)
+
+        role = instance.user_role
+        is_admin_or_owner = models.RoleChoices.check_administrator_role(
+            role
+        ) or models.RoleChoices.check_owner_role(role)
+
+        if not is_admin_or_owner:
+            del output["configuration"]
+
+        output["is_administrable"] = is_admin_or_owner
+
+        return output
+
+
 class RoomSerializer(serializers.ModelSerializer):
     """Serialize Room model for the API."""
 
@@ -128,7 +247,7 @@ class RoomSerializer(serializers.ModelSerializer):
 
         if is_admin_or_owner:
             access_serializer = NestedResourceAccessSerializer(
-                instance.accesses.select_related("resource", "user").all(),
+                instance.accesses.select_related("user"),
                 context=self.context,
                 many=True,
             )
@@ -137,16 +256,7 @@ class RoomSerializer(serializers.ModelSerializer):
         if not is_admin_or_owner:
             del output["configuration"]
 
-        should_access_room = (
-            (
-                instance.access_level == models.RoomAccessLevel.TRUSTED
-                and request.user.is_authenticated
-            )
-            or role is not None
-            or instance.is_public
-        )
-
-        if should_access_room:
+        if instance.can_join(request.user):
             room_id = f"{instance.id!s}"
             username = request.query_params.get("username", None)
             output["livekit"] = utils.generate_livekit_config(
@@ -242,6 +352,30 @@ class CreationCallbackSerializer(serializers.Serializer):
     """Validate room creation callback data."""
 
     callback_id = serializers.CharField(required=True)
+    wait = serializers.IntegerField(
+        required=False,
+        default=0,
+        min_value=0,
+        help_text=(
+            "Seconds to wait for the room to be created, if it is not yet. "
+            "Authenticated users only."
+        ),
+    )
+
+    def validate_wait(self, value):
+        """Cap the duration requests may be held waiting for the room.
+
+        Waiting holds a worker and a Redis connection, so it is reserved to
+        authenticated users: anonymous clients poll instead.
+        """
+        if not value:
+            return 0
+        request = self.context.get("request")
+        if request is None or not request.user.is_authenticated:
+            raise serializers.ValidationError(
+                "Authentication is required to wait for the room."
+            )
+        return min(value, settings.ROOM_CREATION_CALLBACK_MAX_WAIT)
 
     def create(self, validated_data):
         """Not implemented as this is a validation-only serializer."""
@@ -0,0 +1,99 @@
+"""Throttling of the Meet core API."""
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from django_redis import get_redis_connection
+from rest_framework import throttling
+
+# Generic cell rate algorithm: the key holds the theoretical arrival time of the next
+# request, pushed back by one emission interval by each allowed request. A request is
+# allowed unless it pushes it back beyond one period from now, so that bursts of up
+# to the number of requests of the rate are allowed, then one request per interval.
+# Times are integers in milliseconds, returns the time to wait before retrying.
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call("GET", KEYS[1]) or now), now)
+local new_tat = tat + interval
+if new_tat - now > period then
+    return new_tat - period - now
+end
+redis.call("SET", KEYS[1], new_tat, "PX", new_tat - now)
+return 0
+"""
+
+
+@lru_cache(maxsize=1)
+def get_gcra_script():
+    """Register the GCRA script, which is then called by its SHA1 digest."""
+    return get_redis_connection("default").register_script(GCRA_SCRIPT)
+
+
+class GCRAAnonRateThrottle(throttling.AnonRateThrottle):
+    """Throttle anonymous users with the generic cell rate algorithm, in Redis.
+
+    DRF throttles store the timestamps of all requests in the window of each client,
+    and rewrite the whole list on each request. Here, each request runs a single
+    script storing one timestamp, whatever the rate. Rates are set by scope, like DRF
+    throttles, and requests may be throttled per room and client if `per_room` is set.
+    """
+
+    per_room = False
+
+    def __init__(self):
+        super().__init__()
+        self.key = None
+        self.retry_after = None
+
+    def get_cache_key(self, request, view):
+        """Return the key of the client, and of the room if throttled per room."""
+        key = super().get_cache_key(request, view)
+        if key is None or not self.per_room:
+            return key
+        room = view.kwargs.get(view.lookup_url_kwarg or view.lookup_field)
+        return f"{key:s}_{room!s}"
+
+    def allow_request(self, request, view):
+        """Count the request and return whether it is allowed."""
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        period = self.duration * 1000
+        interval = max(period // self.num_requests, 1)
+        wait = get_gcra_script()(
+            keys=[cache.make_key(self.key)],
+            args=[int(self.timer() * 1000), interval, period],
+        )
+        if wait:
+            self.retry_after = wait / 1000
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        """Return the number of seconds to wait before the next allowed request."""
+        return self.retry_after
+
+
+class RequestEntryAnonRateThrottle(GCRAAnonRateThrottle):
+    """Throttle Anonymous user requesting room entry"""
+
+    scope = "request_entry"
+
+    @property
+    def per_room(self):
+        """Throttle requests per room if configured, not only per client."""
+        return settings.REQUEST_ENTRY_THROTTLE_PER_ROOM
+
+
+class CreationCallbackAnonRateThrottle(GCRAAnonRateThrottle):
+    """Throttle Anonymous user requesting room generation callback"""
+
+    scope = "creation_callback"
@@ -5,12 +5,15 @@ from logging import getLogger
 from urllib.parse import urlparse
 
 from django.conf import settings
-from django.db.models import Q
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.search import TrigramWordDistance, TrigramWordSimilarity
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Collate, Greatest, Upper
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.text import slugify
 
-from rest_framework import decorators, mixins, pagination, throttling, viewsets
+from rest_framework import decorators, mixins, viewsets
 from rest_framework import (
     exceptions as drf_exceptions,
 )
@@ -31,6 +34,7 @@ from core.recording.event.exceptions import (
 )
 from core.recording.event.notification import notification_service
 from core.recording.event.parsers import get_parser
+from core.recording.services.media_auth import MediaAuthCache
 from core.recording.worker.exceptions import (
     RecordingStartError,
     RecordingStopError,
@@ -50,14 +54,21 @@ from core.services.lobby import (
     LobbyParticipantNotFound,
     LobbyService,
 )
+from core.services.resource_accesses import ResourceAccessService
 from core.services.room_creation import RoomCreation
+from core.services.unregistered_rooms import UnregisteredRoomsCache
 
 from . import permissions, serializers
+from .pagination import Pagination
+from .throttling import CreationCallbackAnonRateThrottle, RequestEntryAnonRateThrottle
 
 # pylint: disable=too-many-ancestors
 
 logger = getLogger(__name__)
 
+# Queries shorter than a trigram are searched by prefix
+USER_SEARCH_TRIGRAM_MIN_LENGTH = 3
+
 
 class NestedGenericViewSet(viewsets.GenericViewSet):
     """
@@ -131,14 +142,6 @@ class SerializerPerActionMixin:
         return self.serializer_classes.get(self.action, self.default_serializer_class)
 
 
-class Pagination(pagination.PageNumberPagination):
-    """Pagination to display no more than 100 objects per page sorted by creation date."""
-
-    ordering = "-created_on"
-    max_page_size = 100
-    page_size_query_param = "page_size"
-
-
 class UserViewSet(
     mixins.UpdateModelMixin, viewsets.GenericViewSet, mixins.ListModelMixin
 ):
@@ -150,10 +153,12 @@ class UserViewSet(
 
     def get_queryset(self):
         """
-        Limit listed users by querying the email field with a trigram similarity
-        search if a query is provided.
-        Limit listed users by excluding users already in the document if a document_id
-        is provided.
+        Limit listed users by searching their email and full name if a query is
+        provided, with a number of results capped to USER_SEARCH_MAX_RESULTS.
+
+        Queries too short to hold a trigram are matched as case insensitive prefixes.
+        Longer queries are matched with a trigram word similarity search and ranked
+        by similarity. Both are served by dedicated indexes on users.
         """
         queryset = self.queryset
 
@@ -161,12 +166,59 @@ class UserViewSet(
             if not settings.ALLOW_UNSECURE_USER_LISTING:
                 return models.User.objects.none()
 
-            # Filter users by email similarity
-            if query := self.request.GET.get("q", ""):
-                queryset = queryset.filter(email__trigram_word_similar=query)
+            if query := self.request.GET.get("q", "").strip():
+                queryset = self._search(queryset, query)
 
         return queryset
 
+    @staticmethod
+    def _search(queryset, query):
+        """Filter and rank users matching a search query."""
+        max_results = settings.USER_SEARCH_MAX_RESULTS
+
+        if len(query) < USER_SEARCH_TRIGRAM_MIN_LENGTH:
+            # Each branch is an ordered range scan on its index, stopped at the cap
+            prefix = query.upper()
+            email_matches = (
+                queryset.alias(email_key=Collate(Upper("email"), "C"))
+                .filter(email_key__startswith=prefix)
+                .order_by("email_key")
+                .values("pk")[:max_results]
+            )
+            full_name_matches = (
+                queryset.alias(full_name_key=Collate(Upper("full_name"), "C"))
+                .filter(full_name_key__startswith=prefix)
+                .order_by("full_name_key")
+                .values("pk")[:max_results]
+            )
+            return queryset.filter(
+                pk__in=email_matches.union(full_name_matches)
+            ).order_by("email", "-created_at")[:max_results]
+
+        # Each branch is a nearest neighbor scan on its trigram index, returning the
+        # best matches of its column first, so that common terms matching a large
+        # share of users stop after the cap instead of ranking all of them.
+        email_matches = (
+            queryset.filter(email__trigram_word_similar=query)
+            .order_by(TrigramWordDistance(query, "email"))
+            .values("pk")[:max_results]
+        )
+        full_name_matches = (
+            queryset.filter(full_name__trigram_word_similar=query)
+            .order_by(TrigramWordDistance(query, "full_name"))
+            .values("pk")[:max_results]
+        )
+        return (
+            queryset.filter(pk__in=email_matches.union(full_name_matches))
+            .annotate(
+                similarity=Greatest(
+                    TrigramWordSimilarity(query, "email"),
+                    TrigramWordSimilarity(query, "full_name"),
+                )
+            )
+            .order_by("-similarity", "-created_at")[:max_results]
+        )
+
     @decorators.action(
         detail=False,
         methods=["get"],
@@ -184,19 +236,8 @@ class UserViewSet(
         )
 
 
-class RequestEntryAnonRateThrottle(throttling.AnonRateThrottle):
-    """Throttle Anonymous user requesting room entry"""
-
-    scope = "request_entry"
-
-
-class CreationCallbackAnonRateThrottle(throttling.AnonRateThrottle):
-    """Throttle Anonymous user requesting room generation callback"""
-
-    scope = "creation_callback"
-
-
 class RoomViewSet(
+    SerializerPerActionMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.UpdateModelMixin,
@@ -206,19 +247,55 @@ class RoomViewSet(
     API endpoints to access and perform actions on rooms.
     """
 
+    pagination_class = Pagination
     permission_classes = [permissions.RoomPermissions]
     queryset = models.Room.objects.all()
-    serializer_class = serializers.RoomSerializer
+    default_serializer_class = serializers.RoomSerializer
+    serializer_classes = {"list": serializers.UserRoomSerializer}
+
+    def get_queryset(self):
+        """
+        Annotate the role of the authenticated user on each room. A user has at most
+        one access per room, so the role is fetched with a subquery on this access.
+        """
+        queryset = super().get_queryset()
+        user = self.request.user
+
+        if not user.is_authenticated:
+            return queryset
+
+        user_role = models.ResourceAccess.objects.filter(
+            resource_id=OuterRef("pk"), user=user
+        ).values("role")[:1]
+        return queryset.annotate(user_role=Subquery(user_role))
 
     def get_object(self):
-        """Allow getting a room by its slug."""
+        """
+        Allow getting a room by its slug. Slugs recently found not to match any room
+        are not looked up again, and the annotated role of the authenticated user is
+        memoized on the room for permissions and serialization.
+        """
         try:
             uuid.UUID(self.kwargs["pk"])
             filter_kwargs = {"pk": self.kwargs["pk"]}
         except ValueError:
             filter_kwargs = {"slug": slugify(self.kwargs["pk"])}
+
+        unregistered_rooms = UnregisteredRoomsCache()
+        slug = filter_kwargs.get("slug")
+        if slug and unregistered_rooms.is_unregistered(slug):
+            raise Http404("No Room matches the given query.")
+
         queryset = self.filter_queryset(self.get_queryset())
-        obj = get_object_or_404(queryset, **filter_kwargs)
+        try:
+            obj = get_object_or_404(queryset, **filter_kwargs)
+        except Http404:
+            if slug:
+                unregistered_rooms.set_unregistered(slug)
+            raise
+
+        if hasattr(obj, "user_role"):
+            obj.set_role(self.request.user, obj.user_role)
         # May raise a permission denied
         self.check_object_permissions(self.request, obj)
         return obj
@@ -234,6 +311,7 @@ class RoomViewSet(
             if not settings.ALLOW_UNREGISTERED_ROOMS:
                 raise
             slug = slugify(self.kwargs["pk"])
+            utils.check_token_rate_limit(slug)
             username = request.query_params.get("username", None)
             data = {
                 "id": None,
@@ -246,17 +324,27 @@ class RoomViewSet(
                 },
             }
         else:
+            # Retrieving a room is how clients join it, with a token if allowed to
+            if instance.can_join(request.user):
+                utils.check_token_rate_limit(str(instance.id))
             data = self.get_serializer(instance).data
 
         return drf_response.Response(data)
 
     def list(self, request, *args, **kwargs):
-        """Limit listed rooms to the ones related to the authenticated user."""
+        """
+        Limit listed rooms to the ones related to the authenticated user.
+
+        Rooms are filtered with a subquery on the user's accesses rather than a join,
+        to avoid deduplicating rows.
+        """
         user = self.request.user
 
         if user.is_authenticated:
-            queryset = (
-                self.filter_queryset(self.get_queryset()).filter(users=user).distinct()
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                id__in=models.ResourceAccess.objects.filter(user=user).values(
+                    "resource_id"
+                )
             )
         else:
             queryset = self.get_queryset().none()
@@ -485,13 +573,18 @@ class RoomViewSet(
 
         Designed for interoperability across iframes, popups, and other contexts,
         even on the same domain, bypassing browser security restrictions on direct communication.
+        Authenticated clients may pass `wait` to hold the request until the room is
+        created, instead of polling repeatedly.
         """
 
-        serializer = serializers.CreationCallbackSerializer(data=request.data)
+        serializer = serializers.CreationCallbackSerializer(
+            data=request.data, context={"request": request}
+        )
         serializer.is_valid(raise_exception=True)
 
         room = RoomCreation().get_callback_state(
-            callback_id=serializer.validated_data.get("callback_id")
+            callback_id=serializer.validated_data.get("callback_id"),
+            timeout=serializer.validated_data["wait"],
         )
 
         return drf_response.Response(
@@ -553,19 +646,49 @@ class ResourceAccessViewSet(
         queryset = super().get_queryset()
 
         # Restrict access to resources the user either has explicit
-        # permissions for or administrative privileges over.
+        # permissions for or administrative privileges over. An EXISTS subquery
+        # avoids joining and deduplicating the accesses of all these resources.
         if self.action == "list":
             user = self.request.user
             queryset = queryset.filter(
-                Q(resource__accesses__user=user),
-                resource__accesses__role__in=[
-                    models.RoleChoices.ADMIN,
-                    models.RoleChoices.OWNER,
-                ],
-            ).distinct()
+                Exists(
+                    models.ResourceAccess.objects.filter(
+                        resource_id=OuterRef("resource_id"),
+                        user=user,
+                        role__in=[models.RoleChoices.ADMIN, models.RoleChoices.OWNER],
+                    )
+                )
+            )
 
         return queryset
 
+    @decorators.action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Upsert and delete many accesses of a resource at once.
+
+        Unlike the single access endpoints, rights and the "at least one owner"
+        invariant are checked once for the whole batch, and accesses are written
+        with a single upsert and a single delete, in one transaction.
+        """
+        serializer = serializers.BulkResourceAccessSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        upserted, deleted = ResourceAccessService.bulk_update(
+            user=request.user, **serializer.validated_data
+        )
+
+        return drf_response.Response(
+            {
+                "accesses": serializers.ResourceAccessSerializer(
+                    upserted, many=True
+                ).data,
+                "deleted": deleted,
+            }
+        )
+
 
 class RecordingViewSet(
     mixins.DestroyModelMixin,
@@ -583,12 +706,29 @@ class RecordingViewSet(
     serializer_class = serializers.RecordingSerializer
 
     def get_queryset(self):
-        """Restrict recordings to the user's ones."""
+        """
+        Restrict recordings to the user's ones.
+
+        The user's roles are annotated on each recording so that computing abilities
+        does not query the accesses again, and recordings are filtered with a
+        subquery rather than a join to avoid duplicated rows when a user has both
+        direct and team-based accesses.
+        """
         user = self.request.user
+        accesses = models.RecordingAccess.objects.filter_user(user)
+        user_roles = (
+            accesses.filter(recording_id=OuterRef("pk"))
+            .order_by()
+            .values("recording_id")
+            .annotate(roles=ArrayAgg("role", distinct=True))
+            .values("roles")
+        )
         return (
             super()
             .get_queryset()
-            .filter(Q(accesses__user=user) | Q(accesses__team__in=user.get_teams()))
+            .filter(id__in=accesses.values("recording_id"))
+            .select_related("room")
+            .annotate(user_roles=Subquery(user_roles))
         )
 
     @decorators.action(
@@ -690,6 +830,8 @@ class RecordingViewSet(
         the request going through thanks to the nginx.ingress.kubernetes.io/auth-response-headers
         annotation. The request will then be proxied to the object storage backend who will
         respond with the file after checking the signature included in headers.
+        Authorized decisions are cached for a short time as a video player issues
+        many range requests on the same file.
         """
 
         parsed_url = self._auth_get_original_url(request)
@@ -705,6 +847,15 @@ class RecordingViewSet(
         if extension not in [item.value for item in FileExtension]:
             raise drf_exceptions.ValidationError({"detail": "Unsupported extension."})
 
+        media_auth_cache = MediaAuthCache()
+        cache_version = media_auth_cache.get_version(recording_id)
+        cached_decision = media_auth_cache.get(recording_id, user.id, cache_version)
+
+        if cached_decision and cached_decision["extension"] == extension:
+            return drf_response.Response(
+                "authorized", headers=cached_decision["headers"], status=200
+            )
+
         try:
             recording = models.Recording.objects.get(id=recording_id)
         except models.Recording.DoesNotExist as e:
@@ -723,6 +874,13 @@ class RecordingViewSet(
             logger.debug("Recording '%s' has not been saved", recording)
             raise drf_exceptions.PermissionDenied()
 
-        request = utils.generate_s3_authorization_headers(recording.key)
+        headers = utils.generate_s3_authorization_headers(recording.key)
+
+        media_auth_cache.set(
+            recording_id,
+            user.id,
+            cache_version,
+            {"extension": extension, "headers": headers},
+        )
 
-        return drf_response.Response("authorized", headers=request.headers, status=200)
+        return drf_response.Response("authorized", headers=headers, status=200)
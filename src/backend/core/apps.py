@@ -0,0 +1,16 @@
+"""Meet core application configuration."""
+
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class CoreConfig(AppConfig):
+    """Configuration class for the Meet core app."""
+
+    name = "core"
+    verbose_name = _("Meet core application")
+
+    def ready(self):
+        """Register signal handlers."""
+        # pylint: disable=import-outside-toplevel, unused-import
+        from core import signals  # noqa: PLC0415
@@ -1,9 +1,8 @@
 """Authentication Backends for the Meet core app."""
 
-import contextlib
-
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
+from django.core.exceptions import SuspiciousOperation
+from django.db.models import Case, Q, Value, When
 from django.utils.translation import gettext_lazy as _
 
 from lasuite.oidc_login.backends import (
@@ -11,11 +10,9 @@ from lasuite.oidc_login.backends import (
 )
 
 from core.models import User
-from core.services.marketing import (
-    ContactCreationError,
-    ContactData,
-    get_marketing_service,
-)
+from core.services.marketing import ContactData, MarketingSyncService
+from core.services.teams import TeamService
+from core.tasks import sync_marketing_contacts
 
 
 class OIDCAuthenticationBackend(LaSuiteOIDCAuthenticationBackend):
@@ -55,44 +52,61 @@ class OIDCAuthenticationBackend(LaSuiteOIDCAuthenticationBackend):
         - None
 
         """
+        # Teams may have changed since the last login
+        TeamService().invalidate(user)
+
         email = claims["email"]
         if is_new_user and email and settings.SIGNUP_NEW_USER_TO_MARKETING_EMAIL:
             self.signup_to_marketing_email(email)
 
     @staticmethod
     def signup_to_marketing_email(email):
-        """Pragmatic approach to newsletter signup during authentication flow.
+        """Queue the user for newsletter signup, off the authentication flow.
 
-        Details:
-        1. Uses a very short timeout (1s) to prevent blocking the auth process
-        2. Silently fails if the marketing service is down/slow to prioritize user experience
-        3. Trade-off: May miss some signups but ensures auth flow remains fast
+        Contacts are imported by batches by a Celery worker, so that logging in
+        does not wait for the marketing service, and signups are retried later
+        instead of being lost when the service is down or slow.
+        """
+        contact_data = ContactData(email=email, attributes={"VISIO_SOURCE": ["SIGNIN"]})
+        if MarketingSyncService().enqueue(contact_data):
+            sync_marketing_contacts.apply_async(countdown=settings.MARKETING_SYNC_DELAY)
 
-        Note: For a more robust solution, consider using Async task processing (Celery/Django-Q)
+    def get_existing_user(self, sub, email):
+        """Fetch existing user by sub or email, in one query.
+
+        Emails are matched case-insensitively, using the index on upper(email).
         """
-        with contextlib.suppress(
-            ContactCreationError, ImproperlyConfigured, ImportError
-        ):
-            marketing_service = get_marketing_service()
-            contact_data = ContactData(
-                email=email, attributes={"VISIO_SOURCE": ["SIGNIN"]}
-            )
-            marketing_service.create_contact(
-                contact_data, timeout=settings.BREVO_API_TIMEOUT
+        if email and settings.OIDC_FALLBACK_TO_EMAIL_FOR_IDENTIFICATION:
+            # The user matching the sub comes first, then users matching the email
+            users = list(
+                User.objects.filter(Q(sub=sub) | Q(email__iexact=email)).order_by(
+                    Case(When(sub=sub, then=Value(0)), default=Value(1))
+                )[:2]
             )
+        else:
+            users = list(User.objects.filter(sub=sub))
 
-    def get_existing_user(self, sub, email):
-        """Fetch existing user by sub or email."""
-        try:
-            return User.objects.get(sub=sub)
-        except User.DoesNotExist:
-            if email and settings.OIDC_FALLBACK_TO_EMAIL_FOR_IDENTIFICATION:
-                try:
-                    return User.objects.get(email__iexact=email)
-                except User.DoesNotExist:
-                    pass
-                except User.MultipleObjectsReturned as e:
-                    raise SuspiciousOperation(
-                        "Multiple user accounts share a common email."
-                    ) from e
-        return None
+        if not users:
+            return None
+
+        if users[0].sub != sub and len(users) > 1:
+            raise SuspiciousOperation("Multiple user accounts share a common email.")
+        return users[0]
+
+    def update_user_if_needed(self, user, claims):
+        """Update user claims if they have changed, without writing otherwise.
+
+        Unlike the parent implementation, the user is updated by primary key and
+        the instance is kept in sync with the database.
+        """
+        updated_claims = {
+            key: value
+            for key, value in claims.items()
+            if hasattr(user, key) and value and value != getattr(user, key)
+        }
+        if not updated_claims:
+            return
+
+        User.objects.filter(pk=user.pk).update(**updated_claims)
+        for key, value in updated_claims.items():
+            setattr(user, key, value)
@@ -0,0 +1,107 @@
+"""Timing of the calls made while serving a request, by kind of call."""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import aiohttp
+from redis import Redis
+from redis.client import Pipeline
+
+_timings: ContextVar[Optional["Timings"]] = ContextVar("timings", default=None)
+
+
+class Timings:
+    """Total duration in seconds and count of the calls of each kind."""
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def add(self, name: str, duration: float) -> None:
+        """Count a call and its duration."""
+        self.durations[name] += duration
+        self.counts[name] += 1
+
+
+@contextmanager
+def collect_timings():
+    """Collect the timings of the calls made in the block, e.g. serving a request.
+
+    Timings are held by a context variable, so that they are collected in the
+    threads and event loops of async_to_sync too.
+    """
+    timings = Timings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timed(name: str):
+    """Time a call, if timings are being collected. Usable as a decorator."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def time_query(execute, sql, params, many, context):
+    """Time a database query, as a wrapper of the database connection."""
+    with timed("db"):
+        return execute(sql, params, many, context)
+
+
+async def _on_request_start(session, context, params):  # pylint: disable=unused-argument
+    """Start timing an HTTP request."""
+    context.start = time.perf_counter()
+
+
+async def _on_request_end(session, context, params):  # pylint: disable=unused-argument
+    """Count an HTTP request to LiveKit, whether it succeeded or not."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.add("livekit", time.perf_counter() - context.start)
+
+
+def get_livekit_trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config timing the requests of an HTTP session to LiveKit."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_end)
+    return trace_config
+
+
+class TimedPipeline(Pipeline):  # pylint: disable=abstract-method,too-many-ancestors
+    """Redis pipeline timing each batch of commands as a single call."""
+
+    def execute(self, raise_on_error=True):
+        """Time the commands sent at once."""
+        with timed("cache"):
+            return super().execute(raise_on_error=raise_on_error)
+
+
+class TimedRedis(Redis):  # pylint: disable=abstract-method,too-many-ancestors
+    """Redis client timing its commands, made by the default cache or directly."""
+
+    def execute_command(self, *args, **options):
+        """Time a command."""
+        with timed("cache"):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        """Return a pipeline timing its commands."""
+        return TimedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
@@ -0,0 +1,19 @@
+"""Management command to purge expired recordings."""
+
+from django.core.management.base import BaseCommand
+
+from core.recording.services.purge import RecordingPurgeService
+
+
+class Command(BaseCommand):
+    """Delete the recordings older than RECORDING_EXPIRATION_DAYS, with their files."""
+
+    help = (
+        "Delete expired recordings, their accesses and their files, e.g. from a cron "
+        "job when celery beat is not run"
+    )
+
+    def handle(self, *args, **options):
+        """Purge expired recordings by batches."""
+        purged = RecordingPurgeService().purge()
+        self.stdout.write(self.style.SUCCESS(f"{purged:d} expired recordings purged."))
@@ -0,0 +1,30 @@
+"""Management command to replay marketing contacts rejected by the marketing service."""
+
+from django.core.management.base import BaseCommand
+
+from core.services.marketing import MarketingSyncService
+from core.tasks import sync_marketing_contacts
+
+
+class Command(BaseCommand):
+    """Queue the contacts of the dead-letter list again, and sync them."""
+
+    help = (
+        "Queue marketing contacts rejected by the marketing service again, e.g. once "
+        "the cause of the rejection was fixed, and schedule their sync"
+    )
+
+    def handle(self, *args, **options):
+        """Move the dead-letter list back to the queue, then schedule a sync."""
+        replayed = MarketingSyncService().replay_dead_letter()
+        if not replayed:
+            self.stdout.write(
+                self.style.WARNING(
+                    "No contacts were queued: none were rejected, or a sync is in "
+                    "progress."
+                )
+            )
+            return
+
+        sync_marketing_contacts.delay()
+        self.stdout.write(self.style.SUCCESS(f"{replayed:d} contacts queued again."))
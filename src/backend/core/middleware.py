@@ -0,0 +1,72 @@
+"""Middlewares of the Meet core app."""
+
+import random
+import time
+from contextlib import ExitStack
+from logging import getLogger
+
+from django.conf import settings
+from django.db import connections
+
+from core.instrumentation import collect_timings, time_query
+
+logger = getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """Report where the time of sampled requests goes, by kind of call.
+
+    The duration and count of database queries, cache calls, LiveKit requests and S3
+    signatures are totaled for a sample of requests, set by SERVER_TIMING_SAMPLE_RATE,
+    and logged as structured fields. Totals are returned in the Server-Timing header,
+    shown by browsers' developer tools, to staff users only unless SERVER_TIMING_HEADER
+    is set, not to disclose the backend internals to all clients.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if not sample_rate or random.random() >= sample_rate:  # noqa: S311
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_timings() as timings, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(time_query))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        metrics = [
+            (name, timings.durations[name], timings.counts[name])
+            for name in sorted(timings.counts)
+        ]
+        user = getattr(request, "user", None)
+        if settings.SERVER_TIMING_HEADER or (user is not None and user.is_staff):
+            response.headers["Server-Timing"] = ", ".join(
+                [
+                    f'{name:s};dur={duration * 1000:.1f};desc="{count:d} calls"'
+                    for name, duration, count in metrics
+                ]
+                + [f"total;dur={total * 1000:.1f}"]
+            )
+
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+        }
+        for name, duration, count in metrics:
+            fields[f"{name:s}_ms"] = round(duration * 1000, 1)
+            fields[f"{name:s}_count"] = count
+        logger.info(
+            "%s %s served in %.1fms",
+            request.method,
+            request.path,
+            total * 1000,
+            extra=fields,
+        )
+
+        return response
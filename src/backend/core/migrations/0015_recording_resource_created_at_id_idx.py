@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:25
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built without locking the recordings and resources tables
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_room_pin_code'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='recording',
+            index=models.Index(fields=['created_at', 'id'], name='recording_created_at_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='resource',
+            index=models.Index(fields=['created_at', 'id'], name='resource_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built and dropped without locking the accesses table
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_recording_resource_created_at_id_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='resourceaccess',
+            index=models.Index(fields=['user', 'role', 'resource'], name='resource_access_user_role_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='resourceaccess',
+            index=models.Index(fields=['resource', 'role'], include=('id',), name='resource_access_role_idx'),
+        ),
+        # The foreign key indexes are prefixes of the composite indexes above
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "meet_resource_access_user_id_bd3ddee7"',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "meet_resource_access_user_id_bd3ddee7" ON "meet_resource_access" ("user_id")',
+                ),
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "meet_resource_access_resource_id_abc11f99"',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "meet_resource_access_resource_id_abc11f99" ON "meet_resource_access" ("resource_id")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='resourceaccess',
+                    name='user',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='accesses', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='resourceaccess',
+                    name='resource',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='accesses', to='core.resource'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-19 14:05
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built and dropped without locking the recordings tables
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_resourceaccess_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='recording',
+            index=models.Index(fields=['room', 'status'], name='recording_room_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recording',
+            index=models.Index(condition=models.Q(('worker_id__isnull', False)), fields=['worker_id'], name='recording_worker_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recordingaccess',
+            index=models.Index(fields=['recording', 'role'], name='recording_access_role_idx'),
+        ),
+        # The foreign key indexes are prefixes of the composite indexes above
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "meet_recording_room_id_da801198"',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "meet_recording_room_id_da801198" ON "meet_recording" ("room_id")',
+                ),
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "meet_recording_access_recording_id_33e1d77b"',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "meet_recording_access_recording_id_33e1d77b" ON "meet_recording_access" ("recording_id")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='recording',
+                    name='room',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='recordings', to='core.room', verbose_name='Room'),
+                ),
+                migrations.AlterField(
+                    model_name='recordingaccess',
+                    name='recording',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='accesses', to='core.recording'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-19 15:20
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_recording_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recording',
+            name='id',
+            field=models.UUIDField(default=core.models.uuid7, editable=False, help_text='primary key for the record as UUID', primary_key=True, serialize=False, verbose_name='id'),
+        ),
+        migrations.AlterField(
+            model_name='recordingaccess',
+            name='id',
+            field=models.UUIDField(default=core.models.uuid7, editable=False, help_text='primary key for the record as UUID', primary_key=True, serialize=False, verbose_name='id'),
+        ),
+        migrations.AlterField(
+            model_name='resource',
+            name='id',
+            field=models.UUIDField(default=core.models.uuid7, editable=False, help_text='primary key for the record as UUID', primary_key=True, serialize=False, verbose_name='id'),
+        ),
+        migrations.AlterField(
+            model_name='resourceaccess',
+            name='id',
+            field=models.UUIDField(default=core.models.uuid7, editable=False, help_text='primary key for the record as UUID', primary_key=True, serialize=False, verbose_name='id'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=core.models.uuid7, editable=False, help_text='primary key for the record as UUID', primary_key=True, serialize=False, verbose_name='id'),
+        ),
+    ]
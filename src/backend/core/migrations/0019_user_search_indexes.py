@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:02
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built without locking the users table against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0018_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['email'], name='user_email_trgm_idx', opclasses=['gist_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['full_name'], name='user_full_name_trgm_idx', opclasses=['gist_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.text.Upper('email'), 'C'), name='user_email_prefix_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.text.Upper('full_name'), 'C'), name='user_full_name_prefix_idx'),
+        ),
+    ]
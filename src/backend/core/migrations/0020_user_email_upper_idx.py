@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:40
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # The index is built without locking the users table against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0019_user_search_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='user_email_upper_idx'),
+        ),
+    ]
@@ -3,6 +3,8 @@ Declare and configure the models for the Meet core application
 """
 
 import secrets
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta
 from logging import getLogger
@@ -11,9 +13,11 @@ from typing import List, Optional
 from django.conf import settings
 from django.contrib.auth import models as auth_models
 from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.postgres.indexes import GistIndex
 from django.core import mail, validators
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import models
+from django.db.models.functions import Collate, Upper
 from django.utils import timezone
 from django.utils.text import capfirst, slugify
 from django.utils.translation import gettext_lazy as _
@@ -21,6 +25,7 @@ from django.utils.translation import gettext_lazy as _
 from timezone_field import TimeZoneField
 
 from .recording.enums import FileExtension
+from .services.teams import TeamService
 
 logger = getLogger(__name__)
 
@@ -92,6 +97,36 @@ class RoomAccessLevel(models.TextChoices):
     RESTRICTED = "restricted", _("Restricted Access")
 
 
+# Last timestamp of the ids generated by the process, kept to generate increasing ids
+_uuid7_lock = threading.Lock()
+_uuid7_last_timestamp = 0  # pylint: disable=invalid-name
+
+
+def uuid7():
+    """
+    Generate a time-ordered UUID, version 7 as defined by RFC 9562.
+
+    The 48 most significant bits hold the Unix timestamp in milliseconds and the next
+    12 bits the sub-millisecond fraction, followed by 62 random bits. The fraction is
+    used as a counter, bumped when the clock did not move since the previous id, so
+    that successive ids of a process sort in creation order. New rows are appended to
+    the right of primary key indexes instead of being inserted at random pages.
+    """
+    global _uuid7_last_timestamp  # noqa: PLW0603 # pylint: disable=global-statement
+
+    milliseconds, nanoseconds = divmod(time.time_ns(), 1_000_000)
+    timestamp = milliseconds << 12 | nanoseconds * 4096 // 1_000_000
+    with _uuid7_lock:
+        timestamp = _uuid7_last_timestamp = max(timestamp, _uuid7_last_timestamp + 1)
+    return uuid.UUID(
+        int=(timestamp >> 12 & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (timestamp & 0xFFF) << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+
+
 class BaseModel(models.Model):
     """
     Serves as an abstract base model for other models, ensuring that records are validated
@@ -104,7 +139,7 @@ class BaseModel(models.Model):
         verbose_name=_("id"),
         help_text=_("primary key for the record as UUID"),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False,
     )
     created_at = models.DateTimeField(
@@ -204,6 +239,29 @@ class User(AbstractBaseUser, BaseModel, auth_models.PermissionsMixin):
         ordering = ("-created_at",)
         verbose_name = _("user")
         verbose_name_plural = _("users")
+        indexes = [
+            # Trigram search of users by email or full name. GiST indexes return
+            # the nearest matches first, so that searches are ranked by the index.
+            GistIndex(
+                fields=["email"],
+                opclasses=["gist_trgm_ops"],
+                name="user_email_trgm_idx",
+            ),
+            GistIndex(
+                fields=["full_name"],
+                opclasses=["gist_trgm_ops"],
+                name="user_full_name_trgm_idx",
+            ),
+            # Case insensitive prefix search, for queries too short for trigrams. The
+            # "C" collation makes them usable both for prefix matches and ordering.
+            models.Index(Collate(Upper("email"), "C"), name="user_email_prefix_idx"),
+            models.Index(
+                Collate(Upper("full_name"), "C"), name="user_full_name_prefix_idx"
+            ),
+            # Case insensitive "email__iexact" lookups, e.g. to identify users by
+            # email on login
+            models.Index(Upper("email"), name="user_email_upper_idx"),
+        ]
 
     def __str__(self):
         return self.email or self.admin_email or str(self.id)
@@ -217,9 +275,9 @@ class User(AbstractBaseUser, BaseModel, auth_models.PermissionsMixin):
     def get_teams(self):
         """
         Get list of teams in which the user is, as a list of strings.
-        Must be cached if retrieved remotely.
+        Teams come from the configured team provider and are cached by the service.
         """
-        return []
+        return TeamService().get_teams(self)
 
 
 def get_resource_roles(resource: models.Model, user: User) -> List[str]:
@@ -264,6 +322,11 @@ class Resource(BaseModel):
         db_table = "meet_resource"
         verbose_name = _("Resource")
         verbose_name_plural = _("Resources")
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="resource_created_at_id_idx"
+            ),
+        ]
 
     def __str__(self):
         try:
@@ -271,6 +334,13 @@ class Resource(BaseModel):
         except AttributeError:
             return f"Resource {self.id!s}"
 
+    def set_role(self, user, role):
+        """
+        Memoize the role of a given user in this resource, e.g. from a queryset
+        annotation, so that it is not queried again while handling a request.
+        """
+        self._role_memo = (user.pk, role)  # pylint: disable=attribute-defined-outside-init
+
     def get_role(self, user):
         """
         Determine the role of a given user in this resource.
@@ -278,6 +348,10 @@ class Resource(BaseModel):
         if not user or not user.is_authenticated:
             return None
 
+        role_memo = getattr(self, "_role_memo", None)
+        if role_memo is not None and role_memo[0] == user.pk:
+            return role_memo[1]
+
         role = None
         for access in self.accesses.filter(user=user):
             if access.role == RoleChoices.OWNER:
@@ -304,12 +378,17 @@ class Resource(BaseModel):
 class ResourceAccess(BaseModel):
     """Link table between resources and users"""
 
+    # Lookups by resource are served by the composite index starting with it
     resource = models.ForeignKey(
         Resource,
         on_delete=models.CASCADE,
         related_name="accesses",
+        db_index=False,
+    )
+    # Lookups by user are served by the composite indexes starting with the user
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="accesses", db_index=False
     )
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="accesses")
     role = models.CharField(
         max_length=20, choices=RoleChoices.choices, default=RoleChoices.MEMBER
     )
@@ -319,6 +398,19 @@ class ResourceAccess(BaseModel):
         ordering = ("-created_at",)
         verbose_name = _("Resource access")
         verbose_name_plural = _("Resource accesses")
+        indexes = [
+            # Resources on which a user has a given role
+            models.Index(
+                fields=["user", "role", "resource"],
+                name="resource_access_user_role_idx",
+            ),
+            # Owners of a resource, covering for counts and primary keys
+            models.Index(
+                fields=["resource", "role"],
+                include=["id"],
+                name="resource_access_role_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user", "resource"],
@@ -431,6 +523,18 @@ class Room(Resource):
         """Check if a room is public"""
         return self.access_level == RoomAccessLevel.PUBLIC
 
+    def can_join(self, user):
+        """
+        Check if a user is given LiveKit credentials to join the room directly, without
+        waiting in the lobby: the room is public, trusted and the user authenticated,
+        or the user has a role in the room.
+        """
+        return (
+            self.is_public
+            or (self.access_level == RoomAccessLevel.TRUSTED and user.is_authenticated)
+            or self.get_role(user) is not None
+        )
+
     @staticmethod
     def generate_unique_pin_code(length):
         """Generate a unique n-digit PIN code"""
@@ -545,11 +649,13 @@ class Recording(BaseModel):
     recording state and its status in the database.
     """
 
+    # Lookups by room are served by the composite index starting with the room
     room = models.ForeignKey(
         Room,
         on_delete=models.CASCADE,
         related_name="recordings",
         verbose_name=_("Room"),
+        db_index=False,
     )
     status = models.CharField(
         max_length=50,
@@ -579,6 +685,19 @@ class Recording(BaseModel):
         ordering = ("-created_at",)
         verbose_name = _("Recording")
         verbose_name_plural = _("Recordings")
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="recording_created_at_id_idx"
+            ),
+            # Recordings of a room in a given status, e.g. the active one to stop
+            models.Index(fields=["room", "status"], name="recording_room_status_idx"),
+            # Recording of an egress, looked up by LiveKit webhooks
+            models.Index(
+                fields=["worker_id"],
+                condition=models.Q(worker_id__isnull=False),
+                name="recording_worker_id_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["room"],
@@ -677,10 +796,12 @@ class Recording(BaseModel):
 class RecordingAccess(BaseAccess):
     """Relation model to give access to a recording for a user or a team with a role."""
 
+    # Lookups by recording are served by the composite index starting with it
     recording = models.ForeignKey(
         Recording,
         on_delete=models.CASCADE,
         related_name="accesses",
+        db_index=False,
     )
 
     class Meta:
@@ -688,6 +809,12 @@ class RecordingAccess(BaseAccess):
         ordering = ("-created_at",)
         verbose_name = _("Recording/user relation")
         verbose_name_plural = _("Recording/user relations")
+        indexes = [
+            # Accesses of a recording with a given role, e.g. owners to notify
+            models.Index(
+                fields=["recording", "role"], name="recording_access_role_idx"
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user", "recording"],
@@ -1,17 +1,17 @@
 """Service to notify external services when a new recording is ready."""
 
 import logging
-import smtplib
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.utils.translation import get_language, override
 from django.utils.translation import gettext_lazy as _
 
 import requests
+from kombu.exceptions import OperationalError
 
 from core import models
+from core.services.mail import MailService
+from core.tasks import send_emails
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +38,7 @@ class NotificationService:
     @staticmethod
     def _notify_user_by_email(recording) -> bool:
         """
-        Send an email notification to recording owners when their recording is ready.
+        Queue email notifications to recording owners when their recording is ready.
 
         The email includes a direct link that redirects owners to a dedicated download
         page in the frontend where they can access their specific recording.
@@ -62,51 +62,52 @@ class NotificationService:
             "support_email": settings.EMAIL_SUPPORT_EMAIL,
             "logo_img": settings.EMAIL_LOGO_IMG,
             "domain": settings.EMAIL_DOMAIN,
-            "room_name": recording.room.name,
             "recording_expiration_days": settings.RECORDING_EXPIRATION_DAYS,
-            "link": f"{settings.SCREEN_RECORDING_BASE_URL}/{recording.id}",
         }
 
-        has_failures = False
+        messages = []
 
-        # We process emails individually rather than in batch because:
-        # 1. Each email requires personalization (timezone, language)
-        # 2. The number of recipients per recording is typically small (not thousands)
+        # Emails are rendered individually because each of them requires
+        # personalization (timezone, language), then sent as one batch
         for access in owner_accesses:
             user = access.user
             language = user.language or get_language()
             with override(language):
-                personalized_context = {
+                variables = {
+                    "room_name": recording.room.name,
+                    "link": f"{settings.SCREEN_RECORDING_BASE_URL}/{recording.id}",
                     "recording_date": recording.created_at.astimezone(
                         user.timezone
                     ).strftime("%Y-%m-%d"),
                     "recording_time": recording.created_at.astimezone(
                         user.timezone
                     ).strftime("%H:%M"),
-                    **context,
                 }
-                msg_html = render_to_string(
-                    "mail/html/screen_recording.html", personalized_context
+                msg_html = MailService.render(
+                    "mail/html/screen_recording.html", context, variables
                 )
-                msg_plain = render_to_string(
-                    "mail/text/screen_recording.txt", personalized_context
+                msg_plain = MailService.render(
+                    "mail/text/screen_recording.txt", context, variables
                 )
                 subject = str(_("Your recording is ready"))  # Force translation
 
-                try:
-                    send_mail(
-                        subject.capitalize(),
-                        msg_plain,
-                        settings.EMAIL_FROM,
-                        [user.email],
-                        html_message=msg_html,
-                        fail_silently=False,
-                    )
-                except smtplib.SMTPException as exception:
-                    logger.error("notification could not be sent: %s", exception)
-                    has_failures = True
-
-        return not has_failures
+            messages.append(
+                MailService.build_message(
+                    subject.capitalize(),
+                    msg_plain,
+                    [user.email],
+                    html_message=msg_html,
+                )
+            )
+
+        # Emails are sent by a worker, retrying them if the mail server fails
+        try:
+            send_emails.delay(messages)
+        except OperationalError as exception:
+            logger.error("notification could not be queued: %s", exception)
+            return False
+
+        return True
 
     @staticmethod
     def _notify_summary_service(recording):
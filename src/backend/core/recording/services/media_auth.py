@@ -0,0 +1,87 @@
+"""Media-auth decision cache service."""
+
+import uuid
+from typing import Optional
+
+from django.conf import settings
+
+from core.services.local_cache import local_cache
+
+
+class MediaAuthCache:
+    """Cache authorized media-auth subrequests and their signed S3 headers.
+
+    A video player issues many range requests for the same recording, each of them
+    triggering an Nginx auth subrequest. Positive decisions are cached per user and
+    recording for a short time, along with the S3 authorization headers. Denied
+    requests are never cached.
+
+    Entries are namespaced by a per-recording version so that all users' entries for
+    a recording can be invalidated at once, by dropping the version, when the
+    recording or its accesses change. Versions and decisions are kept in the process,
+    and dropped from all processes on invalidation.
+    """
+
+    @staticmethod
+    def _get_version_key(recording_id) -> str:
+        """Generate the cache key storing the current version of a recording."""
+        return f"recording-media-auth-version_{recording_id!s}"
+
+    @staticmethod
+    def _get_cache_key(recording_id, version: str, user_id) -> str:
+        """Generate the cache key storing a user's decision for a recording."""
+        return f"recording-media-auth_{recording_id!s}_{version:s}_{user_id!s}"
+
+    @property
+    def is_enabled(self) -> bool:
+        """Check if decisions should be cached."""
+        return bool(settings.RECORDING_MEDIA_AUTH_CACHE_TIMEOUT)
+
+    def get_version(self, recording_id) -> Optional[str]:
+        """Return the current version of a recording, initializing it if needed.
+
+        The version must be read before computing the decision, so that a decision
+        computed while the recording gets invalidated is stored under a stale version
+        and never served. Return None when the cache is disabled.
+        """
+        if not self.is_enabled:
+            return None
+
+        version_key = self._get_version_key(recording_id)
+        version = local_cache.get(version_key)
+
+        if version is None:
+            local_cache.add(
+                version_key,
+                uuid.uuid4().hex,
+                timeout=settings.RECORDING_MEDIA_AUTH_CACHE_TIMEOUT,
+            )
+            version = local_cache.get(version_key)
+
+        return version
+
+    def get(self, recording_id, user_id, version: str) -> Optional[dict]:
+        """Retrieve a cached decision for the given user and recording."""
+        if version is None:
+            return None
+        return local_cache.get(self._get_cache_key(recording_id, version, user_id))
+
+    def set(self, recording_id, user_id, version: str, data: dict) -> None:
+        """Cache an authorized decision for the given user and recording."""
+        if version is None:
+            return
+        local_cache.set(
+            self._get_cache_key(recording_id, version, user_id),
+            data,
+            timeout=settings.RECORDING_MEDIA_AUTH_CACHE_TIMEOUT,
+        )
+
+    def invalidate(self, recording_id) -> None:
+        """Drop all cached decisions for a recording."""
+        local_cache.delete(self._get_version_key(recording_id))
+
+    def invalidate_many(self, recording_ids) -> None:
+        """Drop all cached decisions for several recordings, e.g. purged at once."""
+        local_cache.delete_many(
+            [self._get_version_key(recording_id) for recording_id in recording_ids]
+        )
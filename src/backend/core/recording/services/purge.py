@@ -0,0 +1,129 @@
+"""Expired recordings purge service."""
+
+from datetime import timedelta
+from logging import getLogger
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import models
+from core.recording.services.media_auth import MediaAuthCache
+
+logger = getLogger(__name__)
+
+# Maximum number of keys accepted by a single S3 DeleteObjects request
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
+
+
+class RecordingPurgeService:
+    """Delete expired recordings, their accesses and their files by batches.
+
+    Expired recordings are walked in ascending (created_at, id) order, matching the
+    composite index on recordings, so that each batch is a bounded index range scan.
+    For each batch, files are deleted from the bucket with a single multi-object
+    delete request, then the rows whose file is gone are deleted with their accesses.
+
+    Rows are only deleted once their file is deleted, and deleting a missing file
+    succeeds, so an interrupted purge can safely be run again. Recordings whose file
+    could not be deleted are skipped and retried on the next run.
+
+    Rows are deleted without loading them nor sending deletion signals, which would
+    invalidate cached media-auth decisions one recording at a time: they are
+    invalidated once per batch instead.
+    """
+
+    def __init__(self, batch_size=S3_DELETE_OBJECTS_MAX_KEYS):
+        self.batch_size = min(batch_size, S3_DELETE_OBJECTS_MAX_KEYS)
+
+    @staticmethod
+    def get_cutoff():
+        """Return the creation date before which recordings are expired, if any."""
+        if not settings.RECORDING_EXPIRATION_DAYS:
+            return None
+        return timezone.now() - timedelta(days=settings.RECORDING_EXPIRATION_DAYS)
+
+    def get_batch(self, cutoff, position=None):
+        """Return the next batch of expired recordings after the given position."""
+        queryset = models.Recording.objects.filter(created_at__lt=cutoff)
+
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(id__gt=pk),
+                created_at__gte=created_at,
+            )
+
+        return list(
+            queryset.order_by("created_at", "id").only("id", "created_at", "mode")[
+                : self.batch_size
+            ]
+        )
+
+    @staticmethod
+    def delete_rows(recording_ids):
+        """Delete recordings and their accesses in bulk, then their cached decisions.
+
+        `QuerySet.delete` would load all rows to send deletion signals, as receivers
+        are connected to both models. Deleting without the collector is safe as long
+        as accesses are the only rows referencing recordings, deleted first here, and
+        media-auth invalidation the only receiver, run once for the batch instead.
+        """
+        # pylint: disable=protected-access
+        with transaction.atomic():
+            accesses = models.RecordingAccess.objects.filter(
+                recording_id__in=recording_ids
+            )
+            accesses._raw_delete(accesses.db)  # noqa: SLF001
+            recordings = models.Recording.objects.filter(id__in=recording_ids)
+            recordings._raw_delete(recordings.db)  # noqa: SLF001
+
+        MediaAuthCache().invalidate_many(recording_ids)
+
+    @staticmethod
+    def delete_files(recordings):
+        """Delete the files of recordings from the bucket, return keys that failed."""
+        response = default_storage.connection.meta.client.delete_objects(
+            Bucket=default_storage.bucket_name,
+            Delete={
+                "Objects": [{"Key": recording.key} for recording in recordings],
+                "Quiet": True,
+            },
+        )
+
+        failed_keys = set()
+        for error in response.get("Errors", []):
+            logger.error(
+                "Failed to delete recording file %s: %s",
+                error["Key"],
+                error.get("Message"),
+            )
+            failed_keys.add(error["Key"])
+
+        return failed_keys
+
+    def purge(self):
+        """Purge all expired recordings, return the number of recordings deleted."""
+        cutoff = self.get_cutoff()
+        if cutoff is None:
+            return 0
+
+        purged = 0
+        position = None
+
+        while batch := self.get_batch(cutoff, position):
+            failed_keys = self.delete_files(batch)
+            deleted_ids = [
+                recording.id for recording in batch if recording.key not in failed_keys
+            ]
+            self.delete_rows(deleted_ids)
+            purged += len(deleted_ids)
+
+            if len(batch) < self.batch_size:
+                break
+            position = (batch[-1].created_at, batch[-1].id)
+
+        logger.info("Purged %d expired recordings", purged)
+        return purged
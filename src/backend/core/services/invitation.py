@@ -1,14 +1,16 @@
 """Invitation Service."""
 
-import smtplib
 from logging import getLogger
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.utils.translation import get_language, override
 from django.utils.translation import gettext_lazy as _
 
+from kombu.exceptions import OperationalError
+
+from core.services.mail import MailService
+from core.tasks import send_emails
+
 logger = getLogger(__name__)
 
 
@@ -23,7 +25,7 @@ class InvitationService:
 
     @staticmethod
     def invite_to_room(room, sender, emails):
-        """Send invitation emails to join a room."""
+        """Queue invitation emails to join a room."""
 
         language = get_language()
 
@@ -31,29 +33,33 @@ class InvitationService:
             "brandname": settings.EMAIL_BRAND_NAME,
             "logo_img": settings.EMAIL_LOGO_IMG,
             "domain": settings.EMAIL_DOMAIN,
+        }
+        variables = {
             "room_url": f"{settings.EMAIL_APP_BASE_URL}/{room.slug}",
             "room_link": f"{settings.EMAIL_DOMAIN}/{room.slug}",
             "sender_email": sender.email,
         }
 
         with override(language):
-            msg_html = render_to_string("mail/html/invitation.html", context)
-            msg_plain = render_to_string("mail/text/invitation.txt", context)
+            msg_html = MailService.render(
+                "mail/html/invitation.html", context, variables
+            )
+            msg_plain = MailService.render(
+                "mail/text/invitation.txt", context, variables
+            )
             subject = str(
                 _(
                     f"Video call in progress: {sender.email} is waiting for you to connect"
                 )
             )  # Force translation
 
-            try:
-                send_mail(
-                    subject,
-                    msg_plain,
-                    settings.EMAIL_FROM,
-                    emails,
-                    html_message=msg_html,
-                    fail_silently=False,
-                )
-            except smtplib.SMTPException as e:
-                logger.error("invitation to %s was not sent: %s", emails, e)
-                raise InvitationError("Could not send invitation") from e
+        message = MailService.build_message(
+            subject, msg_plain, emails, html_message=msg_html
+        )
+
+        # Emails are sent by a worker, the request does not wait for the mail server
+        try:
+            send_emails.delay([message])
+        except OperationalError as e:
+            logger.error("invitation to %s was not queued: %s", emails, e)
+            raise InvitationError("Could not send invitation") from e
@@ -154,6 +154,7 @@ class LobbyService:
             else:
                 participant.status = LobbyParticipantStatus.ACCEPTED
 
+            utils.check_token_rate_limit(str(room.id))
             livekit_config = utils.generate_livekit_config(
                 room_id=str(room.id),
                 user=request.user,
@@ -172,6 +173,7 @@ class LobbyService:
 
         elif participant.status == LobbyParticipantStatus.ACCEPTED:
             # wrongly named, contains access token to join a room
+            utils.check_token_rate_limit(str(room.id))
             livekit_config = utils.generate_livekit_config(
                 room_id=str(room.id),
                 user=request.user,
@@ -0,0 +1,216 @@
+"""In-process cache service, in front of the default cache."""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from logging import getLogger
+
+from django.conf import settings
+from django.core.cache import cache
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = getLogger(__name__)
+
+# Stored in place of values missing from the default cache, which are cached too
+_MISSING = object()
+
+
+class _Listener(threading.Thread):
+    """Thread of a process dropping the keys invalidated by other processes."""
+
+    POLL_TIMEOUT = 1
+    RECONNECT_DELAY = 1
+
+    def __init__(self, owner, channel):
+        super().__init__(name="local-cache-invalidation", daemon=True)
+        self.owner = owner
+        self.channel = channel
+        self.pid = os.getpid()
+        # Identifies invalidations published by this process, not to drop them twice
+        self.sender = uuid.uuid4().hex
+        self.subscribed = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        """Drop keys published by other processes until stopped, reconnecting on errors."""
+        while not self.stopped.is_set():
+            try:
+                with get_redis_connection("default").pubsub() as pubsub:
+                    pubsub.subscribe(self.channel)
+                    while not self.stopped.is_set():
+                        self.handle(pubsub.get_message(timeout=self.POLL_TIMEOUT))
+            except RedisError as e:
+                logger.error("Lost invalidations of the local cache: %s", e)
+
+            # Invalidations may have been missed while disconnected
+            self.subscribed.clear()
+            self.owner.clear()
+            self.stopped.wait(self.RECONNECT_DELAY)
+
+    def handle(self, message):
+        """Handle a message of the channel, if any."""
+        if message is None:
+            return
+        if message["type"] == "subscribe":
+            self.subscribed.set()
+        elif message["type"] == "message":
+            data = json.loads(message["data"])
+            if data["sender"] != self.sender:
+                self.owner._evict(*data["keys"])  # noqa: SLF001 # pylint: disable=protected-access
+
+
+class LocalCache:
+    """Least recently used entries of the default cache, kept in the process.
+
+    Hot keys that rarely change are read from the default cache once, then served
+    from memory for up to LOCAL_CACHE_TIMEOUT seconds, including keys missing from
+    the default cache. Values written or deleted through this class are published on
+    a Redis channel, so that all processes drop them right away; the timeout only
+    bounds how long they may be served stale if an invalidation is lost.
+
+    Counters of hits and misses are kept per process, to tell whether keys are hot
+    enough to be worth caching.
+    """
+
+    CHANNEL = "local-cache-invalidation"
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Keys being read from the default cache, dropped when invalidated meanwhile
+        self._reads = {}
+        self._listener = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        """Check if entries should be kept in the process."""
+        return bool(settings.LOCAL_CACHE_TIMEOUT)
+
+    def get(self, key, default=None):
+        """Return a value, from the process if it was read recently."""
+        if not self.is_enabled:
+            return cache.get(key, default)
+
+        self._start_listener()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return default if entry[1] is _MISSING else entry[1]
+            self.misses += 1
+            read = self._reads[key] = object()
+
+        try:
+            value = cache.get(key, _MISSING)
+        finally:
+            with self._lock:
+                is_current = self._reads.get(key) is read
+                if is_current:
+                    del self._reads[key]
+
+        with self._lock:
+            # Values are only kept while invalidations are received
+            if is_current and self._is_subscribed():
+                self._entries[key] = (now + settings.LOCAL_CACHE_TIMEOUT, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > settings.LOCAL_CACHE_MAX_ENTRIES:
+                    self._entries.popitem(last=False)
+
+        return default if value is _MISSING else value
+
+    def set(self, key, value, timeout) -> None:
+        """Set a value in the default cache, and drop it from all processes."""
+        cache.set(key, value, timeout=timeout)
+        self._invalidate(key)
+
+    def add(self, key, value, timeout) -> bool:
+        """Add a value to the default cache, and drop it from all processes if added."""
+        added = cache.add(key, value, timeout=timeout)
+        if added:
+            self._invalidate(key)
+        return added
+
+    def delete(self, key) -> None:
+        """Delete a value from the default cache, and drop it from all processes."""
+        cache.delete(key)
+        self._invalidate(key)
+
+    def delete_many(self, keys) -> None:
+        """Delete values from the default cache, and drop them from all processes."""
+        if not keys:
+            return
+        cache.delete_many(keys)
+        self._invalidate(*keys)
+
+    def clear(self) -> None:
+        """Drop all the values kept in the process."""
+        with self._lock:
+            self._entries.clear()
+            self._reads.clear()
+
+    def _invalidate(self, *keys) -> None:
+        """Drop keys from the process, and publish them for other processes at once."""
+        self._evict(*keys)
+        if not self.is_enabled:
+            return
+        listener = self._listener
+        sender = listener.sender if self._is_listening(listener) else None
+        try:
+            get_redis_connection("default").publish(
+                cache.make_key(self.CHANNEL),
+                json.dumps({"sender": sender, "keys": keys}),
+            )
+        except RedisError as e:
+            logger.error("Could not publish the invalidation of %s: %s", keys, e)
+
+    def _evict(self, *keys) -> None:
+        """Drop keys from the process."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._reads.pop(key, None)
+
+    @staticmethod
+    def _is_listening(listener) -> bool:
+        """Check if a listener was started by this process, not a parent one."""
+        return listener is not None and listener.pid == os.getpid()
+
+    def _is_subscribed(self) -> bool:
+        """Check if invalidations are being received by this process."""
+        listener = self._listener
+        return self._is_listening(listener) and listener.subscribed.is_set()
+
+    def _start_listener(self) -> None:
+        """Start listening to invalidations, once per process, e.g. after a fork."""
+        if self._is_listening(self._listener):
+            return
+        with self._lock:
+            if self._is_listening(self._listener):
+                return
+            # Threads are not forked, but a listener of this process may be replaced
+            if self._listener is not None:
+                self._listener.stopped.set()
+            self._entries.clear()
+            self._listener = _Listener(self, cache.make_key(self.CHANNEL))
+            self._listener.start()
+
+    def stop(self) -> None:
+        """Stop listening to invalidations, and drop all the values kept."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if self._is_listening(listener):
+            listener.stopped.set()
+            listener.join()
+        self.clear()
+
+
+local_cache = LocalCache()
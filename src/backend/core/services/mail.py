@@ -0,0 +1,131 @@
+"""Outbound email service."""
+
+import re
+import smtplib
+from functools import lru_cache
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape
+from django.utils.translation import get_language
+
+logger = getLogger(__name__)
+
+# Rendered in place of variables when compiling templates, to be split on
+VARIABLE_PATTERN = re.compile(r"\x00(\w+)\x00")
+
+
+class MailDeliveryError(Exception):
+    """Raised when emails could not all be sent, keeping the unsent ones."""
+
+    def __init__(self, message, unsent):
+        super().__init__(message)
+        self.unsent = unsent
+
+    def __reduce__(self):
+        """Keep unsent emails when pickled, e.g. to store task results."""
+        return self.__class__, (*self.args, self.unsent)
+
+
+@lru_cache(maxsize=128)
+def _compile_template(
+    template_name: str,
+    language: str,  # pylint: disable=unused-argument
+    context: Tuple,
+    variables: Tuple,
+) -> List[str]:
+    """Render a template with placeholders in place of variables, and split it.
+
+    The template is rendered in the active language, which is only passed to be
+    part of the cache key. Return the static parts of the rendered template,
+    interleaved with the names of the variables to insert between them.
+    """
+    placeholders = {name: f"\x00{name:s}\x00" for name in variables}
+    rendered = render_to_string(template_name, {**dict(context), **placeholders})
+    return VARIABLE_PATTERN.split(rendered)
+
+
+class MailService:
+    """Service sending emails by batches, over a single connection.
+
+    Emails are rendered by callers in the request, then passed as plain dicts to a
+    Celery worker, which sends them without blocking the request.
+    """
+
+    @staticmethod
+    def build_message(
+        subject: str,
+        body: str,
+        recipients: List[str],
+        html_message: Optional[str] = None,
+    ) -> Dict:
+        """Return an email as a JSON serializable dict, to be queued for a worker."""
+        return {
+            "subject": subject,
+            "body": body,
+            "from_email": settings.EMAIL_FROM,
+            "to": list(recipients),
+            "html_message": html_message,
+        }
+
+    @staticmethod
+    def render(template_name: str, context: Dict, variables: Dict[str, str]) -> str:
+        """Render an email template in the active language.
+
+        Templates are compiled once per language and `context`, which holds the
+        values shared by many emails, e.g. branding. Only `variables`, the string
+        values personalized for each email, are then inserted, escaped like Django
+        templates do. Variables must therefore be rendered as is by templates,
+        without filters nor conditions on their value.
+        """
+        parts = _compile_template(
+            template_name,
+            get_language(),
+            tuple(sorted(context.items())),
+            tuple(sorted(variables)),
+        )
+        # Static parts are at even indexes, names of variables at odd indexes
+        return "".join(
+            conditional_escape(variables[part]) if i % 2 else part
+            for i, part in enumerate(parts)
+        )
+
+    @staticmethod
+    def send(messages: List[Dict]) -> int:
+        """Send emails over a single connection, opened once for the batch.
+
+        Emails are handed to the connection one at a time, so that the ones left
+        unsent are known when the mail server fails in the middle of the batch.
+
+        Returns:
+            int: Number of emails sent
+
+        Raises:
+            MailDeliveryError: If an email could not be sent, with the emails left
+            unsent, starting with the failed one
+        """
+        sent = 0
+        try:
+            with get_connection(fail_silently=False) as connection:
+                for message in messages:
+                    email = EmailMultiAlternatives(
+                        message["subject"],
+                        message["body"],
+                        message["from_email"],
+                        message["to"],
+                        connection=connection,
+                    )
+                    if message["html_message"]:
+                        email.attach_alternative(message["html_message"], "text/html")
+                    connection.send_messages([email])
+                    sent += 1
+        except (smtplib.SMTPException, OSError) as e:
+            logger.error("%d emails could not be sent: %s", len(messages) - sent, e)
+            raise MailDeliveryError(
+                "Could not send emails", unsent=messages[sent:]
+            ) from e
+
+        return sent
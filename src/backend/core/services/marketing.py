@@ -1,16 +1,20 @@
 """Marketing service in charge of pushing data for marketing automation."""
 
+import json
 import logging
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import asdict, dataclass
 from functools import lru_cache
 from typing import Dict, List, Optional, Protocol
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.module_loading import import_string
 
 import brevo_python
 import urllib3
+from django_redis import get_redis_connection
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,19 @@ class ContactCreationError(Exception):
     """Raised when the contact creation fails."""
 
 
+class ContactRejectedError(ContactCreationError):
+    """Raised when contacts are rejected by the marketing service, not worth retrying."""
+
+
+def is_rejected(err: Exception) -> bool:
+    """Check if an API error is a client error, failing again if retried.
+
+    Timeouts, rate limits and server errors are transient, so contacts are retried.
+    """
+    status = getattr(err, "status", None)
+    return status is not None and 400 <= status < 500 and status not in (408, 429)
+
+
 @dataclass
 class ContactData:
     """Contact data for marketing service integration."""
@@ -48,6 +65,23 @@ class MarketingServiceProtocol(Protocol):
             ContactCreationError: If contact creation fails
         """
 
+    def import_contacts(
+        self, contacts: List[ContactData], timeout: Optional[int] = None
+    ) -> List[dict]:
+        """Create or update many contacts at once.
+
+        Args:
+            contacts: Contacts information and attributes
+            timeout: API request timeout in seconds
+
+        Returns:
+            List[dict]: Service responses
+
+        Raises:
+            ContactRejectedError: If contacts are rejected, e.g. invalid
+            ContactCreationError: If contacts import fails otherwise
+        """
+
 
 class BrevoMarketingService:
     """Brevo marketing automation integration.
@@ -130,9 +164,204 @@ class BrevoMarketingService:
 
         return response
 
+    def import_contacts(self, contacts: List[ContactData], timeout=None) -> List[dict]:
+        """Create or update many Brevo contacts with bulk imports.
+
+        Brevo imports all contacts of a request in the same lists, so contacts are
+        grouped by lists, making one API call per group.
+
+        Args:
+            contacts: Contacts information and attributes
+            timeout: API request timeout in seconds
+
+        Returns:
+            List[dict]: Brevo API responses, one per import
+
+        Raises:
+            ContactRejectedError: If contacts are rejected by Brevo
+            ContactCreationError: If contacts import fails otherwise
+            ImproperlyConfigured: If required settings are missing
+        """
+
+        if not settings.BREVO_API_CONTACT_LIST_IDS:
+            raise ImproperlyConfigured(
+                "Default Brevo List IDs must be configured in settings."
+            )
+
+        contact_api = brevo_python.ContactsApi(self._api_client)
+
+        imports = defaultdict(list)
+        for contact_data in contacts:
+            list_ids = (
+                contact_data.list_ids or []
+            ) + settings.BREVO_API_CONTACT_LIST_IDS
+            imports[tuple(sorted(set(list_ids))), contact_data.update_enabled].append(
+                {
+                    "email": contact_data.email,
+                    "attributes": {
+                        **settings.BREVO_API_CONTACT_ATTRIBUTES,
+                        **(contact_data.attributes or {}),
+                    },
+                }
+            )
+
+        api_configurations = {}
+
+        if timeout is not None:
+            api_configurations["_request_timeout"] = timeout
+
+        responses = []
+        for (list_ids, update_enabled), json_body in imports.items():
+            request_contact_import = brevo_python.RequestContactImport(
+                json_body=json_body,
+                list_ids=list(list_ids),
+                update_existing_contacts=update_enabled,
+            )
+            try:
+                responses.append(
+                    contact_api.import_contacts(
+                        request_contact_import, **api_configurations
+                    )
+                )
+            except (
+                brevo_python.rest.ApiException,
+                urllib3.exceptions.ReadTimeoutError,
+            ) as err:
+                logger.warning("Failed to import contacts in Brevo", exc_info=True)
+                if is_rejected(err):
+                    raise ContactRejectedError(
+                        "Contacts were rejected by Brevo"
+                    ) from err
+                raise ContactCreationError(
+                    "Failed to import contacts in Brevo"
+                ) from err
+
+        return responses
+
 
 @lru_cache(maxsize=1)
 def get_marketing_service() -> MarketingServiceProtocol:
     """Return cached instance of configured marketing service."""
     marketing_service_cls = import_string(settings.MARKETING_SERVICE_CLASS)
     return marketing_service_cls()
+
+
+class MarketingSyncService:
+    """Queue contacts and sync them with the marketing service by batches.
+
+    Contacts are pushed to a Redis list, drained by a Celery worker with bulk
+    imports. They are only removed from the queue once imported, so that contacts
+    are not lost while the marketing service is down, but synced on a later run.
+    Batches rejected by the marketing service are moved to a dead-letter list, not
+    to block the contacts queued after them, and may be replayed once fixed.
+    """
+
+    # Maximum duration of a sync, after which another worker may take over
+    LOCK_TIMEOUT = 300
+
+    @staticmethod
+    def _get_cache_key(name) -> str:
+        """Generate the cache key of the queue, or of its sync state."""
+        return f"marketing-sync_{name!s}"
+
+    def _get_redis_key(self, name) -> str:
+        """Return the Redis key of a list, prefixed and versioned by the cache."""
+        return cache.make_key(self._get_cache_key(name))
+
+    def enqueue(self, contact_data: ContactData) -> bool:
+        """Queue a contact to sync with the marketing service.
+
+        Returns:
+            bool: Whether a sync should be scheduled, which is the case at most
+            once every MARKETING_SYNC_DELAY seconds, to batch contacts together.
+        """
+        get_redis_connection("default").rpush(
+            self._get_redis_key("queue"), json.dumps(asdict(contact_data))
+        )
+        return cache.add(
+            self._get_cache_key("scheduled"), 1, timeout=settings.MARKETING_SYNC_DELAY
+        )
+
+    def sync(self) -> int:
+        """Import queued contacts by batches, until the queue is empty.
+
+        Returns:
+            int: Number of contacts imported, 0 if another sync is in progress
+
+        Raises:
+            ContactRejectedError: If contacts are rejected, the rejected batch and
+            the next ones being kept in the queue
+            ContactCreationError: If contacts import fails otherwise, the failed
+            batch and the next ones being kept in the queue
+        """
+        lock_key = self._get_cache_key("lock")
+        if not cache.add(lock_key, 1, timeout=self.LOCK_TIMEOUT):
+            return 0
+
+        queue_key = self._get_redis_key("queue")
+        redis = get_redis_connection("default")
+        batch_size = settings.MARKETING_SYNC_BATCH_SIZE
+        imported = 0
+
+        try:
+            while items := redis.lrange(queue_key, 0, batch_size - 1):
+                contacts = [ContactData(**json.loads(item)) for item in items]
+                get_marketing_service().import_contacts(
+                    contacts, timeout=settings.BREVO_IMPORT_TIMEOUT
+                )
+                # Contacts are appended to the tail, the batch is still the head
+                redis.ltrim(queue_key, len(items), -1)
+                imported += len(items)
+        finally:
+            cache.delete(lock_key)
+
+        return imported
+
+    def dead_letter(self) -> int:
+        """Move the batch at the head of the queue to the dead-letter list.
+
+        Returns:
+            int: Number of contacts moved, 0 if another sync is in progress
+        """
+        moved = self._move("queue", "dead-letter", settings.MARKETING_SYNC_BATCH_SIZE)
+        if moved:
+            logger.error(
+                "Moved %d contacts rejected by the marketing service to %s",
+                moved,
+                self._get_redis_key("dead-letter"),
+            )
+        return moved
+
+    def replay_dead_letter(self) -> int:
+        """Move all the contacts of the dead-letter list back to the queue, to sync
+        them again, e.g. once they were fixed in the marketing service.
+
+        Returns:
+            int: Number of contacts moved, 0 if a sync is in progress
+        """
+        return self._move("dead-letter", "queue")
+
+    def _move(self, source, destination, count=None) -> int:
+        """Move contacts from the head of a list to the tail of another one, at once.
+
+        Lists are only changed while holding the sync lock, so that contacts being
+        imported are not moved.
+        """
+        lock_key = self._get_cache_key("lock")
+        if not cache.add(lock_key, 1, timeout=self.LOCK_TIMEOUT):
+            return 0
+
+        source_key = self._get_redis_key(source)
+        redis = get_redis_connection("default")
+
+        try:
+            items = redis.lrange(source_key, 0, -1 if count is None else count - 1)
+            if items:
+                with redis.pipeline() as pipeline:
+                    pipeline.rpush(self._get_redis_key(destination), *items)
+                    pipeline.ltrim(source_key, len(items), -1)
+                    pipeline.execute()
+        finally:
+            cache.delete(lock_key)
+
+        return len(items)
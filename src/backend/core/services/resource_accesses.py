@@ -0,0 +1,104 @@
+"""Resource accesses service."""
+
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Q
+
+from core import models
+
+
+class ResourceAccessService:
+    """Service to manage the accesses of a resource by batches."""
+
+    @staticmethod
+    def bulk_update(resource, user, accesses, deleted_users):
+        """Upsert and delete many accesses of a resource in one transaction.
+
+        `accesses` maps user ids to the role they should have on the resource and
+        `deleted_users` lists the ids of users whose access should be removed.
+
+        Rights are checked with the same rules as the single access endpoints, and
+        the "at least one owner" invariant is checked once for the whole batch
+        instead of once per access. Existing accesses of the touched users and of
+        the owners are locked, so that concurrent changes can't remove the last
+        owner behind our back.
+
+        Return the upserted accesses and the number of deleted accesses.
+        """
+        touched_users = {*accesses, *deleted_users, user.pk}
+
+        with transaction.atomic():
+            existing_roles = dict(
+                models.ResourceAccess.objects.select_for_update()
+                .filter(resource=resource)
+                .filter(Q(user_id__in=touched_users) | Q(role=models.RoleChoices.OWNER))
+                .order_by()
+                .values_list("user_id", "role")
+            )
+
+            user_role = existing_roles.get(user.pk)
+            if not (
+                models.RoleChoices.check_administrator_role(user_role)
+                or models.RoleChoices.check_owner_role(user_role)
+            ):
+                raise PermissionDenied(
+                    "You must be administrator or owner of a room to add accesses to it."
+                )
+            is_owner = models.RoleChoices.check_owner_role(user_role)
+
+            for user_id, role in accesses.items():
+                current_role = existing_roles.get(user_id)
+                if role == current_role:
+                    continue
+                if (
+                    role == models.RoleChoices.OWNER
+                    and not is_owner
+                    or current_role == models.RoleChoices.OWNER
+                    and user_id != user.pk
+                ):
+                    raise PermissionDenied(
+                        "Only owners of a room can assign other users as owners."
+                    )
+
+            for user_id in deleted_users:
+                if (
+                    existing_roles.get(user_id) == models.RoleChoices.OWNER
+                    and user_id != user.pk
+                ):
+                    raise PermissionDenied("Owners can only remove their own access.")
+
+            owners = {
+                user_id
+                for user_id, role in {**existing_roles, **accesses}.items()
+                if role == models.RoleChoices.OWNER
+            }.difference(deleted_users)
+            if not owners:
+                raise PermissionDenied("A resource should keep at least one owner.")
+
+            upserted = []
+            if accesses:
+                models.ResourceAccess.objects.bulk_create(
+                    [
+                        models.ResourceAccess(
+                            resource=resource, user_id=user_id, role=role
+                        )
+                        for user_id, role in accesses.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["user", "resource"],
+                    update_fields=["role", "updated_at"],
+                )
+                # Primary keys of conflicting rows are not returned by the upsert
+                upserted = list(
+                    models.ResourceAccess.objects.filter(
+                        resource=resource, user_id__in=accesses
+                    ).order_by("created_at", "id")
+                )
+
+            deleted = 0
+            if deleted_users:
+                deleted, _ = models.ResourceAccess.objects.filter(
+                    resource=resource, user_id__in=deleted_users
+                ).delete()
+
+        return upserted, deleted
@@ -1,8 +1,13 @@
 """Room creation service."""
 
+import json
+import time
+
 from django.conf import settings
 from django.core.cache import cache
 
+from django_redis import get_redis_connection
+
 
 class RoomCreation:
     """Room creation related methods"""
@@ -12,26 +17,60 @@ class RoomCreation:
         """Generate a standardized cache key for room creation callbacks."""
         return f"room-creation-callback_{callback_id}"
 
+    def _get_redis_key(self, callback_id):
+        """Return the Redis key of a callback, prefixed and versioned by the cache.
+
+        It is also the name of the channel the room is published on. Room data is
+        stored as JSON, directly in Redis, to be fetched and cleared atomically.
+        """
+        return cache.make_key(self._get_cache_key(callback_id))
+
     def persist_callback_state(self, callback_id: str, room) -> None:
-        """Store room data in cache using the callback ID as an identifier."""
+        """Store room data in cache using the callback ID as an identifier.
+
+        Requests waiting for the room of this callback are notified.
+        """
         data = {
             "slug": room.slug,
         }
-        cache.set(
-            self._get_cache_key(callback_id),
-            data,
-            timeout=settings.ROOM_CREATION_CALLBACK_CACHE_TIMEOUT,
+        redis = get_redis_connection("default")
+        redis_key = self._get_redis_key(callback_id)
+        redis.set(
+            redis_key,
+            json.dumps(data),
+            ex=settings.ROOM_CREATION_CALLBACK_CACHE_TIMEOUT,
         )
+        redis.publish(redis_key, "persisted")
 
-    def get_callback_state(self, callback_id: str) -> dict:
-        """Retrieve and clear cached room data for the given callback ID."""
+    def get_callback_state(self, callback_id: str, timeout: int = 0) -> dict:
+        """Retrieve and clear cached room data for the given callback ID.
 
-        cache_key = self._get_cache_key(callback_id)
-        data = cache.get(cache_key)
+        Room data is fetched and cleared atomically, so it is only returned once. If
+        it is not there yet, wait up to `timeout` seconds for it to be persisted.
+        """
+        redis = get_redis_connection("default")
+        redis_key = self._get_redis_key(callback_id)
 
-        if not data:
-            return {}
+        if not timeout:
+            return self._decode(redis.getdel(redis_key))
+
+        deadline = time.monotonic() + timeout
+        with redis.pubsub() as pubsub:
+            pubsub.subscribe(redis_key)
+            while (remaining := deadline - time.monotonic()) > 0:
+                # Fetch the room once subscribed, then each time it is published, so
+                # that a room persisted in the meantime is not missed
+                if pubsub.get_message(timeout=remaining) is None:
+                    continue
+                data = self._decode(redis.getdel(redis_key))
+                if data:
+                    return data
 
-        cache.delete(cache_key)
+        return {}
 
-        return data
+    @staticmethod
+    def _decode(value) -> dict:
+        """Decode room data fetched from Redis."""
+        if value is None:
+            return {}
+        return json.loads(value)
@@ -0,0 +1,97 @@
+"""Team membership service."""
+
+from functools import lru_cache
+from typing import List, Protocol
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from core.services.local_cache import local_cache
+
+
+class TeamProviderProtocol(Protocol):
+    """Interface for the providers of the teams a user belongs to."""
+
+    # Whether teams should be cached between requests, for remote providers
+    cache_teams: bool
+
+    def get_teams(self, user) -> List[str]:
+        """Return the teams of a user, as a list of strings."""
+
+
+class NoTeamProvider:
+    """Default provider, for deployments without team-based accesses."""
+
+    cache_teams = False
+
+    def get_teams(self, user) -> List[str]:  # pylint: disable=unused-argument
+        """Users belong to no team."""
+        return []
+
+
+class StaticTeamProvider:
+    """Provider reading the teams of users from settings, indexed by their sub.
+
+    Meant as a local stand-in for a team directory, in development and tests.
+    """
+
+    cache_teams = False
+
+    def get_teams(self, user) -> List[str]:
+        """Return the teams configured for the user."""
+        return list(settings.TEAM_PROVIDER_STATIC_TEAMS.get(user.sub, []))
+
+
+@lru_cache(maxsize=1)
+def get_team_provider() -> TeamProviderProtocol:
+    """Return cached instance of configured team provider."""
+    team_provider_cls = import_string(settings.TEAM_PROVIDER_CLASS)
+    return team_provider_cls()
+
+
+class TeamService:
+    """Resolve the teams of users through the configured provider.
+
+    Teams are memoized on the user instance, which lives for the duration of a
+    request, so that checking many accesses does not resolve them again. Teams from
+    remote providers are also cached between requests, until they expire or are
+    explicitly invalidated, for instance when the user logs in.
+    """
+
+    @staticmethod
+    def _get_cache_key(user_id) -> str:
+        """Generate the cache key of the teams of a user."""
+        return f"user-teams_{user_id!s}"
+
+    @property
+    def is_enabled(self) -> bool:
+        """Check if teams should be cached between requests."""
+        return bool(settings.TEAMS_CACHE_TIMEOUT) and get_team_provider().cache_teams
+
+    def get_teams(self, user) -> List[str]:
+        """Return the teams of a user."""
+        teams = getattr(user, "_teams_memo", None)
+        if teams is not None:
+            return teams
+
+        if self.is_enabled:
+            cache_key = self._get_cache_key(user.pk)
+            teams = local_cache.get(cache_key)
+            if teams is None:
+                teams = get_team_provider().get_teams(user)
+                local_cache.set(cache_key, teams, timeout=settings.TEAMS_CACHE_TIMEOUT)
+        else:
+            teams = get_team_provider().get_teams(user)
+
+        user._teams_memo = teams  # noqa: SLF001  # pylint: disable=protected-access
+        return teams
+
+    def invalidate(self, user) -> None:
+        """Forget the teams of a user, to resolve them again from the provider.
+
+        Teams are only cached between requests for providers asking for it, so there
+        is nothing to delete nor to publish to other processes otherwise.
+        """
+        if self.is_enabled:
+            local_cache.delete(self._get_cache_key(user.pk))
+        user.__dict__.pop("_teams_memo", None)
@@ -0,0 +1,53 @@
+"""Unregistered rooms cache service."""
+
+from django.conf import settings
+
+from core.services.local_cache import local_cache
+
+
+class UnregisteredRoomsCache:
+    """Remember slugs that do not match any room, to skip looking them up again.
+
+    Joining an unregistered room always misses the database before falling back to
+    an ad-hoc room, and so does any request on a random slug. Misses are cached for a
+    short time, and overwritten as soon as a room is saved with the slug, by a marker
+    of a registered slug. Misses are only added if the slug holds no value, so that a
+    miss read from the database before a concurrent creation cannot hide the new
+    room. Lookups are kept in the process, as most of them are for registered rooms.
+    """
+
+    @staticmethod
+    def _get_cache_key(slug: str) -> str:
+        """Generate the cache key flagging a slug as unregistered."""
+        return f"room-unregistered_{slug:s}"
+
+    @property
+    def is_enabled(self) -> bool:
+        """Check if unregistered slugs should be cached."""
+        return bool(settings.UNREGISTERED_ROOMS_CACHE_TIMEOUT)
+
+    def is_unregistered(self, slug: str) -> bool:
+        """Check if a slug is known not to match any room."""
+        if not self.is_enabled:
+            return False
+        return local_cache.get(self._get_cache_key(slug)) is True
+
+    def set_unregistered(self, slug: str) -> None:
+        """Flag a slug that did not match any room, unless a room was saved with it."""
+        if not self.is_enabled:
+            return
+        local_cache.add(
+            self._get_cache_key(slug),
+            True,
+            timeout=settings.UNREGISTERED_ROOMS_CACHE_TIMEOUT,
+        )
+
+    def invalidate(self, slug: str) -> None:
+        """Mark a slug as matching a room, replacing its flag if any."""
+        if not self.is_enabled:
+            return
+        local_cache.set(
+            self._get_cache_key(slug),
+            False,
+            timeout=settings.UNREGISTERED_ROOMS_CACHE_TIMEOUT,
+        )
@@ -0,0 +1,34 @@
+"""Signal handlers for the Meet core app."""
+
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import models
+from core.api import get_frontend_configuration_content
+from core.recording.services.media_auth import MediaAuthCache
+from core.services.unregistered_rooms import UnregisteredRoomsCache
+
+
+@receiver([post_save, post_delete], sender=models.RecordingAccess)
+def invalidate_media_auth_on_access_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop cached media-auth decisions when a recording access changes."""
+    MediaAuthCache().invalidate(instance.recording_id)
+
+
+@receiver(post_delete, sender=models.Recording)
+def invalidate_media_auth_on_recording_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop cached media-auth decisions when a recording is deleted."""
+    MediaAuthCache().invalidate(instance.id)
+
+
+@receiver(post_save, sender=models.Room)
+def invalidate_unregistered_room_on_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Forget that a slug was unregistered when a room is saved with it."""
+    UnregisteredRoomsCache().invalidate(instance.slug)
+
+
+@receiver(setting_changed)
+def clear_frontend_configuration(**kwargs):
+    """Serialize the frontend configuration again when settings change, in tests."""
+    get_frontend_configuration_content.cache_clear()
@@ -0,0 +1,56 @@
+"""Meet core celery tasks."""
+
+from django.conf import settings
+
+from celery import shared_task
+
+from core.recording.services.purge import RecordingPurgeService
+from core.services.mail import MailDeliveryError, MailService
+from core.services.marketing import (
+    ContactCreationError,
+    ContactRejectedError,
+    MarketingSyncService,
+)
+
+
+@shared_task
+def purge_expired_recordings():
+    """Purge expired recordings, meant to be scheduled periodically."""
+    return RecordingPurgeService().purge()
+
+
+@shared_task(bind=True)
+def sync_marketing_contacts(self):
+    """Import queued marketing contacts, retrying with an exponential backoff.
+
+    A batch rejected by the marketing service is set aside right away, and the
+    contacts queued after it are synced by a new task. Contacts still failing after
+    all retries, e.g. while the service is down, are kept in the queue for the next
+    sync, which is also scheduled periodically.
+    """
+    try:
+        return MarketingSyncService().sync()
+    except ContactRejectedError:
+        MarketingSyncService().dead_letter()
+        sync_marketing_contacts.apply_async(countdown=settings.MARKETING_SYNC_DELAY)
+        raise
+    except ContactCreationError as err:
+        raise self.retry(
+            exc=err,
+            countdown=settings.MARKETING_SYNC_DELAY * 2**self.request.retries,
+            max_retries=settings.MARKETING_SYNC_MAX_RETRIES,
+        ) from err
+
+
+@shared_task(bind=True)
+def send_emails(self, messages):
+    """Send emails over one connection, retrying unsent ones with a backoff."""
+    try:
+        return MailService.send(messages)
+    except MailDeliveryError as err:
+        raise self.retry(
+            args=[err.unsent],
+            exc=err,
+            countdown=settings.EMAIL_RETRY_DELAY * 2**self.request.retries,
+            max_retries=settings.EMAIL_MAX_RETRIES,
+        ) from err
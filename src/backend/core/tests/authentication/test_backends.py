@@ -5,6 +5,7 @@ from unittest import mock
 from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
 
 import pytest
+from django_redis import get_redis_connection
 
 from core import models
 from core.authentication.backends import OIDCAuthenticationBackend
@@ -228,7 +229,7 @@ def test_finds_user_by_email(django_assert_num_queries, settings):
     klass = OIDCAuthenticationBackend()
     db_user = UserFactory(email="foo@mail.com")
 
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         user = klass.get_existing_user("wrong-sub", db_user.email)
 
     assert user == db_user
@@ -241,7 +242,7 @@ def test_finds_user_case_insensitive_email(django_assert_num_queries, settings):
     klass = OIDCAuthenticationBackend()
     db_user = UserFactory(email="foo@mail.com")
 
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         user = klass.get_existing_user("wrong-sub", "FOO@MAIL.COM")
 
     assert user == db_user
@@ -258,7 +259,7 @@ def test_finds_user_multiple_users_same_email(django_assert_num_queries, setting
     UserFactory(email=email)  # Second user with same email
 
     with (
-        django_assert_num_queries(2),
+        django_assert_num_queries(1),
         pytest.raises(
             SuspiciousOperation,
             match="Multiple user accounts share a common email.",
@@ -276,12 +277,27 @@ def test_finds_user_whitespace_email(django_assert_num_queries, settings):
     klass = OIDCAuthenticationBackend()
     UserFactory(email="foo@mail.com")
 
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         user = klass.get_existing_user("wrong-sub", " foo@mail.com ")
 
     assert user is None
 
 
+def test_finds_user_by_sub_before_email(django_assert_num_queries, settings):
+    """The user matching the sub should win over users sharing its email."""
+
+    settings.OIDC_FALLBACK_TO_EMAIL_FOR_IDENTIFICATION = True
+
+    klass = OIDCAuthenticationBackend()
+    UserFactory.create_batch(2, email="foo@mail.com")
+    db_user = UserFactory(email="foo@mail.com")
+
+    with django_assert_num_queries(1):
+        user = klass.get_existing_user(db_user.sub, "FOO@mail.com")
+
+    assert user == db_user
+
+
 @pytest.mark.parametrize(
     "email",
     [
@@ -351,6 +367,8 @@ def test_authentication_getter_existing_user_change_fields(
         )
 
     assert user == authenticated_user
+    assert authenticated_user.email == email
+    assert authenticated_user.short_name == given_name
     user.refresh_from_db()
     assert user.email == email
     assert user.full_name == f"{given_name:s} {usual_name:s}"
@@ -496,39 +514,35 @@ def test_marketing_signup_existing_user(
     mock_signup.assert_not_called()
 
 
-@mock.patch("core.authentication.backends.get_marketing_service")
-def test_signup_to_marketing_email_success(mock_marketing):
-    """Test successful marketing signup."""
-
-    email = "test@example.com"
-
-    # Call the method
-    OIDCAuthenticationBackend.signup_to_marketing_email(email)
+@mock.patch("core.authentication.backends.sync_marketing_contacts")
+@mock.patch("core.authentication.backends.MarketingSyncService")
+def test_signup_to_marketing_email_success(mock_sync_service, mock_task, settings):
+    """Signups should be queued, and a sync scheduled to import them by batches."""
+    settings.MARKETING_SYNC_DELAY = 30
+    mock_enqueue = mock_sync_service.return_value.enqueue
+    mock_enqueue.return_value = True
 
-    # Verify service interaction
-    mock_service = mock_marketing.return_value
-    mock_service.create_contact.assert_called_once()
+    OIDCAuthenticationBackend.signup_to_marketing_email("test@example.com")
 
+    mock_enqueue.assert_called_once_with(
+        marketing.ContactData(
+            email="test@example.com", attributes={"VISIO_SOURCE": ["SIGNIN"]}
+        )
+    )
+    mock_task.apply_async.assert_called_once_with(countdown=30)
 
-@pytest.mark.parametrize(
-    "error",
-    [
-        ImportError,
-        ImproperlyConfigured,
-    ],
-)
-@mock.patch("core.authentication.backends.get_marketing_service")
-def test_marketing_signup_handles_service_initialization_errors(
-    mock_marketing, error, settings
-):
-    """Tests errors that occur when trying to get/initialize the marketing service."""
-    settings.SIGNUP_NEW_USER_TO_MARKETING_EMAIL = True
 
-    mock_marketing.side_effect = error
+@mock.patch("core.authentication.backends.sync_marketing_contacts")
+@mock.patch("core.authentication.backends.MarketingSyncService")
+def test_signup_to_marketing_email_sync_already_scheduled(mock_sync_service, mock_task):
+    """No sync should be scheduled if one already is."""
+    mock_sync_service.return_value.enqueue.return_value = False
 
-    # Should not raise any exception
     OIDCAuthenticationBackend.signup_to_marketing_email("test@example.com")
 
+    mock_sync_service.return_value.enqueue.assert_called_once()
+    mock_task.apply_async.assert_not_called()
+
 
 @pytest.mark.parametrize(
     "error",
@@ -538,14 +552,32 @@ def test_marketing_signup_handles_service_initialization_errors(
         ImportError,
     ],
 )
-@mock.patch("core.authentication.backends.get_marketing_service")
-def test_marketing_signup_handles_contact_creation_errors(
-    mock_marketing, error, settings
-):
-    """Tests errors that occur during the contact creation process."""
-
-    settings.SIGNUP_NEW_USER_TO_MARKETING_EMAIL = True
-    mock_marketing.return_value.create_contact.side_effect = error
+@mock.patch("core.services.marketing.get_marketing_service")
+def test_marketing_signup_handles_marketing_service_errors(mock_marketing, error):
+    """Errors of the marketing service should not reach the authentication flow."""
+    mock_marketing.side_effect = error
 
-    # Should not raise any exception
+    # Should not raise any exception, the sync task runs eagerly in tests
     OIDCAuthenticationBackend.signup_to_marketing_email("test@example.com")
+
+    assert mock_marketing.called
+    # The contact is kept to be synced later
+    queue_key = marketing.MarketingSyncService()._get_redis_key("queue")  # pylint: disable=protected-access
+    assert get_redis_connection("default").llen(queue_key) == 1
+
+
+@mock.patch("core.authentication.backends.TeamService.invalidate")
+def test_authentication_invalidates_teams(mock_invalidate, monkeypatch):
+    """Teams of a user should be resolved again after each login."""
+
+    klass = OIDCAuthenticationBackend()
+    db_user = UserFactory(email="test@example.com")
+
+    def get_userinfo_mocked(*args):
+        return {"sub": db_user.sub, "email": db_user.email}
+
+    monkeypatch.setattr(OIDCAuthenticationBackend, "get_userinfo", get_userinfo_mocked)
+
+    user = klass.get_or_create_user("test-token", None, None)
+    assert user == db_user
+    mock_invalidate.assert_called_once_with(user)
@@ -2,13 +2,29 @@
 
 from unittest import mock
 
+from django.core.cache import cache
+
 import pytest
 
+from core.services.local_cache import local_cache
+
 USER = "user"
 TEAM = "team"
 VIA = [USER, TEAM]
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Drop the values cached by each test, so that they do not leak to the next ones.
+
+    Keys are prefixed per test process, so tests running in parallel are unaffected.
+    """
+    local_cache.clear()
+    yield
+    cache.delete_pattern("*", itersize=1000)
+    local_cache.clear()
+
+
 @pytest.fixture
 def mock_user_get_teams():
     """Mock for the "get_teams" method on the User model."""
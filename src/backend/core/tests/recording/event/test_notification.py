@@ -9,8 +9,11 @@ import smtplib
 from unittest import mock
 
 from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.mail import get_connection
 
 import pytest
+from kombu.exceptions import OperationalError
 
 from core import factories, models
 from core.recording.event.notification import NotificationService, notification_service
@@ -119,13 +122,20 @@ def test_notify_user_by_email_success(mocked_current_site, settings):
 
     notification_service = NotificationService()
 
-    with mock.patch("core.recording.event.notification.send_mail") as mock_send_mail:
+    with mock.patch(
+        "core.services.mail.get_connection", wraps=get_connection
+    ) as mock_get_connection:
         result = notification_service._notify_user_by_email(recording)
 
         assert result is True
-        assert mock_send_mail.call_count == 3
+        assert len(mail.outbox) == 3
+        # Emails are sent as one batch, over a single connection
+        mock_get_connection.assert_called_once()
 
-        call_args_list = mock_send_mail.call_args_list
+        call_args_list = [
+            (email.subject, email.body, email.from_email, email.to)
+            for email in mail.outbox
+        ]
 
         base_content = [
             "ACME",  # Brand name
@@ -136,7 +146,7 @@ def test_notify_user_by_email_success(mocked_current_site, settings):
         ]
 
         # First call verification
-        subject1, body1, sender1, recipients1 = call_args_list[0][0]
+        subject1, body1, sender1, recipients1 = call_args_list[0]
         assert subject1 == "Votre enregistrement est prêt"
 
         # Verify email contains expected content
@@ -153,7 +163,7 @@ def test_notify_user_by_email_success(mocked_current_site, settings):
         assert sender1 == "notifications@acme.com"
 
         # Second call verification
-        subject2, body2, sender2, recipients2 = call_args_list[1][0]
+        subject2, body2, sender2, recipients2 = call_args_list[1]
         assert subject2 == "Je opname is klaar"
 
         # Verify second email content (if needed)
@@ -170,7 +180,7 @@ def test_notify_user_by_email_success(mocked_current_site, settings):
         assert sender2 == "notifications@acme.com"
 
         # Third call verification
-        subject3, body3, sender3, recipients3 = call_args_list[2][0]
+        subject3, body3, sender3, recipients3 = call_args_list[2]
         assert subject3 == "Your recording is ready"
 
         # Verify second email content (if needed)
@@ -201,7 +211,7 @@ def test_notify_user_by_email_no_owners(mocked_current_site, caplog):
 
 
 def test_notify_user_by_email_smtp_exception(mocked_current_site, caplog):
-    """Test email notification when an exception occurs."""
+    """Emails failing to be sent should be retried by the worker, not the caller."""
 
     recording = factories.RecordingFactory(room__name="Conference Room A")
     factories.UserRecordingAccessFactory(
@@ -214,11 +224,33 @@ def test_notify_user_by_email_smtp_exception(mocked_current_site, caplog):
     notification_service = NotificationService()
 
     with mock.patch(
-        "core.recording.event.notification.send_mail",
+        "core.services.mail.get_connection",
         side_effect=smtplib.SMTPException("SMTP Error"),
-    ) as mock_send_mail:
+    ) as mock_get_connection:
         result = notification_service._notify_user_by_email(recording)
 
-        assert result is False
-        assert mock_send_mail.call_count == 2
-        assert "notification could not be sent:" in caplog.text
+        assert result is True
+        # The task runs eagerly in tests, with its retries
+        assert mock_get_connection.call_count == 6
+        assert "2 emails could not be sent: SMTP Error" in caplog.text
+        assert not mail.outbox
+
+
+def test_notify_user_by_email_queue_error(mocked_current_site, caplog):
+    """Test email notification when emails can't be queued for the worker."""
+
+    recording = factories.RecordingFactory(room__name="Conference Room A")
+    factories.UserRecordingAccessFactory(
+        recording=recording, role=models.RoleChoices.OWNER
+    )
+
+    notification_service = NotificationService()
+
+    with mock.patch(
+        "core.recording.event.notification.send_emails.delay",
+        side_effect=OperationalError("Broker unavailable"),
+    ):
+        result = notification_service._notify_user_by_email(recording)
+
+    assert result is False
+    assert "notification could not be queued: Broker unavailable" in caplog.text
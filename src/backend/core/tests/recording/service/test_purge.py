@@ -0,0 +1,230 @@
+"""
+Test RecordingPurgeService service.
+"""
+
+# pylint: disable=W0621
+
+import io
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+
+import pytest
+from freezegun import freeze_time
+
+from core import factories, models
+from core.recording.services.media_auth import MediaAuthCache
+from core.recording.services.purge import RecordingPurgeService
+from core.tasks import purge_expired_recordings
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def mock_delete_objects():
+    """Mock the multi-object delete request of the default storage client."""
+    with mock.patch("core.recording.services.purge.default_storage") as mock_storage:
+        mock_storage.bucket_name = "meet-media-storage"
+        delete_objects = mock_storage.connection.meta.client.delete_objects
+        delete_objects.return_value = {}
+        yield delete_objects
+
+
+def create_recordings(created_at, count, **kwargs):
+    """Create recordings at a given date, with a user access each."""
+    with freeze_time(created_at):
+        return [
+            access.recording
+            for access in factories.UserRecordingAccessFactory.create_batch(
+                count, **kwargs
+            )
+        ]
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=None)
+def test_purge_no_expiration(mock_delete_objects):
+    """Nothing should be purged when recordings never expire."""
+    create_recordings("2020-01-01", 2)
+
+    assert RecordingPurgeService().purge() == 0
+
+    assert models.Recording.objects.count() == 2
+    mock_delete_objects.assert_not_called()
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+def test_purge_expired_recordings(mock_delete_objects):
+    """Expired recordings, their accesses and their files should be deleted."""
+    expired = create_recordings("2025-02-01", 2)
+    expired += create_recordings(
+        "2025-02-05", 1, recording__mode=models.RecordingModeChoices.TRANSCRIPT
+    )
+    kept = create_recordings("2025-02-20", 2)
+
+    assert RecordingPurgeService().purge() == 3
+
+    mock_delete_objects.assert_called_once_with(
+        Bucket="meet-media-storage",
+        Delete={
+            "Objects": [
+                {"Key": recording.key}
+                for recording in sorted(
+                    expired, key=lambda recording: (recording.created_at, recording.id)
+                )
+            ],
+            "Quiet": True,
+        },
+    )
+    assert expired[-1].key.endswith(".ogg")
+    assert set(models.Recording.objects.values_list("id", flat=True)) == {
+        recording.id for recording in kept
+    }
+    assert models.RecordingAccess.objects.count() == 2
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+def test_purge_batches(mock_delete_objects, django_assert_max_num_queries):
+    """
+    Expired recordings should be purged by batches, with one multi-object delete
+    request per batch and a number of queries independent of the batch size.
+    """
+    create_recordings("2025-01-01", 5)
+    create_recordings("2025-01-02", 2)
+
+    with django_assert_max_num_queries(3 * 5):
+        assert RecordingPurgeService(batch_size=3).purge() == 7
+
+    assert mock_delete_objects.call_count == 3
+    assert [
+        len(call.kwargs["Delete"]["Objects"])
+        for call in mock_delete_objects.call_args_list
+    ] == [3, 3, 1]
+    assert not models.Recording.objects.exists()
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+@pytest.mark.usefixtures("mock_delete_objects")
+def test_purge_cached_decisions():
+    """
+    Cached media-auth decisions of purged recordings should be dropped once per
+    batch, without loading the deleted rows one by one.
+    """
+    expired = create_recordings("2025-01-01", 3)
+    kept = create_recordings("2025-02-20", 1)
+    versions = {
+        recording.id: MediaAuthCache().get_version(recording.id)
+        for recording in expired + kept
+    }
+
+    with (
+        mock.patch.object(
+            MediaAuthCache, "invalidate_many", wraps=MediaAuthCache().invalidate_many
+        ) as invalidate_many,
+        mock.patch.object(MediaAuthCache, "invalidate") as invalidate,
+    ):
+        assert RecordingPurgeService(batch_size=2).purge() == 3
+
+    assert invalidate_many.call_count == 2
+    invalidate.assert_not_called()
+    for recording in expired:
+        assert MediaAuthCache().get_version(recording.id) != versions[recording.id]
+    assert MediaAuthCache().get_version(kept[0].id) == versions[kept[0].id]
+
+
+def test_purge_batch_size_capped():
+    """Batches should not exceed the number of keys accepted by S3 in one request."""
+    assert RecordingPurgeService(batch_size=5000).batch_size == 1000
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+def test_purge_failed_files_retried(mock_delete_objects):
+    """
+    Recordings whose file could not be deleted should be kept, without blocking
+    the purge of the following batches, and purged on the next run.
+    """
+    recordings = create_recordings("2025-01-01", 4)
+    failed = recordings[0]
+
+    def delete_objects(**kwargs):
+        keys = [item["Key"] for item in kwargs["Delete"]["Objects"]]
+        if failed.key not in keys:
+            return {}
+        return {
+            "Errors": [{"Key": failed.key, "Code": "InternalError", "Message": "Oops"}]
+        }
+
+    mock_delete_objects.side_effect = delete_objects
+
+    assert RecordingPurgeService(batch_size=2).purge() == 3
+
+    assert list(models.Recording.objects.values_list("id", flat=True)) == [failed.id]
+
+    mock_delete_objects.side_effect = None
+    assert RecordingPurgeService(batch_size=2).purge() == 1
+
+    assert not models.Recording.objects.exists()
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+def test_purge_storage_error(mock_delete_objects):
+    """Rows should be kept if the bucket can't be reached, to resume later."""
+    create_recordings("2025-01-01", 2)
+    mock_delete_objects.side_effect = ConnectionError
+
+    with pytest.raises(ConnectionError):
+        RecordingPurgeService().purge()
+
+    assert models.Recording.objects.count() == 2
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+def test_purge_expired_recordings_task(mock_delete_objects):
+    """The celery task should purge expired recordings."""
+    create_recordings("2025-01-01", 2)
+
+    assert purge_expired_recordings() == 2
+
+    assert not models.Recording.objects.exists()
+    mock_delete_objects.assert_called_once()
+
+
+@override_settings(RECORDING_EXPIRATION_DAYS=30)
+@freeze_time("2025-03-10")
+@pytest.mark.usefixtures("mock_delete_objects")
+def test_purge_expired_recordings_command():
+    """The management command should purge expired recordings."""
+    create_recordings("2025-01-01", 2)
+    stdout = io.StringIO()
+
+    call_command("purge_expired_recordings", stdout=stdout)
+
+    assert "2 expired recordings purged." in stdout.getvalue()
+    assert not models.Recording.objects.exists()
+
+
+def test_purge_expired_recordings_scheduled():
+    """The purge task should be run periodically by celery beat."""
+    assert any(
+        entry["task"] == "core.tasks.purge_expired_recordings"
+        for entry in settings.CELERY_BEAT_SCHEDULE.values()
+    )
+
+
+def test_purge_delete_rows_cascades():
+    """
+    Rows are deleted without the deletion collector, which is only safe while
+    accesses are the only rows referencing recordings: revisit `delete_rows` if
+    this test fails.
+    """
+    assert [
+        relation.related_model for relation in models.Recording._meta.related_objects
+    ] == [models.RecordingAccess]
+    assert not models.RecordingAccess._meta.related_objects
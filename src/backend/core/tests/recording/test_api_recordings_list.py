@@ -6,10 +6,11 @@ import operator
 from unittest import mock
 
 import pytest
+from freezegun import freeze_time
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.test import APIClient
 
-from core import factories
+from core import factories, models
 
 pytestmark = pytest.mark.django_db
 
@@ -204,3 +205,167 @@ def test_api_recordings_list_ordering_default():
     # Check that results are sorted by descending "updated_at" as expected
     for i in range(4):
         assert operator.ge(results[i]["updated_at"], results[i + 1]["updated_at"])
+
+
+def test_api_recordings_list_authenticated_distinct_user_and_team(
+    mock_user_get_teams,
+):
+    """
+    A recording to which a user has access both directly and via a team should
+    only be listed once.
+    """
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    mock_user_get_teams.return_value = ["team1"]
+
+    access = factories.UserRecordingAccessFactory(user=user)
+    factories.TeamRecordingAccessFactory(recording=access.recording, team="team1")
+
+    response = client.get("/api/v1.0/recordings/")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert len(content["results"]) == 1
+    assert content["results"][0]["id"] == str(access.recording_id)
+
+
+@pytest.mark.parametrize("nb_recordings", [1, 10])
+def test_api_recordings_list_num_queries(
+    nb_recordings, django_assert_num_queries, mock_user_get_teams
+):
+    """
+    Listing recordings should cost a fixed number of queries whatever the number of
+    recordings on the page: user session, count and page.
+    """
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    mock_user_get_teams.return_value = ["team1"]
+
+    for access in factories.UserRecordingAccessFactory.create_batch(
+        nb_recordings, user=user
+    ):
+        factories.TeamRecordingAccessFactory(recording=access.recording, team="team1")
+
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1.0/recordings/")
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == nb_recordings
+
+
+def test_api_recordings_list_cursor_pagination():
+    """
+    Passing a cursor should paginate on the creation date and id, without counting
+    recordings, and allow navigating back and forth, including between recordings
+    created at the same time.
+    """
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    with freeze_time("2025-03-10 12:00:00"):
+        factories.RecordingFactory.create_batch(3, users=[user])
+    with freeze_time("2025-03-11 12:00:00"):
+        factories.RecordingFactory.create_batch(2, users=[user])
+
+    expected_ids = [
+        str(recording.id)
+        for recording in models.Recording.objects.order_by("-created_at", "-id")
+    ]
+
+    response = client.get("/api/v1.0/recordings/?cursor=&page_size=2")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert "count" not in content
+    assert content["previous"] is None
+    assert [result["id"] for result in content["results"]] == expected_ids[:2]
+
+    response = client.get(content["next"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert [result["id"] for result in content["results"]] == expected_ids[2:4]
+
+    response = client.get(content["next"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    assert [result["id"] for result in content["results"]] == expected_ids[4:]
+
+    response = client.get(content["previous"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert [result["id"] for result in content["results"]] == expected_ids[2:4]
+
+    response = client.get(content["previous"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["previous"] is None
+    assert [result["id"] for result in content["results"]] == expected_ids[:2]
+
+
+def test_api_recordings_list_cursor_pagination_empty():
+    """An empty list of recordings should have no next or previous page."""
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.get("/api/v1.0/recordings/?cursor=")
+
+    assert response.status_code == 200
+    assert response.json() == {"next": None, "previous": None, "results": []}
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "invalid",
+        # Base64 encoded "p=invalid"
+        "cD1pbnZhbGlk",
+        # Base64 encoded "p=2025-03-10T12:00:00+00:00|invalid"
+        "cD0yMDI1LTAzLTEwVDEyOjAwOjAwKzAwOjAwfGludmFsaWQ=",
+    ],
+)
+def test_api_recordings_list_cursor_pagination_invalid(cursor):
+    """An invalid cursor should be rejected."""
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+    factories.RecordingFactory(users=[user])
+
+    response = client.get(f"/api/v1.0/recordings/?cursor={cursor:s}")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+@pytest.mark.parametrize("nb_recordings", [1, 10])
+def test_api_recordings_list_cursor_pagination_num_queries(
+    nb_recordings, django_assert_num_queries
+):
+    """
+    Listing recordings with a cursor should not count them: user session and page.
+    """
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    factories.RecordingFactory.create_batch(nb_recordings, users=[user])
+
+    response = client.get("/api/v1.0/recordings/?cursor=&page_size=1")
+    next_url = response.json()["next"]
+
+    with django_assert_num_queries(2):
+        response = client.get(next_url or "/api/v1.0/recordings/?cursor=")
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
@@ -3,11 +3,13 @@ Test media-auth authorization API endpoint in docs core app.
 """
 
 from io import BytesIO
+from unittest import mock
 from urllib.parse import urlparse
 from uuid import uuid4
 
 from django.conf import settings
 from django.core.files.storage import default_storage
+from django.test import override_settings
 from django.utils import timezone
 
 import pytest
@@ -282,3 +284,174 @@ def test_api_recordings_media_auth_success_administrator(mode):
         timeout=1,
     )
     assert response.content.decode("utf-8") == "my prose"
+
+
+@override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=60)
+@mock.patch("core.utils.generate_s3_authorization_headers")
+def test_api_recordings_media_auth_cached(mock_generate_headers):
+    """
+    Successive subrequests on the same recording should be authorized from cache,
+    without querying the database nor signing headers again.
+    """
+    mock_generate_headers.return_value = {"Authorization": "AWS4-HMAC"}
+
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    original_url = f"http://localhost/media/{recording.key:s}"
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+    assert response["Authorization"] == "AWS4-HMAC"
+
+    with mock.patch.object(models.Recording.objects, "get", side_effect=AssertionError):
+        response = client.get(
+            "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+        )
+
+    assert response.status_code == 200
+    assert response["Authorization"] == "AWS4-HMAC"
+    mock_generate_headers.assert_called_once_with(recording.key)
+
+
+@override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=60)
+@mock.patch("core.utils.generate_s3_authorization_headers")
+def test_api_recordings_media_auth_cached_other_user(mock_generate_headers):
+    """Cached decisions should not be shared between users."""
+    mock_generate_headers.return_value = {"Authorization": "AWS4-HMAC"}
+
+    user = UserFactory()
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    original_url = f"http://localhost/media/{recording.key:s}"
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+
+    client.force_login(UserFactory())
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 403
+
+
+@override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=60)
+@mock.patch("core.utils.generate_s3_authorization_headers")
+def test_api_recordings_media_auth_cached_mismatched_extension(mock_generate_headers):
+    """A cached decision should not authorize another extension of the recording."""
+    mock_generate_headers.return_value = {"Authorization": "AWS4-HMAC"}
+
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/",
+        HTTP_X_ORIGINAL_URL=f"http://localhost/media/{recording.key:s}",
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/",
+        HTTP_X_ORIGINAL_URL=f"http://localhost/media/recordings/{recording.id!s}.ogg",
+    )
+    assert response.status_code == 404
+
+
+@override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=60)
+@pytest.mark.parametrize("change", ["delete", "downgrade"])
+@mock.patch("core.utils.generate_s3_authorization_headers")
+def test_api_recordings_media_auth_cache_invalidated_on_access_change(
+    mock_generate_headers, change
+):
+    """Removing or downgrading a user access should invalidate cached decisions."""
+    mock_generate_headers.return_value = {"Authorization": "AWS4-HMAC"}
+
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    access = UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    original_url = f"http://localhost/media/{recording.key:s}"
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+
+    if change == "delete":
+        access.delete()
+    else:
+        access.role = "member"
+        access.save()
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 403
+
+
+@override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=60)
+@mock.patch("core.utils.generate_s3_authorization_headers")
+def test_api_recordings_media_auth_cache_invalidated_on_recording_delete(
+    mock_generate_headers,
+):
+    """Deleting a recording, even through its room, should invalidate cached decisions."""
+    mock_generate_headers.return_value = {"Authorization": "AWS4-HMAC"}
+
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    original_url = f"http://localhost/media/{recording.key:s}"
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+
+    recording.room.delete()
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 404
+
+
+@override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=0)
+@mock.patch("core.utils.generate_s3_authorization_headers")
+def test_api_recordings_media_auth_cache_disabled(mock_generate_headers):
+    """Headers should be signed on each subrequest when the cache is disabled."""
+    mock_generate_headers.return_value = {"Authorization": "AWS4-HMAC"}
+
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    original_url = f"http://localhost/media/{recording.key:s}"
+    for _ in range(2):
+        response = client.get(
+            "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+        )
+        assert response.status_code == 200
+
+    assert mock_generate_headers.call_count == 2
@@ -241,3 +241,22 @@ def test_api_recording_retrieve_any_status(status):
     content = response.json()
     assert content["id"] == str(recording.id)
     assert content["status"] == status
+
+
+def test_api_recording_retrieve_num_queries(django_assert_num_queries):
+    """
+    Retrieving a recording should compute abilities from the roles annotated on
+    the recording instead of querying accesses again.
+    """
+    user = UserFactory()
+    recording = RecordingFactory()
+
+    UserRecordingAccessFactory(recording=recording, user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    with django_assert_num_queries(2):
+        response = client.get(f"/api/v1.0/recordings/{recording.id!s}/")
+
+    assert response.status_code == 200
@@ -0,0 +1,110 @@
+"""
+Test the query plans of recording lookups on hot paths.
+
+Tables are seeded with plain SQL to reach a realistic volume. Set the
+QUERY_PLANS_SEED_SIZE environment variable, e.g. to 1000000, to check plans at
+production scale.
+"""
+
+# pylint: disable=W0621
+
+import os
+
+from django.db import connection
+
+import pytest
+
+from core import factories, models
+
+pytestmark = pytest.mark.django_db
+
+SEED_SIZE = int(os.environ.get("QUERY_PLANS_SEED_SIZE", "100000"))
+
+
+@pytest.fixture
+def seeded_recordings():
+    """
+    Seed saved recordings spread over a hundred rooms, each with a user owner and a
+    team member, and analyze the tables for the query planner.
+    """
+    rooms = factories.RoomFactory.create_batch(100)
+    user = factories.UserFactory()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO meet_recording
+                (id, created_at, updated_at, room_id, status, worker_id, mode)
+            SELECT gen_random_uuid(), now() - i * interval '1 second', now(),
+                (%s::uuid[])[1 + i %% %s], 'saved', 'EG_' || i, 'screen_recording'
+            FROM generate_series(1, %s) AS i
+            """,
+            [[str(room.pk) for room in rooms], len(rooms), SEED_SIZE],
+        )
+        cursor.execute(
+            """
+            INSERT INTO meet_recording_access
+                (id, created_at, updated_at, recording_id, user_id, team, role)
+            SELECT gen_random_uuid(), now(), now(), id, %s::uuid, '', 'owner'
+            FROM meet_recording
+            UNION ALL
+            SELECT gen_random_uuid(), now(), now(), id, NULL, 'team', 'member'
+            FROM meet_recording
+            """,
+            [str(user.pk)],
+        )
+        cursor.execute("ANALYZE meet_recording")
+        cursor.execute("ANALYZE meet_recording_access")
+
+    return rooms
+
+
+@pytest.mark.usefixtures("seeded_recordings")
+def test_query_plans_recording_by_worker_id():
+    """Egress webhooks should find their recording through the worker id index."""
+    plan = models.Recording.objects.filter(worker_id="EG_42").explain()
+
+    assert "Index Scan using recording_worker_id_idx" in plan
+    assert "Seq Scan" not in plan
+
+
+def test_query_plans_recording_by_room_and_status(seeded_recordings):
+    """Recordings of a room in a given status should be found through the index."""
+    room = seeded_recordings[0]
+    models.Recording.objects.create(
+        room=room, status=models.RecordingStatusChoices.ACTIVE
+    )
+
+    for status, indexes in [
+        # The partial unique index of active recordings serves them as well
+        (
+            models.RecordingStatusChoices.ACTIVE,
+            [
+                "recording_room_status_idx",
+                "unique_initiated_or_active_recording_per_room",
+            ],
+        ),
+        (models.RecordingStatusChoices.SAVED, ["recording_room_status_idx"]),
+    ]:
+        plan = models.Recording.objects.filter(room=room, status=status).explain()
+
+        assert any(index in plan for index in indexes)
+        assert "Seq Scan" not in plan
+
+
+def test_query_plans_recording_owners(seeded_recordings):
+    """Owners to notify should be found through the (recording, role) index."""
+    recording = factories.UserRecordingAccessFactory(
+        recording__room=seeded_recordings[0], role=models.RoleChoices.OWNER
+    ).recording
+
+    plan = (
+        models.RecordingAccess.objects.select_related("user")
+        .filter(role=models.RoleChoices.OWNER, recording_id=recording.id)
+        .order_by("created_at")
+        .explain()
+    )
+
+    assert "Index Scan using recording_access_role_idx" in plan
+    # The users table may be small enough to be scanned for the join
+    assert "Seq Scan on meet_recording" not in plan
@@ -27,7 +27,7 @@ def clear_lru_cache():
 
 
 @pytest.fixture
-def test_settings():
+def test_settings(settings):
     """Fixture to provide test Django settings"""
     mocked_settings = {
         "RECORDING_OUTPUT_FOLDER": "/test/output",
@@ -39,9 +39,11 @@ def test_settings():
         "AWS_STORAGE_BUCKET_NAME": "test-bucket",
     }
 
-    # Use override_settings to properly patch Django settings
-    with override_settings(**mocked_settings):
-        yield test_settings
+    # Patch Django settings with the settings fixture, like tests do, so that they
+    # are all restored in order
+    for name, value in mocked_settings.items():
+        setattr(settings, name, value)
+    return settings
 
 
 @pytest.fixture
@@ -10,6 +10,7 @@ from rest_framework.test import APIClient
 
 from ...factories import RoomFactory, UserFactory
 from ...models import Room
+from ...services.room_creation import RoomCreation
 
 pytestmark = pytest.mark.django_db
 
@@ -85,7 +86,7 @@ def test_api_rooms_create_generation_cache(reset_cache):
     assert room.slug == "my-room"
     assert room.accesses.filter(role="owner", user=user).exists() is True
 
-    room_data = cache.get("room-creation-callback_1234")
+    room_data = RoomCreation().get_callback_state("1234")
     assert room_data.get("slug") == "my-room"
 
 
@@ -3,12 +3,17 @@ Test rooms API endpoints in the Meet core app: creation callback functionality.
 """
 
 # pylint: disable=W0621,W0613
+import threading
+import time
+import uuid
+
 from django.core.cache import cache
 
 import pytest
 from rest_framework.test import APIClient
 
-from ...factories import UserFactory
+from ...factories import RoomFactory, UserFactory
+from ...services.room_creation import RoomCreation
 
 pytestmark = pytest.mark.django_db
 
@@ -28,7 +33,7 @@ def reset_cache():
 def test_api_rooms_create_anonymous(reset_cache):
     """Anonymous user can retrieve room data once using a valid callback ID."""
     client = APIClient()
-    cache.set("room-creation-callback_123", {"slug": "my room"})
+    RoomCreation().persist_callback_state("123", RoomFactory(name="my room"))
     response = client.post(
         "/api/v1.0/rooms/creation-callback/",
         {
@@ -37,7 +42,7 @@ def test_api_rooms_create_anonymous(reset_cache):
     )
 
     assert response.status_code == 200
-    assert response.json() == {"status": "success", "room": {"slug": "my room"}}
+    assert response.json() == {"status": "success", "room": {"slug": "my-room"}}
 
     # Data should be cleared after retrieval
     response = client.post(
@@ -85,7 +90,7 @@ def test_api_rooms_create_authenticated(reset_cache):
     client = APIClient()
     client.force_login(user)
 
-    cache.set("room-creation-callback_123", {"slug": "my room"})
+    RoomCreation().persist_callback_state("123", RoomFactory(name="my room"))
 
     response = client.post(
         "/api/v1.0/rooms/creation-callback/",
@@ -95,4 +100,111 @@ def test_api_rooms_create_authenticated(reset_cache):
     )
 
     assert response.status_code == 200
-    assert response.json() == {"status": "success", "room": {"slug": "my room"}}
+    assert response.json() == {"status": "success", "room": {"slug": "my-room"}}
+
+
+def persist_later(callback_id, room, delay=0.2):
+    """Persist the room of a callback from another thread, after a delay."""
+    timer = threading.Timer(
+        delay, RoomCreation().persist_callback_state, args=(callback_id, room)
+    )
+    timer.start()
+    return timer
+
+
+def authenticated_client():
+    """Return a client logged in as a new user, allowed to wait for rooms."""
+    client = APIClient()
+    client.force_login(UserFactory())
+    return client
+
+
+def test_api_rooms_create_wait(reset_cache):
+    """Requests waiting for the room should get it as soon as it is created."""
+    callback_id = str(uuid.uuid4())
+    room = RoomFactory()
+    timer = persist_later(callback_id, room)
+
+    start = time.monotonic()
+    response = authenticated_client().post(
+        "/api/v1.0/rooms/creation-callback/",
+        {"callback_id": callback_id, "wait": 3},
+    )
+    timer.join()
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "room": {"slug": room.slug}}
+    assert time.monotonic() - start < 5
+
+    # The room was cleared when returned
+    assert RoomCreation().get_callback_state(callback_id) == {}
+
+
+def test_api_rooms_create_wait_already_created(reset_cache):
+    """Requests waiting for a room already created should get it right away."""
+    RoomCreation().persist_callback_state("123", RoomFactory(name="my room"))
+
+    response = authenticated_client().post(
+        "/api/v1.0/rooms/creation-callback/",
+        {"callback_id": "123", "wait": 3},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "room": {"slug": "my-room"}}
+
+
+def test_api_rooms_create_wait_timeout(settings):
+    """Waiting should be capped, then return empty room data."""
+    settings.ROOM_CREATION_CALLBACK_MAX_WAIT = 1
+
+    start = time.monotonic()
+    response = authenticated_client().post(
+        "/api/v1.0/rooms/creation-callback/",
+        {"callback_id": str(uuid.uuid4()), "wait": 60},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "room": {}}
+    assert 1 <= time.monotonic() - start < 5
+
+
+def test_api_rooms_create_wait_invalid():
+    """Negative durations to wait should be rejected."""
+    response = authenticated_client().post(
+        "/api/v1.0/rooms/creation-callback/",
+        {"callback_id": "123", "wait": -1},
+    )
+
+    assert response.status_code == 400
+
+
+def test_api_rooms_create_wait_anonymous():
+    """Anonymous users should not be allowed to hold requests waiting for rooms."""
+    response = APIClient().post(
+        "/api/v1.0/rooms/creation-callback/",
+        {"callback_id": str(uuid.uuid4()), "wait": 3},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "wait": ["Authentication is required to wait for the room."]
+    }
+
+
+def test_api_rooms_create_wait_returned_once(reset_cache):
+    """Concurrent requests waiting for the same room should only get it once."""
+    callback_id = str(uuid.uuid4())
+    room = RoomFactory()
+    results = []
+
+    def wait():
+        results.append(RoomCreation().get_callback_state(callback_id, timeout=2))
+
+    waiters = [threading.Thread(target=wait) for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    persist_later(callback_id, room).join()
+    for waiter in waiters:
+        waiter.join()
+
+    assert sorted(results, key=len) == [{}, {}, {"slug": room.slug}]
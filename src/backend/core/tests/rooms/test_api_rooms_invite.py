@@ -8,7 +8,10 @@ import json
 import random
 from unittest import mock
 
+from django.core import mail
+
 import pytest
+from kombu.exceptions import OperationalError
 from rest_framework.test import APIClient
 
 from ...factories import RoomFactory, UserFactory
@@ -240,8 +243,7 @@ def test_api_rooms_invite_error(mock_invite_to_room):
     mock_invite_to_room.assert_called_once()
 
 
-@mock.patch("core.services.invitation.send_mail")
-def test_api_rooms_invite_success(mock_send_mail, settings):
+def test_api_rooms_invite_success(settings):
     """Test privileged users should successfully send invitation emails."""
 
     settings.EMAIL_BRAND_NAME = "ACME"
@@ -269,9 +271,16 @@ def test_api_rooms_invite_success(mock_send_mail, settings):
     assert response.status_code == 200
     assert response.json() == {"status": "success", "message": "invitations sent"}
 
-    mock_send_mail.assert_called_once()
+    # The task sending emails runs eagerly in tests
+    assert len(mail.outbox) == 1
 
-    subject, body, sender, recipients = mock_send_mail.call_args[0]
+    email = mail.outbox[0]
+    subject, body, sender, recipients = (
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to,
+    )
 
     assert (
         subject == f"Video call in progress: {user.email} is waiting for you to connect"
@@ -287,8 +296,36 @@ def test_api_rooms_invite_success(mock_send_mail, settings):
 
     for content in required_content:
         assert content in body
+    assert email.alternatives[0].mimetype == "text/html"
 
     assert sender == "notifications@acme.com"
 
     # Verify all owners received the email (order-independent comparison)
     assert sorted(recipients) == sorted(["fabien@yopmail.com", "gerald@yopmail.com"])
+
+
+@mock.patch(
+    "core.services.invitation.send_emails.delay",
+    side_effect=OperationalError("Broker unavailable"),
+)
+def test_api_rooms_invite_queue_error(mock_delay):
+    """Invitations which can't be queued for the worker should raise an error."""
+
+    client = APIClient()
+    room = RoomFactory()
+    user = UserFactory()
+
+    room.accesses.create(user=user, role=random.choice(["administrator", "owner"]))
+
+    client.force_login(user)
+
+    data = {"emails": ["toto@yopmail.com"]}
+
+    with pytest.raises(InvitationError, match="Could not send invitation"):
+        client.post(
+            f"/api/v1.0/rooms/{room.id}/invite/",
+            json.dumps(data),
+            content_type="application/json",
+        )
+
+    mock_delay.assert_called_once()
@@ -120,3 +120,87 @@ def test_api_rooms_list_authenticated_distinct():
     content = response.json()
     assert len(content["results"]) == 1
     assert content["results"][0]["id"] == str(room.id)
+
+
+def test_api_rooms_list_cursor_pagination():
+    """Passing a cursor should paginate rooms on their creation date and id."""
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    rooms = RoomFactory.create_batch(3, users=[user])
+    RoomFactory()
+    expected_ids = [
+        str(room.id)
+        for room in sorted(rooms, key=lambda room: (room.created_at, room.id))
+    ][::-1]
+
+    response = client.get("/api/v1.0/rooms/?cursor=&page_size=2")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert "count" not in content
+    assert content["previous"] is None
+    assert [result["id"] for result in content["results"]] == expected_ids[:2]
+
+    response = client.get(content["next"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    assert content["previous"] is not None
+    assert [result["id"] for result in content["results"]] == expected_ids[2:]
+
+
+@pytest.mark.parametrize(
+    ("role", "is_administrable"),
+    [("member", False), ("administrator", True), ("owner", True)],
+)
+def test_api_rooms_list_payload(role, is_administrable):
+    """
+    Listed rooms should include the user's abilities but neither accesses nor LiveKit
+    credentials, and the configuration only for administrators and owners.
+    """
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    room = RoomFactory(users=[(user, role)], configuration={"can_publish": False})
+
+    response = client.get("/api/v1.0/rooms/")
+
+    assert response.status_code == 200
+    expected = {
+        "id": str(room.id),
+        "name": room.name,
+        "slug": room.slug,
+        "access_level": str(room.access_level),
+        "pin_code": room.pin_code,
+        "is_administrable": is_administrable,
+    }
+    if is_administrable:
+        expected["configuration"] = {"can_publish": False}
+    assert response.json()["results"] == [expected]
+
+
+@pytest.mark.parametrize("nb_rooms", [1, 20])
+@mock.patch("core.utils.generate_livekit_config")
+def test_api_rooms_list_num_queries(
+    mock_generate_livekit_config, nb_rooms, django_assert_num_queries
+):
+    """
+    Listing rooms should cost a fixed number of queries whatever the number of rooms
+    on the page: user session, count and page. No LiveKit token should be minted.
+    """
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    RoomFactory.create_batch(nb_rooms, users=[(user, "owner"), UserFactory()])
+
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1.0/rooms/")
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == nb_rooms
+    mock_generate_livekit_config.assert_not_called()
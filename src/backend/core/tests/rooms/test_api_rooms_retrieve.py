@@ -3,9 +3,11 @@ Test rooms API endpoints in the Meet core app: retrieve.
 """
 
 import random
+import uuid
 from unittest import mock
 
 from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
 from django.test.utils import override_settings
 
 import pytest
@@ -360,7 +362,7 @@ def test_api_rooms_retrieve_members(mock_token, django_assert_num_queries, setti
     client = APIClient()
     client.force_login(user)
 
-    with django_assert_num_queries(3):
+    with django_assert_num_queries(2):
         response = client.get(
             f"/api/v1.0/rooms/{room.id!s}/",
         )
@@ -418,7 +420,7 @@ def test_api_rooms_retrieve_administrators(
     client = APIClient()
     client.force_login(user)
 
-    with django_assert_num_queries(4):
+    with django_assert_num_queries(3):
         response = client.get(
             f"/api/v1.0/rooms/{room.id!s}/",
         )
@@ -475,3 +477,144 @@ def test_api_rooms_retrieve_administrators(
     mock_token.assert_called_once_with(
         room=expected_name, user=user, username=None, color=None
     )
+
+
+@override_settings(ALLOW_UNREGISTERED_ROOMS=True, UNREGISTERED_ROOMS_CACHE_TIMEOUT=60)
+@mock.patch("core.utils.generate_token", return_value="foo")
+def test_api_rooms_retrieve_unregistered_cached(mock_token, django_assert_num_queries):
+    """
+    A slug found not to match any room should not be looked up again in the database,
+    until a room is created with this slug.
+    """
+    slug = f"unregistered-{uuid.uuid4()!s}"
+    client = APIClient()
+
+    with django_assert_num_queries(1):
+        response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 200
+    assert response.json()["id"] is None
+
+    with django_assert_num_queries(0):
+        response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 200
+    assert response.json()["id"] is None
+    assert response.json()["livekit"]["room"] == slug
+    assert mock_token.call_count == 2
+
+    room = RoomFactory(name=slug, access_level=RoomAccessLevel.RESTRICTED)
+    assert room.slug == slug
+
+    response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 200
+    assert response.json()["id"] == str(room.id)
+
+
+@override_settings(ALLOW_UNREGISTERED_ROOMS=False, UNREGISTERED_ROOMS_CACHE_TIMEOUT=60)
+def test_api_rooms_retrieve_unregistered_not_allowed_cached(django_assert_num_queries):
+    """Known unregistered slugs should be rejected without querying the database."""
+    slug = f"unregistered-{uuid.uuid4()!s}"
+    client = APIClient()
+
+    with django_assert_num_queries(1):
+        response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 404
+
+    with django_assert_num_queries(0):
+        response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "No Room matches the given query."}
+
+
+@override_settings(ALLOW_UNREGISTERED_ROOMS=True, UNREGISTERED_ROOMS_CACHE_TIMEOUT=60)
+def test_api_rooms_retrieve_unregistered_cached_renamed_room():
+    """Renaming a room to a slug known as unregistered should make it reachable."""
+    slug = f"unregistered-{uuid.uuid4()!s}"
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client = APIClient()
+
+    response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.json()["id"] is None
+
+    room.name = slug
+    room.save()
+
+    response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.json()["id"] == str(room.id)
+
+
+@override_settings(ALLOW_UNREGISTERED_ROOMS=True, UNREGISTERED_ROOMS_CACHE_TIMEOUT=60)
+def test_api_rooms_retrieve_unregistered_cached_concurrent_creation():
+    """
+    A slug missed by a request while a room is created with it should not be cached
+    as unregistered once the room is saved.
+    """
+    slug = f"unregistered-{uuid.uuid4()!s}"
+    client = APIClient()
+    rooms = []
+
+    def miss_then_create(*args, **kwargs):
+        # The room is saved after the query missed it, but before the miss is cached
+        rooms.append(RoomFactory(name=slug, access_level=RoomAccessLevel.RESTRICTED))
+        raise Http404
+
+    with mock.patch(
+        "core.api.viewsets.get_object_or_404", side_effect=miss_then_create
+    ):
+        response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.json()["id"] is None
+
+    response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 200
+    assert response.json()["id"] == str(rooms[0].id)
+
+
+@override_settings(ALLOW_UNREGISTERED_ROOMS=True, LIVEKIT_TOKEN_RATE_LIMIT=1)
+def test_api_rooms_retrieve_token_rate_limit():
+    """Requesting too many tokens for a room should be throttled."""
+    slug = f"unregistered-{uuid.uuid4()!s}"
+    client = APIClient()
+
+    response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 200
+
+    response = client.get(f"/api/v1.0/rooms/{slug:s}/")
+    assert response.status_code == 429
+    assert response.json()["detail"].startswith(
+        "Too many access tokens were requested for this room."
+    )
+
+
+@override_settings(LIVEKIT_TOKEN_RATE_LIMIT=1)
+def test_api_rooms_retrieve_token_rate_limit_registered():
+    """Joining a registered room too many times should be throttled too."""
+    room = RoomFactory(access_level=RoomAccessLevel.PUBLIC)
+    client = APIClient()
+
+    response = client.get(f"/api/v1.0/rooms/{room.id!s}/")
+    assert response.status_code == 200
+    assert "token" in response.json()["livekit"]
+
+    response = client.get(f"/api/v1.0/rooms/{room.id!s}/")
+    assert response.status_code == 429
+
+
+@override_settings(LIVEKIT_TOKEN_RATE_LIMIT=1)
+@pytest.mark.parametrize(
+    "access_level", [RoomAccessLevel.RESTRICTED, RoomAccessLevel.TRUSTED]
+)
+def test_api_rooms_retrieve_token_rate_limit_without_token(access_level):
+    """Retrieving a room without getting a token should not count against its limit."""
+    room = RoomFactory(access_level=access_level)
+    user = UserFactory()
+    UserResourceAccessFactory(resource=room, user=user, role="member")
+
+    for _ in range(3):
+        response = APIClient().get(f"/api/v1.0/rooms/{room.id!s}/")
+        assert response.status_code == 200
+        assert "livekit" not in response.json()
+
+    client = APIClient()
+    client.force_login(user)
+    response = client.get(f"/api/v1.0/rooms/{room.id!s}/")
+    assert response.status_code == 200
+    assert "token" in response.json()["livekit"]
@@ -3,6 +3,7 @@ Test rooms API endpoints in the Meet core app: update.
 """
 
 import random
+from unittest import mock
 
 import pytest
 from rest_framework.test import APIClient
@@ -126,3 +127,45 @@ def test_api_rooms_update_administrators_of_another():
     other_room.refresh_from_db()
     assert other_room.name == "Old name"
     assert other_room.slug == "old-name"
+
+
+@mock.patch("core.utils.generate_token", return_value="foo")
+def test_api_rooms_update_num_queries(_mock_token, django_assert_num_queries):
+    """
+    The role of the user should be resolved once, along with the room, for both
+    permissions and serialization: user session, room with role, unique checks of
+    the slug and pin code, update of the resource and room tables and accesses.
+    """
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner"), UserFactory()])
+    client = APIClient()
+    client.force_login(user)
+
+    with django_assert_num_queries(7):
+        response = client.patch(
+            f"/api/v1.0/rooms/{room.id!s}/",
+            {"name": "New name"},
+            format="json",
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["accesses"]) == 2
+
+
+def test_api_rooms_update_not_token_rate_limited(settings):
+    """Updates should not be throttled by the token rate limit after being saved."""
+    settings.LIVEKIT_TOKEN_RATE_LIMIT = 1
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    client = APIClient()
+    client.force_login(user)
+
+    for name in ["First name", "Second name"]:
+        response = client.patch(
+            f"/api/v1.0/rooms/{room.id!s}/", {"name": name}, format="json"
+        )
+        assert response.status_code == 200
+        assert "token" in response.json()["livekit"]
+
+    room.refresh_from_db()
+    assert room.name == "Second name"
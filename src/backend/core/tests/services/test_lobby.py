@@ -11,6 +11,7 @@ from unittest import mock
 from django.conf import settings
 from django.core.cache import cache
 from django.http import HttpResponse
+from django.test import override_settings
 
 import pytest
 
@@ -23,7 +24,7 @@ from core.services.lobby import (
     LobbyParticipantStatus,
     LobbyService,
 )
-from core.utils import NotificationError
+from core.utils import NotificationError, TokenRateLimitExceeded
 
 pytestmark = pytest.mark.django_db
 
@@ -271,6 +272,24 @@ def test_request_entry_public_room(
     lobby_service._get_participant.assert_called_once_with(room.id, participant_id)
 
 
+@override_settings(LIVEKIT_TOKEN_RATE_LIMIT=1)
+@mock.patch("core.utils.generate_livekit_config")
+def test_request_entry_token_rate_limit(
+    mock_generate_config, lobby_service, participant_id, username
+):
+    """Entering a room should be throttled before any token is generated."""
+    request = mock.Mock()
+    room = RoomFactory(access_level=RoomAccessLevel.PUBLIC)
+    lobby_service._get_or_create_participant_id = mock.Mock(return_value=participant_id)
+    lobby_service._get_participant = mock.Mock(return_value=None)
+
+    lobby_service.request_entry(room, request, username)
+    with pytest.raises(TokenRateLimitExceeded):
+        lobby_service.request_entry(room, request, username)
+
+    mock_generate_config.assert_called_once()
+
+
 @mock.patch("core.utils.generate_livekit_config")
 def test_request_entry_trusted_room(
     mock_generate_config, lobby_service, participant_id, username
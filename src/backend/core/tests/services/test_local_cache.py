@@ -0,0 +1,228 @@
+"""
+Test local cache service.
+"""
+
+# pylint: disable=W0621,W0212
+
+import time
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+
+from core.services.local_cache import LocalCache
+
+
+@pytest.fixture
+def key():
+    """Return a cache key distinct for each test, deleted afterwards."""
+    key = f"local-cache-test_{uuid.uuid4()!s}"
+    yield key
+    cache.delete(key)
+
+
+@pytest.fixture
+def subscribed_cache():
+    """Return a factory of local caches listening to invalidations, stopped after."""
+    local_caches = []
+
+    def factory():
+        local_cache = LocalCache()
+        local_caches.append(local_cache)
+        local_cache._start_listener()
+        assert local_cache._listener.subscribed.wait(timeout=5)
+        return local_cache
+
+    yield factory
+    for local_cache in local_caches:
+        local_cache.stop()
+
+
+def wait_for(condition, timeout=5):
+    """Wait until a condition is met, e.g. an invalidation was received."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def enabled(settings):
+    """Enable the local cache with known settings."""
+    settings.LOCAL_CACHE_TIMEOUT = 30
+    settings.LOCAL_CACHE_MAX_ENTRIES = 1000
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_hits(key, subscribed_cache):
+    """Values should be read from the default cache once, then from the process."""
+    cache.set(key, "value")
+    local_cache = subscribed_cache()
+
+    with mock.patch("core.services.local_cache.cache.get", wraps=cache.get) as get:
+        assert [local_cache.get(key) for _ in range(3)] == ["value"] * 3
+
+    get.assert_called_once()
+    assert (local_cache.hits, local_cache.misses) == (2, 1)
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_missing_keys(key, subscribed_cache):
+    """Keys missing from the default cache should be kept in the process too."""
+    local_cache = subscribed_cache()
+
+    with mock.patch("core.services.local_cache.cache.get", wraps=cache.get) as get:
+        assert local_cache.get(key) is None
+        assert local_cache.get(key, "default") == "default"
+
+    get.assert_called_once()
+
+
+def test_local_cache_disabled(key, settings):
+    """Values should always be read from the default cache when disabled."""
+    settings.LOCAL_CACHE_TIMEOUT = 0
+    cache.set(key, "value")
+    local_cache = LocalCache()
+
+    with mock.patch("core.services.local_cache.cache.get", wraps=cache.get) as get:
+        assert [local_cache.get(key) for _ in range(2)] == ["value"] * 2
+
+    assert get.call_count == 2
+    assert local_cache._listener is None
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_timeout(key, subscribed_cache):
+    """Values should be read again from the default cache after the timeout."""
+    cache.set(key, "value")
+    local_cache = subscribed_cache()
+    local_cache.get(key)
+    cache.set(key, "changed")
+
+    assert local_cache.get(key) == "value"
+    with mock.patch(
+        "core.services.local_cache.time.monotonic", return_value=time.monotonic() + 31
+    ):
+        assert local_cache.get(key) == "changed"
+
+
+def test_local_cache_least_recently_used(settings, subscribed_cache):
+    """The least recently used keys should be dropped beyond the maximum."""
+    settings.LOCAL_CACHE_TIMEOUT = 30
+    settings.LOCAL_CACHE_MAX_ENTRIES = 2
+    local_cache = subscribed_cache()
+
+    for key in ["a", "b", "a", "c"]:
+        local_cache.get(f"local-cache-test_{key:s}")
+
+    assert list(local_cache._entries) == [
+        "local-cache-test_a",
+        "local-cache-test_c",
+    ]
+
+
+@pytest.mark.usefixtures("enabled")
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda local_cache, key: local_cache.set(key, "changed", timeout=60),
+        lambda local_cache, key: local_cache.delete(key),
+    ],
+)
+def test_local_cache_invalidation(key, change, subscribed_cache):
+    """Changing a value should drop it from all processes."""
+    cache.set(key, "value")
+    writer, reader = subscribed_cache(), subscribed_cache()
+    assert reader.get(key) == "value"
+
+    change(writer, key)
+
+    wait_for(lambda: key not in reader._entries)
+    assert reader.get(key) == cache.get(key)
+    # The writer dropped the value right away
+    assert key not in writer._entries
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_add(key, subscribed_cache):
+    """Adding a value should only drop it from processes if it was added."""
+    local_cache = subscribed_cache()
+    assert local_cache.get(key) is None
+
+    assert local_cache.add(key, "value", timeout=60) is True
+    assert local_cache.get(key) == "value"
+
+    assert local_cache.add(key, "other", timeout=60) is False
+    assert local_cache.get(key) == "value"
+    assert (local_cache.hits, local_cache.misses) == (1, 2)
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_own_invalidations(key, subscribed_cache):
+    """Values set by a process should be kept when it receives its invalidation."""
+    local_cache, other = subscribed_cache(), subscribed_cache()
+    other.get(key)
+
+    local_cache.set(key, "value", timeout=60)
+    assert local_cache.get(key) == "value"
+
+    # The invalidation was published to both processes at once
+    wait_for(lambda: key not in other._entries)
+    time.sleep(0.1)
+    assert key in local_cache._entries
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_stop(key, subscribed_cache):
+    """Stopping should end the listener and drop all values."""
+    local_cache = subscribed_cache()
+    local_cache.get(key)
+    listener = local_cache._listener
+
+    local_cache.stop()
+
+    assert not listener.is_alive()
+    assert not local_cache._entries
+    assert local_cache._listener is None
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_invalidated_while_reading(key, subscribed_cache):
+    """Values read while they get invalidated should not be kept in the process."""
+    cache.set(key, "value")
+    local_cache = subscribed_cache()
+    get = cache.get
+
+    def get_then_invalidate(*args):
+        value = get(*args)
+        local_cache._evict(key)
+        return value
+
+    with mock.patch(
+        "core.services.local_cache.cache.get", side_effect=get_then_invalidate
+    ):
+        assert local_cache.get(key) == "value"
+
+    assert key not in local_cache._entries
+
+
+@pytest.mark.usefixtures("enabled")
+def test_local_cache_forked(key, subscribed_cache):
+    """Processes forked from a process should drop its values and listen again."""
+    local_cache = subscribed_cache()
+    local_cache.get(key)
+    parent_listener = local_cache._listener
+
+    with (
+        mock.patch("core.services.local_cache.os.getpid", return_value=-1),
+        mock.patch("core.services.local_cache._Listener.start") as start,
+    ):
+        local_cache.get(key)
+
+    start.assert_called_once()
+    assert local_cache._listener.pid == -1
+    assert parent_listener.stopped.is_set()
+    # Values are not kept until the new listener is subscribed
+    assert not local_cache._entries
@@ -0,0 +1,198 @@
+"""
+Test mail service.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+import smtplib
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.template.loader import render_to_string
+from django.utils.translation import override
+
+import pytest
+
+from core.services import mail as mail_service
+from core.services.mail import MailDeliveryError, MailService
+from core.tasks import send_emails
+
+
+@pytest.fixture
+def clear_compiled_templates():
+    """Clear compiled templates before and after each test."""
+    mail_service._compile_template.cache_clear()
+    yield
+    mail_service._compile_template.cache_clear()
+
+
+def build_messages(count):
+    """Build messages to distinct recipients."""
+    return [
+        MailService.build_message(
+            f"Subject {i:d}",
+            f"Body {i:d}",
+            [f"user{i:d}@example.com"],
+            html_message=f"<p>Body {i:d}</p>",
+        )
+        for i in range(count)
+    ]
+
+
+def test_mail_service_build_message(settings):
+    """Messages should be plain dicts, sent from the configured address."""
+    settings.EMAIL_FROM = "notifications@acme.com"
+
+    assert MailService.build_message("Subject", "Body", ("a@example.com",)) == {
+        "subject": "Subject",
+        "body": "Body",
+        "from_email": "notifications@acme.com",
+        "to": ["a@example.com"],
+        "html_message": None,
+    }
+
+
+def test_mail_service_send_single_connection():
+    """A batch of emails should be sent over a single connection."""
+    with mock.patch(
+        "core.services.mail.get_connection", wraps=get_connection
+    ) as mock_get_connection:
+        assert MailService.send(build_messages(3)) == 3
+
+    mock_get_connection.assert_called_once_with(fail_silently=False)
+    assert [email.to for email in mail.outbox] == [
+        ["user0@example.com"],
+        ["user1@example.com"],
+        ["user2@example.com"],
+    ]
+    assert mail.outbox[1].subject == "Subject 1"
+    assert mail.outbox[1].body == "Body 1"
+    assert mail.outbox[1].alternatives[0].content == "<p>Body 1</p>"
+
+
+def test_mail_service_send_failure_keeps_unsent():
+    """Emails left unsent after a failure should be kept on the error."""
+    messages = build_messages(3)
+    connection = get_connection()
+
+    with (
+        mock.patch("core.services.mail.get_connection", return_value=connection),
+        mock.patch.object(
+            connection,
+            "send_messages",
+            side_effect=[1, smtplib.SMTPServerDisconnected("Connection lost")],
+        ),
+        pytest.raises(MailDeliveryError) as excinfo,
+    ):
+        MailService.send(messages)
+
+    assert excinfo.value.unsent == messages[1:]
+
+
+def test_send_emails_task_retries_unsent(settings):
+    """The task should only retry emails left unsent, with an exponential backoff."""
+    settings.EMAIL_RETRY_DELAY = 10
+    messages = build_messages(3)
+
+    with (
+        mock.patch(
+            "core.tasks.MailService.send",
+            side_effect=[
+                MailDeliveryError("Could not send emails", unsent=messages[1:]),
+                MailDeliveryError("Could not send emails", unsent=messages[2:]),
+                1,
+            ],
+        ) as mock_send,
+        mock.patch.object(send_emails, "retry", wraps=send_emails.retry) as mock_retry,
+    ):
+        result = send_emails.apply(args=[messages])
+
+    assert result.get() == 1
+    assert [call[0][0] for call in mock_send.call_args_list] == [
+        messages,
+        messages[1:],
+        messages[2:],
+    ]
+    assert [call[1]["countdown"] for call in mock_retry.call_args_list] == [10, 20]
+
+
+def test_send_emails_task_max_retries(settings):
+    """The task should give up after the maximum number of retries."""
+    settings.EMAIL_MAX_RETRIES = 2
+
+    with mock.patch(
+        "core.tasks.MailService.send",
+        side_effect=MailDeliveryError("Could not send emails", unsent=[]),
+    ) as mock_send:
+        result = send_emails.apply(args=[build_messages(1)])
+
+    assert isinstance(result.result, MailDeliveryError)
+    assert mock_send.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "template_name",
+    ["mail/html/screen_recording.html", "mail/text/screen_recording.txt"],
+)
+@pytest.mark.parametrize("language", ["en-us", "fr-fr", "nl-nl", "de-de"])
+def test_mail_service_render_same_as_django(
+    template_name, language, clear_compiled_templates
+):
+    """Rendering compiled templates should be the same as rendering with Django."""
+    context = {
+        "brandname": "ACME",
+        "support_email": "support@acme.com",
+        "logo_img": "https://acme.com/logo",
+        "domain": "acme.com",
+        "recording_expiration_days": 7,
+    }
+    for variables in [
+        {
+            "room_name": "Conference Room A",
+            "link": "https://acme.com/recordings/1",
+            "recording_date": "2023-05-15",
+            "recording_time": "16:30",
+        },
+        {
+            "room_name": 'Tom & Jerry\'s <b>"room"</b>',
+            "link": "https://acme.com/recordings/2?a=1&b=2",
+            "recording_date": "2024-01-02",
+            "recording_time": "07:05",
+        },
+    ]:
+        with override(language):
+            assert MailService.render(
+                template_name, context, variables
+            ) == render_to_string(template_name, {**context, **variables})
+
+
+def test_mail_service_render_compiled_once_per_language(clear_compiled_templates):
+    """Templates should only be rendered by Django once per language and context."""
+    context = {"brandname": "ACME", "logo_img": None, "domain": "acme.com"}
+
+    with mock.patch(
+        "core.services.mail.render_to_string", wraps=render_to_string
+    ) as mock_render:
+        for language in ["en-us", "fr-fr", "en-us", "fr-fr"]:
+            for i in range(3):
+                with override(language):
+                    body = MailService.render(
+                        "mail/text/invitation.txt",
+                        context,
+                        {
+                            "room_url": f"https://acme.com/room-{i:d}",
+                            "room_link": f"acme.com/room-{i:d}",
+                            "sender_email": "jane@example.com",
+                        },
+                    )
+                assert f"https://acme.com/room-{i:d}" in body
+
+        assert mock_render.call_count == 2
+
+        MailService.render(
+            "mail/text/invitation.txt",
+            {**context, "brandname": "Other"},
+            {"room_url": "", "room_link": "", "sender_email": ""},
+        )
+        assert mock_render.call_count == 3
@@ -2,23 +2,31 @@
 Test marketing services.
 """
 
-# pylint: disable=W0621,W0613
+# pylint: disable=W0621,W0613,W0212
 
+import io
+import json
 from unittest import mock
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
 
 import brevo_python
 import pytest
 import urllib3
+from django_redis import get_redis_connection
 
 from core.services.marketing import (
     BrevoMarketingService,
     ContactCreationError,
     ContactData,
+    ContactRejectedError,
+    MarketingSyncService,
     get_marketing_service,
 )
+from core.tasks import sync_marketing_contacts
 
 
 def test_init_missing_api_key(settings):
@@ -210,3 +218,323 @@ def test_service_instantiation_called_once(mock_import_string, clear_marketing_c
     mock_service_cls.assert_called_once()
     assert service1 is service2
     assert service1 is mock_service_instance
+
+
+@mock.patch("brevo_python.ContactsApi")
+def test_import_contacts_success(mock_contact_api, settings):
+    """Contacts should be imported in one call per set of lists."""
+
+    mock_api = mock_contact_api.return_value
+    mock_api.import_contacts.return_value = {"processId": 1}
+
+    settings.BREVO_API_KEY = "test-api-key"
+    settings.BREVO_API_CONTACT_LIST_IDS = [1, 2]
+    settings.BREVO_API_CONTACT_ATTRIBUTES = {"source": "test"}
+
+    contacts = [
+        ContactData(email="alice@example.com", attributes={"first_name": "Alice"}),
+        ContactData(email="bob@example.com", list_ids=[3]),
+        ContactData(email="carol@example.com", list_ids=[2]),
+    ]
+
+    brevo_service = BrevoMarketingService()
+    responses = brevo_service.import_contacts(contacts, timeout=30)
+
+    assert responses == [{"processId": 1}, {"processId": 1}]
+    assert mock_api.import_contacts.call_count == 2
+
+    first_import, second_import = [
+        call[0][0] for call in mock_api.import_contacts.call_args_list
+    ]
+    assert first_import.list_ids == [1, 2]
+    assert first_import.update_existing_contacts is True
+    assert first_import.json_body == [
+        {
+            "email": "alice@example.com",
+            "attributes": {"source": "test", "first_name": "Alice"},
+        },
+        {"email": "carol@example.com", "attributes": {"source": "test"}},
+    ]
+    assert second_import.list_ids == [1, 2, 3]
+    assert second_import.json_body == [
+        {"email": "bob@example.com", "attributes": {"source": "test"}},
+    ]
+    assert mock_api.import_contacts.call_args[1]["_request_timeout"] == 30
+
+
+@mock.patch("brevo_python.ContactsApi")
+def test_import_contacts_api_error(mock_contact_api, settings):
+    """Test contacts import API error handling."""
+
+    mock_api = mock_contact_api.return_value
+    mock_api.import_contacts.side_effect = brevo_python.rest.ApiException()
+
+    settings.BREVO_API_KEY = "test-api-key"
+    settings.BREVO_API_CONTACT_LIST_IDS = [1, 2]
+
+    brevo_service = BrevoMarketingService()
+
+    with pytest.raises(ContactCreationError, match="Failed to import contacts"):
+        brevo_service.import_contacts([ContactData(email="test@example.com")])
+
+
+@pytest.mark.parametrize(
+    "status, is_rejected",
+    [(400, True), (404, True), (408, False), (429, False), (500, False), (503, False)],
+)
+@mock.patch("brevo_python.ContactsApi")
+def test_import_contacts_rejected(mock_contact_api, settings, status, is_rejected):
+    """Only client errors, other than timeouts and rate limits, should be permanent."""
+    mock_api = mock_contact_api.return_value
+    mock_api.import_contacts.side_effect = brevo_python.rest.ApiException(status=status)
+
+    settings.BREVO_API_KEY = "test-api-key"
+    settings.BREVO_API_CONTACT_LIST_IDS = [1, 2]
+
+    brevo_service = BrevoMarketingService()
+
+    with pytest.raises(ContactCreationError) as excinfo:
+        brevo_service.import_contacts([ContactData(email="test@example.com")])
+    assert isinstance(excinfo.value, ContactRejectedError) is is_rejected
+
+
+@mock.patch("brevo_python.ContactsApi")
+def test_import_contacts_timeout_error(mock_contact_api, settings):
+    """Timeouts of contacts imports should be transient errors."""
+    mock_api = mock_contact_api.return_value
+    mock_api.import_contacts.side_effect = urllib3.exceptions.ReadTimeoutError(
+        None, None, "Read timed out."
+    )
+
+    settings.BREVO_API_KEY = "test-api-key"
+    settings.BREVO_API_CONTACT_LIST_IDS = [1, 2]
+
+    brevo_service = BrevoMarketingService()
+
+    with pytest.raises(ContactCreationError) as excinfo:
+        brevo_service.import_contacts([ContactData(email="test@example.com")])
+    assert not isinstance(excinfo.value, ContactRejectedError)
+
+
+@pytest.fixture
+def mock_marketing_service():
+    """Mock the configured marketing service."""
+    with mock.patch(
+        "core.services.marketing.get_marketing_service"
+    ) as mock_get_marketing_service:
+        yield mock_get_marketing_service.return_value
+
+
+def test_marketing_sync_enqueue_schedules_once():
+    """A sync should be scheduled for the first queued contact, not the next ones."""
+    service = MarketingSyncService()
+
+    assert service.enqueue(ContactData(email="alice@example.com")) is True
+    assert service.enqueue(ContactData(email="bob@example.com")) is False
+
+
+def test_marketing_sync_by_batches(mock_marketing_service, settings):
+    """Queued contacts should be imported by batches, in order, then dequeued."""
+    settings.MARKETING_SYNC_BATCH_SIZE = 2
+    service = MarketingSyncService()
+    for i in range(5):
+        service.enqueue(ContactData(email=f"user{i:d}@example.com"))
+
+    assert service.sync() == 5
+
+    batches = [
+        [contact.email for contact in call[0][0]]
+        for call in mock_marketing_service.import_contacts.call_args_list
+    ]
+    assert batches == [
+        ["user0@example.com", "user1@example.com"],
+        ["user2@example.com", "user3@example.com"],
+        ["user4@example.com"],
+    ]
+    assert service.sync() == 0
+    assert mock_marketing_service.import_contacts.call_count == 3
+
+
+def test_marketing_sync_keeps_failed_contacts(mock_marketing_service, settings):
+    """Contacts which failed to be imported should be kept for the next sync."""
+    settings.MARKETING_SYNC_BATCH_SIZE = 2
+    service = MarketingSyncService()
+    for i in range(3):
+        service.enqueue(ContactData(email=f"user{i:d}@example.com"))
+
+    mock_marketing_service.import_contacts.side_effect = [None, ContactCreationError]
+    with pytest.raises(ContactCreationError):
+        service.sync()
+
+    mock_marketing_service.import_contacts.side_effect = None
+    mock_marketing_service.import_contacts.reset_mock()
+
+    assert service.sync() == 1
+    mock_marketing_service.import_contacts.assert_called_once_with(
+        [ContactData(email="user2@example.com")], timeout=settings.BREVO_IMPORT_TIMEOUT
+    )
+
+
+def test_marketing_sync_in_progress(mock_marketing_service):
+    """Only one worker at a time should sync contacts."""
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="alice@example.com"))
+
+    with mock.patch("core.services.marketing.cache.add", return_value=False):
+        assert service.sync() == 0
+
+    mock_marketing_service.import_contacts.assert_not_called()
+
+
+def test_sync_marketing_contacts_task_retries(mock_marketing_service, settings):
+    """The sync task should be retried with an exponential backoff on failures."""
+    settings.MARKETING_SYNC_MAX_RETRIES = 2
+    MarketingSyncService().enqueue(ContactData(email="alice@example.com"))
+    mock_marketing_service.import_contacts.side_effect = [
+        ContactCreationError,
+        ContactCreationError,
+        None,
+    ]
+
+    with mock.patch.object(
+        sync_marketing_contacts, "retry", wraps=sync_marketing_contacts.retry
+    ) as mock_retry:
+        result = sync_marketing_contacts.apply()
+
+    assert result.get() == 1
+    assert [call[1]["countdown"] for call in mock_retry.call_args_list] == [60, 120]
+
+
+def test_marketing_sync_dead_letter(mock_marketing_service, settings):
+    """The batch at the head of the queue should be moved to the dead-letter list."""
+    settings.MARKETING_SYNC_BATCH_SIZE = 2
+    service = MarketingSyncService()
+    for i in range(3):
+        service.enqueue(ContactData(email=f"user{i:d}@example.com"))
+
+    assert service.dead_letter() == 2
+
+    redis = get_redis_connection("default")
+    assert [
+        json.loads(item)["email"]
+        for item in redis.lrange(service._get_redis_key("dead-letter"), 0, -1)
+    ] == ["user0@example.com", "user1@example.com"]
+    assert service.sync() == 1
+    mock_marketing_service.import_contacts.assert_called_once_with(
+        [ContactData(email="user2@example.com")], timeout=settings.BREVO_IMPORT_TIMEOUT
+    )
+
+
+def test_marketing_sync_queue_key_prefixed():
+    """The queue should be stored under the cache key prefix, like the sync state."""
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="alice@example.com"))
+
+    redis = get_redis_connection("default")
+    assert redis.llen(cache.make_key("marketing-sync_queue")) == 1
+    assert redis.llen("marketing-sync_queue") == 0
+
+
+def test_marketing_sync_replay_dead_letter(mock_marketing_service, settings):
+    """Contacts of the dead-letter list should be queued again after the others."""
+    settings.MARKETING_SYNC_BATCH_SIZE = 1
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="rejected@example.com"))
+    service.dead_letter()
+    service.enqueue(ContactData(email="alice@example.com"))
+
+    assert service.replay_dead_letter() == 1
+
+    redis = get_redis_connection("default")
+    assert redis.llen(service._get_redis_key("dead-letter")) == 0
+    assert service.sync() == 2
+    assert [
+        call[0][0][0].email
+        for call in mock_marketing_service.import_contacts.call_args_list
+    ] == ["alice@example.com", "rejected@example.com"]
+
+
+def test_marketing_sync_replay_dead_letter_in_progress():
+    """Contacts should not be moved while a sync is in progress."""
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="rejected@example.com"))
+    service.dead_letter()
+
+    with mock.patch("core.services.marketing.cache.add", return_value=False):
+        assert service.replay_dead_letter() == 0
+
+    redis = get_redis_connection("default")
+    assert redis.llen(service._get_redis_key("dead-letter")) == 1
+
+
+@mock.patch(
+    "core.management.commands.replay_marketing_contacts.sync_marketing_contacts"
+)
+def test_replay_marketing_contacts_command(mock_task):
+    """The command should queue rejected contacts again and schedule their sync."""
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="rejected@example.com"))
+    service.dead_letter()
+    stdout = io.StringIO()
+
+    call_command("replay_marketing_contacts", stdout=stdout)
+
+    assert "1 contacts queued again." in stdout.getvalue()
+    mock_task.delay.assert_called_once_with()
+    assert get_redis_connection("default").llen(service._get_redis_key("queue")) == 1
+
+    mock_task.reset_mock()
+    call_command("replay_marketing_contacts", stdout=stdout)
+    mock_task.delay.assert_not_called()
+
+
+def test_sync_marketing_contacts_task_dead_letter(mock_marketing_service, settings):
+    """
+    A batch rejected by the marketing service should be set aside without retries,
+    and the next contacts synced by a new task.
+    """
+    settings.MARKETING_SYNC_BATCH_SIZE = 1
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="rejected@example.com"))
+    service.enqueue(ContactData(email="bob@example.com"))
+
+    def import_contacts(contacts, timeout):
+        if contacts[0].email == "rejected@example.com":
+            raise ContactRejectedError
+
+    mock_marketing_service.import_contacts.side_effect = import_contacts
+
+    with (
+        mock.patch.object(sync_marketing_contacts, "retry") as mock_retry,
+        pytest.raises(ContactRejectedError),
+    ):
+        sync_marketing_contacts.apply().get()
+
+    mock_retry.assert_not_called()
+    redis = get_redis_connection("default")
+    assert redis.llen(service._get_redis_key("queue")) == 0
+    assert [
+        json.loads(item)["email"]
+        for item in redis.lrange(service._get_redis_key("dead-letter"), 0, -1)
+    ] == ["rejected@example.com"]
+    assert mock_marketing_service.import_contacts.call_args_list[-1] == mock.call(
+        [ContactData(email="bob@example.com")], timeout=settings.BREVO_IMPORT_TIMEOUT
+    )
+
+
+def test_sync_marketing_contacts_task_transient_errors(
+    mock_marketing_service, settings
+):
+    """Contacts still failing after all retries should be kept in the queue."""
+    settings.MARKETING_SYNC_MAX_RETRIES = 1
+    service = MarketingSyncService()
+    service.enqueue(ContactData(email="alice@example.com"))
+    mock_marketing_service.import_contacts.side_effect = ContactCreationError
+
+    with pytest.raises(ContactCreationError):
+        sync_marketing_contacts.apply().get()
+
+    assert mock_marketing_service.import_contacts.call_count == 2
+    redis = get_redis_connection("default")
+    assert redis.llen(service._get_redis_key("queue")) == 1
+    assert redis.llen(service._get_redis_key("dead-letter")) == 0
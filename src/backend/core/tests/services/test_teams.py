@@ -0,0 +1,147 @@
+"""
+Test teams service.
+"""
+
+# pylint: disable=W0621,W0613
+
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+from rest_framework.test import APIClient
+
+from core import factories, models
+from core.services.teams import (
+    NoTeamProvider,
+    StaticTeamProvider,
+    TeamService,
+    get_team_provider,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class RemoteTeamProvider:
+    """Stand-in for a remote team directory, counting calls."""
+
+    cache_teams = True
+    get_teams = mock.Mock(return_value=["team1", "team2"])
+
+
+@pytest.fixture
+def clear_lru_cache():
+    """Fixture to clear the team provider cache before and after each test."""
+    get_team_provider.cache_clear()
+    yield
+    get_team_provider.cache_clear()
+
+
+@pytest.fixture
+def remote_provider(settings, clear_lru_cache):
+    """Configure the remote team provider stand-in."""
+    settings.TEAM_PROVIDER_CLASS = "core.tests.services.test_teams.RemoteTeamProvider"
+    settings.TEAMS_CACHE_TIMEOUT = 60
+    RemoteTeamProvider.get_teams.reset_mock()
+    yield RemoteTeamProvider.get_teams
+
+
+def test_get_team_provider_default(clear_lru_cache):
+    """Users should belong to no team by default."""
+    assert isinstance(get_team_provider(), NoTeamProvider)
+    assert factories.UserFactory().get_teams() == []
+
+
+def test_static_team_provider(settings, clear_lru_cache):
+    """The static provider should read teams from settings."""
+    user = factories.UserFactory()
+    settings.TEAM_PROVIDER_CLASS = "core.services.teams.StaticTeamProvider"
+    settings.TEAM_PROVIDER_STATIC_TEAMS = {user.sub: ["team1"]}
+
+    assert isinstance(get_team_provider(), StaticTeamProvider)
+    assert user.get_teams() == ["team1"]
+    assert factories.UserFactory().get_teams() == []
+
+
+def test_get_teams_memoized_on_user(remote_provider):
+    """Teams should be resolved once per user instance."""
+    user = factories.UserFactory()
+
+    assert user.get_teams() == ["team1", "team2"]
+    assert user.get_teams() == ["team1", "team2"]
+
+    remote_provider.assert_called_once_with(user)
+
+
+def test_get_teams_cached_between_requests(remote_provider):
+    """Teams from remote providers should be cached between user instances."""
+    user = factories.UserFactory()
+    assert user.get_teams() == ["team1", "team2"]
+
+    assert models.User.objects.get(pk=user.pk).get_teams() == ["team1", "team2"]
+
+    remote_provider.assert_called_once()
+    assert cache.get(f"user-teams_{user.pk!s}") == ["team1", "team2"]
+
+
+def test_get_teams_cache_disabled(remote_provider, settings):
+    """Teams should be resolved for each user instance if caching is disabled."""
+    settings.TEAMS_CACHE_TIMEOUT = 0
+    user = factories.UserFactory()
+
+    assert user.get_teams() == ["team1", "team2"]
+    assert models.User.objects.get(pk=user.pk).get_teams() == ["team1", "team2"]
+
+    assert remote_provider.call_count == 2
+    assert cache.get(f"user-teams_{user.pk!s}") is None
+
+
+def test_get_teams_invalidate(remote_provider):
+    """Invalidating the teams of a user should resolve them again."""
+    user = factories.UserFactory()
+    assert user.get_teams() == ["team1", "team2"]
+
+    remote_provider.return_value = ["team3"]
+    TeamService().invalidate(user)
+
+    assert user.get_teams() == ["team3"]
+    assert models.User.objects.get(pk=user.pk).get_teams() == ["team3"]
+    assert remote_provider.call_count == 2
+
+    remote_provider.return_value = ["team1", "team2"]
+
+
+@pytest.mark.parametrize(
+    "provider",
+    ["core.services.teams.NoTeamProvider", "core.services.teams.StaticTeamProvider"],
+)
+def test_get_teams_invalidate_not_cached(provider, settings, clear_lru_cache):
+    """Invalidating teams not cached between requests should not reach the cache."""
+    settings.TEAM_PROVIDER_CLASS = provider
+    user = factories.UserFactory()
+    user.get_teams()
+
+    with mock.patch("core.services.teams.local_cache") as mock_local_cache:
+        TeamService().invalidate(user)
+
+    mock_local_cache.delete.assert_not_called()
+    assert "_teams_memo" not in user.__dict__
+
+
+def test_recordings_list_resolves_teams_once(
+    remote_provider, django_assert_num_queries
+):
+    """Listing recordings should resolve teams once, whatever their number."""
+    user = factories.UserFactory()
+    factories.TeamRecordingAccessFactory.create_batch(
+        3, team="team1", role="administrator"
+    )
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.get("/api/v1.0/recordings/")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 3
+    remote_provider.assert_called_once()
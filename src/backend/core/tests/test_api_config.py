@@ -0,0 +1,92 @@
+"""
+Test the frontend configuration endpoint in the Meet core app.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+import json
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from core import api
+
+
+@pytest.fixture(autouse=True)
+def clear_frontend_configuration():
+    """Serialize the frontend configuration again for each test."""
+    api.get_frontend_configuration_content.cache_clear()
+    yield
+    api.get_frontend_configuration_content.cache_clear()
+
+
+def test_api_config_anonymous(settings):
+    """Anonymous users should get the frontend configuration, cacheable with an ETag."""
+    settings.FRONTEND_CONFIGURATION = {"analytics": {"id": "123"}}
+    settings.FRONTEND_CONFIGURATION_MAX_AGE = 120
+
+    response = APIClient().get("/api/v1.0/config/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert response["Cache-Control"] == "public, max-age=120"
+    assert response["ETag"].startswith('"') and response["ETag"].endswith('"')
+    content = json.loads(response.content)
+    assert content["analytics"] == {"id": "123"}
+    assert content["LANGUAGE_CODE"] == settings.LANGUAGE_CODE
+    assert content["recording"]["available_modes"] == list(
+        settings.RECORDING_WORKER_CLASSES.keys()
+    )
+
+
+def test_api_config_not_modified():
+    """A matching ETag should be revalidated with a 304 response, keeping cache headers."""
+    etag = APIClient().get("/api/v1.0/config/")["ETag"]
+
+    response = APIClient().get("/api/v1.0/config/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+    assert response["Cache-Control"] == "public, max-age=60"
+
+
+def test_api_config_stale_etag():
+    """A stale ETag should get the full configuration."""
+    response = APIClient().get("/api/v1.0/config/", HTTP_IF_NONE_MATCH='"stale"')
+
+    assert response.status_code == 200
+    assert json.loads(response.content)["LANGUAGE_CODE"]
+
+
+def test_api_config_serialized_once():
+    """The configuration should only be serialized once, not on each request."""
+    with mock.patch.object(
+        api.JSONRenderer, "render", wraps=api.JSONRenderer().render
+    ) as mock_render:
+        first = APIClient().get("/api/v1.0/config/")
+        second = APIClient().get("/api/v1.0/config/")
+
+    assert mock_render.call_count == 1
+    assert first.content == second.content
+    assert first["ETag"] == second["ETag"]
+
+
+def test_api_config_settings_changed(settings):
+    """Changing settings should change the configuration served and its ETag."""
+    first = APIClient().get("/api/v1.0/config/")
+
+    settings.FRONTEND_CONFIGURATION = {"feedback": {"url": "https://acme.com"}}
+    second = APIClient().get("/api/v1.0/config/")
+
+    assert json.loads(second.content)["feedback"] == {"url": "https://acme.com"}
+    assert second["ETag"] != first["ETag"]
+
+
+@pytest.mark.parametrize("method", ["post", "put", "patch", "delete"])
+def test_api_config_unsafe_methods(method):
+    """Only safe methods should be allowed on the frontend configuration."""
+    response = getattr(APIClient(), method)("/api/v1.0/config/")
+
+    assert response.status_code == 405
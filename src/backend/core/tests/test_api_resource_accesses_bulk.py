@@ -0,0 +1,302 @@
+"""
+Test the bulk resource accesses API endpoint in the Meet core app.
+"""
+
+import pytest
+from rest_framework.test import APIClient
+
+from ..factories import RoomFactory, UserFactory, UserResourceAccessFactory
+from ..models import ResourceAccess
+
+pytestmark = pytest.mark.django_db
+
+BULK_URL = "/api/v1.0/resource-accesses/bulk/"
+
+
+def get_roles(room):
+    """Return the role of each user on a room."""
+    return dict(
+        ResourceAccess.objects.filter(resource=room).values_list("user_id", "role")
+    )
+
+
+def test_api_resource_accesses_bulk_anonymous():
+    """Anonymous users should not be allowed to bulk update accesses."""
+    room = RoomFactory()
+
+    response = APIClient().post(
+        BULK_URL,
+        {
+            "resource": str(room.id),
+            "accesses": [{"user": str(UserFactory().id), "role": "member"}],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 401
+    assert not ResourceAccess.objects.exists()
+
+
+@pytest.mark.parametrize("role", [None, "member"])
+def test_api_resource_accesses_bulk_not_administrator(role):
+    """Users who are not administrator or owner of a room can't manage its accesses."""
+    user = UserFactory()
+    room = RoomFactory()
+    owner = UserResourceAccessFactory(resource=room, role="owner").user
+    if role:
+        UserResourceAccessFactory(resource=room, user=user, role=role)
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        BULK_URL,
+        {
+            "resource": str(room.id),
+            "accesses": [{"user": str(UserFactory().id), "role": "member"}],
+            "deleted_users": [str(owner.id)],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 403
+    assert response.json() == {
+        "detail": "You must be administrator or owner of a room to add accesses to it."
+    }
+    assert ResourceAccess.objects.filter(resource=room).count() == (2 if role else 1)
+
+
+def test_api_resource_accesses_bulk_upsert_and_delete(django_assert_max_num_queries):
+    """
+    Owners should be able to create, update and delete many accesses at once, with
+    a number of queries independent of the number of accesses.
+    """
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    updated = UserResourceAccessFactory.create_batch(3, resource=room, role="member")
+    deleted = UserResourceAccessFactory.create_batch(3, resource=room, role="member")
+    new_users = UserFactory.create_batch(20)
+    other_access = UserResourceAccessFactory(user=deleted[0].user)
+
+    client = APIClient()
+    client.force_login(user)
+
+    with django_assert_max_num_queries(10):
+        response = client.post(
+            BULK_URL,
+            {
+                "resource": str(room.id),
+                "accesses": [
+                    {"user": str(access.user_id), "role": "administrator"}
+                    for access in updated
+                ]
+                + [
+                    {"user": str(new_user.id), "role": "member"}
+                    for new_user in new_users
+                ],
+                "deleted_users": [str(access.user_id) for access in deleted],
+            },
+            format="json",
+        )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["deleted"] == 3
+    assert len(content["accesses"]) == 23
+    assert [access["id"] for access in content["accesses"][:3]] == [
+        str(access.id) for access in updated
+    ]
+
+    assert get_roles(room) == {
+        user.id: "owner",
+        **{access.user_id: "administrator" for access in updated},
+        **{new_user.id: "member" for new_user in new_users},
+    }
+    assert ResourceAccess.objects.filter(pk=other_access.pk).exists()
+
+
+def test_api_resource_accesses_bulk_administrator():
+    """Administrators should be able to manage accesses other than owners."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "administrator")])
+    owner = UserResourceAccessFactory(resource=room, role="owner").user
+    other = UserResourceAccessFactory(resource=room, role="administrator").user
+    new_user = UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        BULK_URL,
+        {
+            "resource": str(room.id),
+            "accesses": [
+                {"user": str(new_user.id), "role": "administrator"},
+                {"user": str(owner.id), "role": "owner"},
+            ],
+            "deleted_users": [str(other.id)],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert get_roles(room) == {
+        user.id: "administrator",
+        owner.id: "owner",
+        new_user.id: "administrator",
+    }
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"accesses": [{"user": "new", "role": "owner"}]},
+        {"accesses": [{"user": "owner", "role": "administrator"}]},
+    ],
+)
+def test_api_resource_accesses_bulk_administrator_owners(payload):
+    """Administrators should not be allowed to assign or change owner roles."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "administrator")])
+    users = {
+        "new": UserFactory(),
+        "owner": UserResourceAccessFactory(resource=room, role="owner").user,
+    }
+    for access in payload["accesses"]:
+        access["user"] = str(users[access["user"]].id)
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        BULK_URL, {"resource": str(room.id), **payload}, format="json"
+    )
+
+    assert response.status_code == 403
+    assert response.json() == {
+        "detail": "Only owners of a room can assign other users as owners."
+    }
+    assert get_roles(room) == {user.id: "administrator", users["owner"].id: "owner"}
+
+
+def test_api_resource_accesses_bulk_delete_other_owner():
+    """Owners should only be allowed to remove their own owner access."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    other_owner = UserResourceAccessFactory(resource=room, role="owner").user
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        BULK_URL,
+        {"resource": str(room.id), "deleted_users": [str(other_owner.id)]},
+        format="json",
+    )
+
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Owners can only remove their own access."}
+    assert get_roles(room) == {user.id: "owner", other_owner.id: "owner"}
+
+
+def test_api_resource_accesses_bulk_hand_over_ownership():
+    """An owner should be able to hand over ownership and leave in the same batch."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    new_owner = UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        BULK_URL,
+        {
+            "resource": str(room.id),
+            "accesses": [{"user": str(new_owner.id), "role": "owner"}],
+            "deleted_users": [str(user.id)],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert get_roles(room) == {new_owner.id: "owner"}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"deleted_users": ["user"]},
+        {"accesses": [{"user": "user", "role": "member"}]},
+    ],
+)
+def test_api_resource_accesses_bulk_last_owner(payload):
+    """The batch should be rejected as a whole if it would leave no owner."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    member = UserResourceAccessFactory(resource=room, role="member").user
+    new_user = UserFactory()
+    payload = {
+        "accesses": [{"user": str(new_user.id), "role": "member"}]
+        + [{**access, "user": str(user.id)} for access in payload.get("accesses", [])],
+        "deleted_users": [str(member.id)]
+        + [str(user.id) for _ in payload.get("deleted_users", [])],
+    }
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        BULK_URL, {"resource": str(room.id), **payload}, format="json"
+    )
+
+    assert response.status_code == 403
+    assert response.json() == {"detail": "A resource should keep at least one owner."}
+    assert get_roles(room) == {user.id: "owner", member.id: "member"}
+
+
+def test_api_resource_accesses_bulk_invalid():
+    """Duplicated, overlapping or unknown users should be rejected."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    other = UserFactory()
+    unknown_id = "11111111-1111-1111-1111-111111111111"
+
+    client = APIClient()
+    client.force_login(user)
+
+    def post(**payload):
+        return client.post(
+            BULK_URL, {"resource": str(room.id), **payload}, format="json"
+        )
+
+    response = post()
+    assert response.status_code == 400
+    assert response.json() == {"non_field_errors": ["No access to update or delete."]}
+
+    response = post(
+        accesses=[
+            {"user": str(other.id), "role": "member"},
+            {"user": str(other.id), "role": "administrator"},
+        ]
+    )
+    assert response.status_code == 400
+    assert response.json() == {"accesses": ["Each user can only appear once."]}
+
+    response = post(
+        accesses=[{"user": str(other.id), "role": "member"}],
+        deleted_users=[str(other.id)],
+    )
+    assert response.status_code == 400
+    assert response.json() == {"deleted_users": ["Each user can only appear once."]}
+
+    response = post(accesses=[{"user": unknown_id, "role": "member"}])
+    assert response.status_code == 400
+    assert response.json() == {"accesses": [f"User {unknown_id} does not exist."]}
+
+    response = post(accesses=[{"user": str(other.id), "role": "superuser"}])
+    assert response.status_code == 400
+    assert response.json() == {
+        "accesses": [{"role": ['"superuser" is not a valid choice.']}]
+    }
+
+    assert get_roles(room) == {user.id: "owner"}
@@ -0,0 +1,87 @@
+"""
+Test the query plans of resource accesses API endpoints in the Meet core app.
+"""
+
+# pylint: disable=W0621
+
+import random
+from unittest import mock
+
+from django.db import connection
+
+import pytest
+
+from ..api.viewsets import ResourceAccessViewSet
+from ..factories import UserFactory
+from ..models import Resource, ResourceAccess, RoleChoices, User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def seeded_accesses():
+    """
+    Seed a thousand resources with ten accesses each, a fifth of them being
+    administered by the same user, and analyze the table for the query planner.
+    """
+    users = User.objects.bulk_create(UserFactory.build_batch(100))
+    resources = Resource.objects.bulk_create([Resource() for _ in range(1000)])
+    user = users[0]
+    # Seeded, so that the plans and row counts are the same on each run
+    rng = random.Random(36)
+
+    accesses = []
+    for i, resource in enumerate(resources):
+        if i % 5 == 0:
+            accesses.append(
+                ResourceAccess(
+                    resource=resource,
+                    user=user,
+                    role=rng.choice(["administrator", "owner"]),
+                )
+            )
+        accesses.extend(
+            ResourceAccess(
+                resource=resource,
+                user=other_user,
+                role=rng.choice(RoleChoices.values),
+            )
+            for other_user in rng.sample(users[1:], 10)
+        )
+    ResourceAccess.objects.bulk_create(accesses)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE meet_resource_access")
+
+    return user, resources
+
+
+def test_api_room_user_accesses_list_query_plan(seeded_accesses):
+    """
+    Listing accesses should look up the resources administered by the user with an
+    EXISTS subquery on the (user, role, resource) index, without deduplicating rows.
+    """
+    user, _resources = seeded_accesses
+    view = ResourceAccessViewSet(action="list", request=mock.Mock(user=user))
+    queryset = view.get_queryset()
+
+    assert "DISTINCT" not in str(queryset.query)
+    assert "EXISTS" in str(queryset.query)
+
+    plan = queryset.explain()
+    assert "resource_access_user_role_idx" in plan
+    assert "Seq Scan on meet_resource_access u0" not in plan
+
+    assert queryset.count() == 200 * 11
+
+
+def test_api_room_user_accesses_owners_count_query_plan(seeded_accesses):
+    """Counting the owners of a resource should only scan the covering index."""
+    _user, resources = seeded_accesses
+    queryset = ResourceAccess.objects.filter(
+        resource=resources[0], role=RoleChoices.OWNER
+    )
+
+    plan = queryset.only("pk").explain()
+    assert "resource_access_role_idx" in plan
+    assert "Seq Scan" not in plan
@@ -0,0 +1,148 @@
+"""
+Test throttling of the Meet core API.
+"""
+
+# pylint: disable=W0621
+
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+
+import pytest
+from django_redis import get_redis_connection
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+
+from core import factories, utils
+from core.api.throttling import GCRAAnonRateThrottle, RequestEntryAnonRateThrottle
+from core.models import RoomAccessLevel
+
+pytestmark = pytest.mark.django_db
+
+
+class TenPerMinuteThrottle(GCRAAnonRateThrottle):
+    """Throttle allowing 10 requests per minute, one every 6 seconds."""
+
+    rate = "10/minute"
+    scope = "test"
+
+
+@pytest.fixture
+def client_ip():
+    """Return an IP address, distinct for each test to not share throttles."""
+    ip = f"10.{uuid.uuid4().int % 250:d}.{uuid.uuid4().int % 250:d}.1"
+    yield ip
+    keys = cache.keys(f"throttle_*_{ip:s}*")
+    if keys:
+        cache.delete(*keys)
+
+
+def build_request(ip, user=None):
+    """Build a request from a client IP address."""
+    request = Request(APIRequestFactory().get("/", REMOTE_ADDR=ip))
+    request.user = user or AnonymousUser()
+    return request
+
+
+def build_view(room=None):
+    """Build a view on a room."""
+    return SimpleNamespace(
+        kwargs={"pk": room}, lookup_url_kwarg=None, lookup_field="pk"
+    )
+
+
+def allow_requests(throttle_class, request, view, now, count=1):
+    """Return whether requests made at a given time are allowed."""
+    results = []
+    for _ in range(count):
+        throttle = throttle_class()
+        throttle.timer = lambda: now
+        results.append(throttle.allow_request(request, view))
+    return results
+
+
+def test_api_throttling_gcra_burst_then_interval(client_ip):
+    """A burst of the rate should be allowed, then one request per interval."""
+    request, view = build_request(client_ip), build_view()
+
+    assert (
+        allow_requests(TenPerMinuteThrottle, request, view, 1000.0, 10) == [True] * 10
+    )
+
+    throttle = TenPerMinuteThrottle()
+    throttle.timer = lambda: 1000.0
+    assert throttle.allow_request(request, view) is False
+    assert throttle.wait() == 6
+
+    assert allow_requests(TenPerMinuteThrottle, request, view, 1005.0) == [False]
+    assert allow_requests(TenPerMinuteThrottle, request, view, 1006.0, 2) == [
+        True,
+        False,
+    ]
+    # The whole burst is allowed again once the period elapsed
+    assert allow_requests(TenPerMinuteThrottle, request, view, 1066.0, 11) == [
+        True
+    ] * 10 + [False]
+
+
+def test_api_throttling_gcra_single_value(client_ip):
+    """A single timestamp should be stored per client, expiring with the period."""
+    request, view = build_request(client_ip), build_view()
+    allow_requests(TenPerMinuteThrottle, request, view, 1000.0, 5)
+
+    redis = get_redis_connection("default")
+    key = cache.make_key(f"throttle_test_{client_ip:s}")
+    assert redis.type(key) == b"string"
+    assert int(redis.get(key)) == 1030000
+    assert 0 < redis.pttl(key) <= 30000
+
+
+def test_api_throttling_gcra_authenticated(client_ip):
+    """Authenticated users should not be throttled."""
+    request = build_request(client_ip, user=factories.UserFactory())
+
+    assert (
+        allow_requests(TenPerMinuteThrottle, request, build_view(), 1000.0, 20)
+        == [True] * 20
+    )
+
+
+@pytest.mark.parametrize("per_room", [True, False])
+def test_api_throttling_request_entry_per_room(client_ip, per_room, settings):
+    """Room entry requests should be throttled per room if configured."""
+    settings.REQUEST_ENTRY_THROTTLE_PER_ROOM = per_room
+    request = build_request(client_ip)
+
+    with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, request_entry="2/minute"):
+        assert allow_requests(
+            RequestEntryAnonRateThrottle, request, build_view("room-1"), 1000.0, 3
+        ) == [True, True, False]
+        assert allow_requests(
+            RequestEntryAnonRateThrottle, request, build_view("room-2"), 1000.0
+        ) == [per_room]
+
+
+def test_api_throttling_request_entry_endpoint(client_ip):
+    """Room entry requests beyond the rate should get a 429 with a Retry-After."""
+    room = factories.RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client = APIClient(REMOTE_ADDR=client_ip)
+
+    with (
+        mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, request_entry="2/minute"),
+        mock.patch.object(utils, "notify_participants", return_value=None),
+    ):
+        responses = [
+            client.post(
+                f"/api/v1.0/rooms/{room.id!s}/request-entry/",
+                {"username": "Jane"},
+                format="json",
+            )
+            for _ in range(3)
+        ]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert 0 < int(responses[2]["Retry-After"]) <= 30
@@ -92,6 +92,89 @@ def test_api_users_list_query_email(settings):
     assert user_ids == [str(frank.id), str(nicole.id)]
 
 
+def test_api_users_list_query_ranked(settings):
+    """Users matching a search should be ranked by similarity, on email or name."""
+    settings.ALLOW_UNSECURE_USER_LISTING = True
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    factories.UserFactory(email="heywood_floyd@work.com", full_name="Heywood Floyd")
+    dave = factories.UserFactory(email="dave@work.com", full_name="David Bowman")
+    bowman = factories.UserFactory(email="bowman@work.com", full_name="Mr B")
+    bowmann = factories.UserFactory(email="bowmann@work.com", full_name="Mr Bb")
+
+    response = client.get("/api/v1.0/users/?q=bowman")
+
+    assert response.status_code == 200
+    user_ids = [user["id"] for user in response.json()["results"]]
+    assert user_ids[0] in {str(dave.id), str(bowman.id)}
+    assert set(user_ids) == {str(dave.id), str(bowman.id), str(bowmann.id)}
+    assert user_ids[-1] == str(bowmann.id)
+
+
+def test_api_users_list_query_prefix(settings):
+    """Queries too short for a trigram should match email or name prefixes."""
+    settings.ALLOW_UNSECURE_USER_LISTING = True
+    user = factories.UserFactory(email="someone@work.com", full_name="Some One")
+
+    client = APIClient()
+    client.force_login(user)
+
+    dave = factories.UserFactory(email="DAVE@work.com", full_name="David Bowman")
+    frank = factories.UserFactory(email="poole@work.com", full_name="Frank Poole")
+    factories.UserFactory(email="heywood_floyd@work.com", full_name="Heywood Floyd")
+
+    response = client.get("/api/v1.0/users/?q=da")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["results"]] == [str(dave.id)]
+
+    response = client.get("/api/v1.0/users/?q=fr")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["results"]] == [str(frank.id)]
+
+
+def test_api_users_list_query_max_results(settings):
+    """The number of users matching a search should be capped."""
+    settings.ALLOW_UNSECURE_USER_LISTING = True
+    settings.USER_SEARCH_MAX_RESULTS = 3
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    for i in range(5):
+        factories.UserFactory(email=f"poole{i:d}@work.com")
+
+    response = client.get("/api/v1.0/users/?q=poole")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 3
+    assert len(content["results"]) == 3
+    assert content["next"] is None
+
+
+def test_api_users_list_query_max_results_best_matches(settings):
+    """The best matches should be kept when more users match than the cap."""
+    settings.ALLOW_UNSECURE_USER_LISTING = True
+    settings.USER_SEARCH_MAX_RESULTS = 2
+    user = factories.UserFactory()
+
+    client = APIClient()
+    client.force_login(user)
+
+    poole = factories.UserFactory(email="poole@work.com", full_name="Mr P")
+    for i in range(5):
+        factories.UserFactory(email=f"frank.poole{i:d}@work.com", full_name="Mr F")
+
+    response = client.get("/api/v1.0/users/?q=poole@work")
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["id"] == str(poole.id)
+
+
 def test_api_users_retrieve_me_anonymous():
     """Anonymous users should not be allowed to list users."""
     factories.UserFactory.create_batch(2)
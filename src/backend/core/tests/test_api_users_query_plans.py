@@ -0,0 +1,110 @@
+"""
+Test the query plans of the users search in the Meet core app.
+
+The users table is seeded with plain SQL to reach a realistic volume. Set the
+QUERY_PLANS_SEED_SIZE environment variable, e.g. to 1000000, to check plans at
+production scale.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+import os
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from ..api.viewsets import UserViewSet
+from ..authentication.backends import OIDCAuthenticationBackend
+from ..models import User
+
+pytestmark = pytest.mark.django_db
+
+SEED_SIZE = int(os.environ.get("QUERY_PLANS_SEED_SIZE", "100000"))
+
+
+@pytest.fixture
+def seeded_users():
+    """
+    Seed users with names combined from a few first and last names, and analyze
+    the table for the query planner. Search indexes are built after inserting users,
+    like in production where they are built on an existing table.
+    """
+    search_indexes = [
+        index for index in User._meta.indexes if index.name.startswith("user_")
+    ]
+    with connection.schema_editor() as schema_editor:
+        for index in search_indexes:
+            schema_editor.remove_index(User, index)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO meet_user (
+                id, created_at, updated_at, password, is_superuser, sub, email,
+                language, timezone, is_device, is_staff, is_active, full_name
+            )
+            SELECT gen_random_uuid(), now(), now(), '!', false, 'sub-' || i,
+                first_name || '.' || last_name || i || '@example.com',
+                'en-us', 'UTC', false, false, true,
+                initcap(first_name) || ' ' || initcap(last_name)
+            FROM (
+                SELECT i,
+                    (ARRAY['alice', 'bruno', 'chloe', 'david'])[1 + i %% 4]
+                        AS first_name,
+                    (ARRAY['bowman', 'floyd', 'martin', 'poole'])[1 + i / 4 %% 4]
+                        AS last_name
+                FROM generate_series(1, %s) AS i
+            ) AS names
+            """,
+            [SEED_SIZE],
+        )
+
+    with connection.schema_editor() as schema_editor:
+        for index in search_indexes:
+            schema_editor.add_index(User, index)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE meet_user")
+
+
+@pytest.mark.parametrize("query", ["bowman", "david.bowman1234"])
+def test_api_users_search_query_plan_trigram(seeded_users, query):
+    """
+    Trigram searches should scan the trigram index of each column nearest match
+    first, up to the cap, rather than sort all the users matching a common term.
+    """
+    plan = UserViewSet._search(User.objects.all(), query).explain()
+
+    assert "Index Scan using user_email_trgm_idx" in plan
+    assert "Index Scan using user_full_name_trgm_idx" in plan
+    assert plan.count("Order By: ") == 2
+    assert "Seq Scan" not in plan
+
+
+def test_api_users_search_query_plan_prefix(seeded_users):
+    """Short queries should scan the prefix indexes in order, up to the cap."""
+    plan = UserViewSet._search(User.objects.all(), "da").explain()
+
+    assert "Index Scan using user_email_prefix_idx" in plan
+    assert "Index Scan using user_full_name_prefix_idx" in plan
+    assert "Sort Key: ((upper" not in plan
+    assert "Seq Scan" not in plan
+
+
+def test_users_oidc_lookup_query_plan(seeded_users, settings):
+    """Identifying a user by sub or email on login should only use indexes."""
+    settings.OIDC_FALLBACK_TO_EMAIL_FOR_IDENTIFICATION = True
+
+    with CaptureQueriesContext(connection) as captured:
+        OIDCAuthenticationBackend().get_existing_user(
+            "sub-42", "DAVID.Bowman42@example.com"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {captured[0]['sql']:s}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+    assert "Bitmap Index Scan on user_email_upper_idx" in plan
+    assert "Seq Scan" not in plan
@@ -0,0 +1,90 @@
+"""
+Test timing of the calls made while serving a request.
+"""
+
+from django.core.cache import cache
+
+import aiohttp
+import pytest
+from asgiref.sync import async_to_sync
+from django_redis import get_redis_connection
+from livekit.api import ListRoomsRequest  # pylint: disable=E0611
+
+from core.instrumentation import collect_timings, timed
+from core.utils import create_livekit_client, generate_s3_authorization_headers
+
+
+def test_instrumentation_timed():
+    """Calls should be timed and counted by kind, when timings are collected."""
+
+    @timed("s3")
+    def sign():
+        """Stand for a timed function."""
+
+    with timed("other"):
+        pass
+
+    with collect_timings() as timings:
+        for _ in range(2):
+            with timed("db"):
+                pass
+        sign()
+
+    assert dict(timings.counts) == {"db": 2, "s3": 1}
+    assert timings.durations["db"] >= 0
+
+
+def test_instrumentation_cache():
+    """Calls to the default cache should be timed."""
+    with collect_timings() as timings:
+        cache.set("instrumentation-test", 1)
+        cache.get("instrumentation-test")
+        cache.delete("instrumentation-test")
+
+    assert timings.counts["cache"] == 3
+
+
+def test_instrumentation_redis():
+    """Commands sent to Redis outside of the default cache should be timed."""
+    redis = get_redis_connection("default")
+    key = cache.make_key("instrumentation-test")
+
+    with collect_timings() as timings:
+        redis.rpush(key, "a", "b")
+        redis.publish(key, "pushed")
+        with redis.pipeline() as pipeline:
+            pipeline.lrange(key, 0, -1)
+            pipeline.delete(key)
+            pipeline.execute()
+
+    # Commands of a pipeline are sent at once
+    assert timings.counts["cache"] == 3
+
+
+def test_instrumentation_s3_signature():
+    """Signatures of S3 requests should be timed."""
+    with collect_timings() as timings:
+        generate_s3_authorization_headers("recording.mp4")
+
+    assert timings.counts["s3"] == 1
+
+
+def test_instrumentation_livekit(settings):
+    """Requests to LiveKit should be timed, even if they fail."""
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "key",
+        "api_secret": "secret",
+        "url": "http://127.0.0.1:1",
+    }
+
+    async def list_rooms():
+        lkapi = create_livekit_client()
+        try:
+            await lkapi.room.list_rooms(ListRoomsRequest())
+        finally:
+            await lkapi.aclose()
+
+    with collect_timings() as timings, pytest.raises(aiohttp.ClientConnectionError):
+        async_to_sync(list_rooms)()
+
+    assert timings.counts["livekit"] == 1
@@ -0,0 +1,100 @@
+"""
+Test middlewares of the Meet core app.
+"""
+
+# pylint: disable=W0621
+
+import logging
+import re
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from rest_framework.test import APIClient
+
+from core import factories
+
+pytestmark = pytest.mark.django_db
+
+
+def test_server_timing_disabled():
+    """Requests should not be timed by default."""
+    response = APIClient().get("/api/v1.0/config/")
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+
+
+def test_server_timing_database(settings, caplog):
+    """The time spent in database queries should be reported to staff and logged."""
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    user = factories.UserFactory(is_staff=True)
+    client = APIClient()
+    client.force_login(user)
+
+    with (
+        caplog.at_level(logging.INFO, logger="core.middleware"),
+        CaptureQueriesContext(connection) as queries,
+    ):
+        response = client.get("/api/v1.0/users/me/")
+
+    assert response.status_code == 200
+    metrics = dict(
+        re.match(r"(\w+);dur=[\d.]+(?:;desc=\"(\d+) calls\")?", metric).groups()
+        for metric in response["Server-Timing"].split(", ")
+    )
+    assert metrics["db"] == str(len(queries))
+    assert "total" in metrics
+
+    record = caplog.records[-1]
+    assert record.method == "GET"
+    assert record.path == "/api/v1.0/users/me/"
+    assert record.status == 200
+    assert record.db_count == len(queries)
+    assert record.db_ms <= record.total_ms
+
+
+@pytest.mark.parametrize("is_authenticated", [True, False])
+def test_server_timing_header_staff_only(settings, caplog, is_authenticated):
+    """Timings should only be logged, not returned to clients other than staff."""
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    client = APIClient()
+    if is_authenticated:
+        client.force_login(factories.UserFactory())
+
+    with caplog.at_level(logging.INFO, logger="core.middleware"):
+        response = client.get("/api/v1.0/users/me/")
+
+    assert "Server-Timing" not in response
+    (record,) = [r for r in caplog.records if r.name == "core.middleware"]
+    assert record.path == "/api/v1.0/users/me/"
+    assert record.total_ms >= 0
+
+
+def test_server_timing_cache(settings):
+    """The time spent in cache calls, e.g. to throttle requests, should be reported."""
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    settings.SERVER_TIMING_HEADER = True
+
+    response = APIClient().post(
+        "/api/v1.0/rooms/creation-callback/", {"callback_id": "unknown"}
+    )
+
+    assert response.status_code == 200
+    assert re.search(
+        r"(^|, )cache;dur=[\d.]+;desc=\"\d+ calls\"", response["Server-Timing"]
+    )
+
+
+@pytest.mark.parametrize("draw, is_timed", [(0.24, True), (0.25, False)])
+def test_server_timing_sample_rate(settings, draw, is_timed):
+    """Only the configured share of requests should be timed."""
+    settings.SERVER_TIMING_SAMPLE_RATE = 0.25
+    settings.SERVER_TIMING_HEADER = True
+
+    with mock.patch("core.middleware.random.random", return_value=draw):
+        response = APIClient().get("/api/v1.0/config/")
+
+    assert ("Server-Timing" in response) is is_timed
@@ -0,0 +1,60 @@
+"""
+Unit tests for the BaseModel abstract model
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+from freezegun import freeze_time
+
+from core import factories
+from core.models import uuid7
+
+pytestmark = pytest.mark.django_db
+
+
+def test_models_base_uuid7_format():
+    """Generated ids should be valid version 7 UUIDs embedding the current time."""
+    with (
+        freeze_time("2025-03-10 12:34:56.500"),
+        mock.patch("core.models._uuid7_last_timestamp", 0),
+    ):
+        value = uuid7()
+
+    assert isinstance(value, uuid.UUID)
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(
+        milliseconds=value.int >> 80
+    ) == datetime(2025, 3, 10, 12, 34, 56, 500000, tzinfo=timezone.utc)
+
+
+def test_models_base_uuid7_ordered():
+    """Successive ids should be unique and sorted in creation order."""
+    values = [uuid7() for _ in range(1000)]
+
+    assert len(set(values)) == 1000
+    assert values == sorted(values)
+
+
+def test_models_base_uuid7_ordered_same_time():
+    """Ids generated while the clock did not move should still be increasing."""
+    with (
+        freeze_time("2025-03-10 12:34:56.500"),
+        mock.patch("core.models._uuid7_last_timestamp", 0),
+    ):
+        values = [uuid7() for _ in range(3)]
+
+    assert values == sorted(values)
+    assert [value.int >> 64 & 0xFFF for value in values] == [0, 1, 2]
+    assert len({value.int >> 80 for value in values}) == 1
+
+
+def test_models_base_uuid7_primary_key():
+    """Models should be created with time-ordered primary keys."""
+    first, second = factories.UserFactory.create_batch(2)
+
+    assert first.id.version == 7
+    assert str(first.id) < str(second.id)
@@ -183,6 +183,26 @@ def test_models_rooms_is_public_property():
     assert private_room.is_public is False
 
 
+@pytest.mark.parametrize(
+    "access_level, anonymous, authenticated, member",
+    [
+        (RoomAccessLevel.PUBLIC, True, True, True),
+        (RoomAccessLevel.TRUSTED, False, True, True),
+        (RoomAccessLevel.RESTRICTED, False, False, True),
+    ],
+)
+def test_models_rooms_can_join(access_level, anonymous, authenticated, member):
+    """Users may join a room directly depending on its access level and their role."""
+    room = RoomFactory(access_level=access_level)
+    user = UserFactory()
+    room_member = UserFactory()
+    room.accesses.create(user=room_member, role="member")
+
+    assert room.can_join(AnonymousUser()) is anonymous
+    assert room.can_join(user) is authenticated
+    assert room.can_join(room_member) is member
+
+
 @mock.patch.object(Room, "generate_unique_pin_code")
 def test_telephony_disabled_skips_pin_generation(
     mock_generate_unique_pin_code, settings
@@ -347,3 +367,19 @@ def test_pin_generation_upper_bound(mock_randbelow, settings):
 
     # Assert called with the right exclusive upper bound, 10^5
     mock_randbelow.assert_called_with(100000)
+
+
+def test_models_rooms_access_rights_memoized(django_assert_num_queries):
+    """A role memoized on the room should be used for the same user only."""
+    user = UserFactory()
+    other_user = UserFactory()
+    room = RoomFactory(users=[(user, "member"), (other_user, "member")])
+
+    room.set_role(user, "owner")
+
+    with django_assert_num_queries(0):
+        assert room.get_role(user) == "owner"
+        assert room.is_administrator_or_owner(user) is True
+        assert room.is_owner(user) is True
+    with django_assert_num_queries(1):
+        assert room.get_role(other_user) == "member"
@@ -2,59 +2,83 @@
 Test utils functions
 """
 
+import hashlib
+import hmac
 import json
+import random
 from unittest import mock
+from uuid import NAMESPACE_URL, uuid4, uuid5
 
-import pytest
-from livekit.api import TwirpError
-
-from core.utils import NotificationError, create_livekit_client, notify_participants
-
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.storage import default_storage
+from django.test import override_settings
 
-@mock.patch("asyncio.get_running_loop")
-@mock.patch("core.utils.LiveKitAPI")
+import botocore
+import pytest
+from asgiref.sync import async_to_sync
+from freezegun import freeze_time
+from livekit.api import AccessToken, TwirpError, VideoGrants
+
+from core.utils import (
+    LiveKitTokenMinter,
+    NotificationError,
+    S3SigV4Signer,
+    TokenRateLimitExceeded,
+    check_token_rate_limit,
+    create_livekit_client,
+    generate_color,
+    generate_s3_authorization_headers,
+    generate_token,
+    notify_participants,
+)
+
+
+@mock.patch("core.utils.aiohttp.TCPConnector")
+@mock.patch("core.utils.aiohttp.ClientSession")
+@mock.patch("core.utils.LiveKitClient")
 def test_create_livekit_client_ssl_enabled(
-    mock_livekit_api, mock_get_running_loop, settings
+    mock_livekit_client, mock_client_session, mock_connector, settings
 ):
     """Test LiveKitAPI client creation with SSL verification enabled."""
-    mock_get_running_loop.return_value = mock.MagicMock()
     settings.LIVEKIT_VERIFY_SSL = True
 
     create_livekit_client()
 
-    mock_livekit_api.assert_called_once_with(
-        **settings.LIVEKIT_CONFIGURATION, session=None
+    mock_connector.assert_not_called()
+    assert mock_client_session.call_args.kwargs["connector"] is None
+    mock_livekit_client.assert_called_once_with(
+        **settings.LIVEKIT_CONFIGURATION, session=mock_client_session.return_value
     )
 
 
+@mock.patch("core.utils.aiohttp.TCPConnector")
 @mock.patch("core.utils.aiohttp.ClientSession")
-@mock.patch("asyncio.get_running_loop")
-@mock.patch("core.utils.LiveKitAPI")
+@mock.patch("core.utils.LiveKitClient")
 def test_create_livekit_client_ssl_disabled(
-    mock_livekit_api, mock_get_running_loop, mock_client_session, settings
+    mock_livekit_client, mock_client_session, mock_connector, settings
 ):
     """Test LiveKitAPI client creation with SSL verification disabled."""
-    mock_get_running_loop.return_value = mock.MagicMock()
-    mock_session_instance = mock.MagicMock()
-    mock_client_session.return_value = mock_session_instance
     settings.LIVEKIT_VERIFY_SSL = False
 
     create_livekit_client()
 
-    mock_livekit_api.assert_called_once_with(
-        **settings.LIVEKIT_CONFIGURATION, session=mock_session_instance
+    mock_connector.assert_called_once_with(ssl=False)
+    assert (
+        mock_client_session.call_args.kwargs["connector"] is mock_connector.return_value
+    )
+    mock_livekit_client.assert_called_once_with(
+        **settings.LIVEKIT_CONFIGURATION, session=mock_client_session.return_value
     )
 
 
-@mock.patch("asyncio.get_running_loop")
-@mock.patch("core.utils.LiveKitAPI")
+@mock.patch("core.utils.aiohttp.ClientSession")
+@mock.patch("core.utils.LiveKitClient")
 def test_create_livekit_client_custom_configuration(
-    mock_livekit_api, mock_get_running_loop, settings
+    mock_livekit_client, mock_client_session, settings
 ):
     """Test LiveKitAPI client creation with custom configuration."""
     settings.LIVEKIT_VERIFY_SSL = True
 
-    mock_get_running_loop.return_value = mock.MagicMock()
     custom_configuration = {
         "api_key": "mock_key",
         "api_secret": "mock_secret",
@@ -63,7 +87,23 @@ def test_create_livekit_client_custom_configuration(
 
     create_livekit_client(custom_configuration)
 
-    mock_livekit_api.assert_called_once_with(**custom_configuration, session=None)
+    mock_livekit_client.assert_called_once_with(
+        **custom_configuration, session=mock_client_session.return_value
+    )
+
+
+@pytest.mark.parametrize("verify_ssl", [True, False])
+def test_create_livekit_client_closes_session(verify_ssl, settings):
+    """Closing the client should close its HTTP session, timed by a trace config."""
+    settings.LIVEKIT_VERIFY_SSL = verify_ssl
+
+    async def create_and_close():
+        lkapi = create_livekit_client()
+        assert len(lkapi.http_session.trace_configs) == 1
+        await lkapi.aclose()
+        return lkapi.http_session
+
+    assert async_to_sync(create_and_close)().closed is True
 
 
 @mock.patch("core.utils.create_livekit_client")
@@ -166,3 +206,236 @@ def test_notify_participants_success(mock_create_livekit_client):
 
     # Verify aclose was called
     mock_api_instance.aclose.assert_called_once()
+
+
+# pylint: disable=protected-access
+
+
+def sign_with_botocore(key, credentials):
+    """Sign a GET-object request with botocore, as a reference implementation."""
+    url = default_storage.unsigned_connection.meta.client.generate_presigned_url(
+        "get_object",
+        ExpiresIn=0,
+        Params={"Bucket": default_storage.bucket_name, "Key": key},
+    )
+    request = botocore.awsrequest.AWSRequest(method="get", url=url)
+    region = default_storage.connection.meta.client.meta.region_name
+    botocore.auth.S3SigV4Auth(
+        credentials.get_frozen_credentials(), "s3", region
+    ).add_auth(request)
+    return dict(request.headers.items())
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "recordings/3f8e1ab5-3b1c-4a5e-9b2a-4d3f0c6b7e21.mp4",
+        "recordings/with space+plus/é~tilde.ogg",
+    ],
+)
+@freeze_time("2025-03-10 12:34:56")
+def test_s3_signer_matches_botocore(key):
+    """The signer should produce the exact same headers as botocore."""
+    signer = S3SigV4Signer(default_storage)
+    credentials = signer._credentials
+
+    assert signer.sign(key) == sign_with_botocore(key, credentials)
+    assert list(signer.sign(key)) == list(sign_with_botocore(key, credentials))
+
+
+@freeze_time("2025-03-10 12:34:56")
+def test_s3_signer_matches_botocore_session_token():
+    """Temporary credentials should sign the security token like botocore."""
+    credentials = botocore.credentials.Credentials(
+        "access-key", "secret-key", "session-token"
+    )
+    signer = S3SigV4Signer(default_storage)
+    signer._credentials = credentials
+
+    headers = signer.sign("recordings/file.mp4")
+
+    assert headers["X-Amz-Security-Token"] == "session-token"
+    assert headers == sign_with_botocore("recordings/file.mp4", credentials)
+    assert list(headers) == list(sign_with_botocore("recordings/file.mp4", credentials))
+
+
+def test_s3_signer_signing_key_cached_per_day():
+    """The derived signing key should only be computed once a day."""
+    signer = S3SigV4Signer(default_storage)
+
+    with (
+        freeze_time("2025-03-10 00:00:01"),
+        mock.patch("core.utils.hmac.new", wraps=hmac.new) as mock_hmac,
+    ):
+        signer.sign("recordings/file.mp4")
+        assert mock_hmac.call_count == 5
+
+        mock_hmac.reset_mock()
+        signer.sign("recordings/other-file.mp4")
+        assert mock_hmac.call_count == 1
+
+    with (
+        freeze_time("2025-03-11 00:00:01"),
+        mock.patch("core.utils.hmac.new", wraps=hmac.new) as mock_hmac,
+    ):
+        headers = signer.sign("recordings/file.mp4")
+        assert mock_hmac.call_count == 5
+
+        assert headers == sign_with_botocore("recordings/file.mp4", signer._credentials)
+
+
+@freeze_time("2025-03-10 12:34:56")
+def test_generate_s3_authorization_headers():
+    """Authorization headers should be signed by the default storage signer."""
+    headers = generate_s3_authorization_headers("recordings/file.mp4")
+
+    assert headers["X-Amz-Date"] == "20250310T123456Z"
+    assert headers["Authorization"].startswith(
+        "AWS4-HMAC-SHA256 Credential=meet/20250310/us-east-1/s3/aws4_request, "
+        "SignedHeaders=host;x-amz-content-sha256;x-amz-date, Signature="
+    )
+
+
+LIVEKIT_CONFIGURATION = {
+    "api_key": "api-key",
+    "api_secret": "api-secret",
+    "url": "https://livekit.example.com",
+}
+
+
+def mint_with_livekit(room, identity, name, metadata):
+    """Mint a token with livekit's AccessToken, as a reference implementation."""
+    return (
+        AccessToken(api_key="api-key", api_secret="api-secret")
+        .with_grants(VideoGrants(room=room, **LiveKitTokenMinter.PARTICIPANT_GRANTS))
+        .with_identity(identity)
+        .with_name(name)
+        .with_metadata(metadata)
+        .to_jwt()
+    )
+
+
+@pytest.mark.parametrize(
+    "room, identity, name",
+    [
+        ("8e5a2f0c-2a9b-4bb1-a6a5-6c1b3b1a5c3d", "a1b2c3", "Jane Doe"),
+        ("my-room", "a1b2c3", 'Zoë "{the} \\ ☃"'),
+        ("my-room", "a1b2c3", ""),
+    ],
+)
+@freeze_time("2025-03-10 12:34:56")
+def test_livekit_token_minter_matches_livekit(room, identity, name):
+    """The minter should produce the exact same tokens as livekit's AccessToken."""
+    minter = LiveKitTokenMinter("api-key", "api-secret")
+    metadata = json.dumps({"color": "hsl(10, 50%, 50%)"})
+
+    assert minter.mint(room, identity, name, metadata) == mint_with_livekit(
+        room, identity, name, metadata
+    )
+
+
+def test_livekit_token_minter_requires_room_and_identity():
+    """Tokens to join a room should not be minted without a room or identity."""
+    minter = LiveKitTokenMinter("api-key", "api-secret")
+
+    with pytest.raises(ValueError, match="identity and room must be set"):
+        minter.mint("", "a1b2c3", "Jane", "{}")
+    with pytest.raises(ValueError, match="identity and room must be set"):
+        minter.mint("my-room", "", "Jane", "{}")
+
+
+@override_settings(LIVEKIT_TOKEN_RATE_LIMIT=3, LIVEKIT_TOKEN_RATE_LIMIT_WINDOW=60)
+def test_check_token_rate_limit():
+    """Tokens issued for a room should be limited per time window, room by room."""
+    room = f"room-{uuid4()!s}"
+
+    with freeze_time("2025-03-10 12:00:10"):
+        for _ in range(3):
+            check_token_rate_limit(room)
+
+        with pytest.raises(TokenRateLimitExceeded) as excinfo:
+            check_token_rate_limit(room)
+        assert excinfo.value.wait == 50
+
+        check_token_rate_limit(f"room-{uuid4()!s}")
+
+    with freeze_time("2025-03-10 12:01:00"):
+        check_token_rate_limit(room)
+
+
+@override_settings(LIVEKIT_TOKEN_RATE_LIMIT=0)
+def test_check_token_rate_limit_disabled():
+    """Tokens should not be counted when the rate limit is disabled."""
+    with mock.patch("core.utils.cache") as mock_cache:
+        check_token_rate_limit("my-room")
+
+    mock_cache.incr.assert_not_called()
+
+
+@override_settings(
+    LIVEKIT_CONFIGURATION=LIVEKIT_CONFIGURATION, LIVEKIT_TOKEN_RATE_LIMIT=1
+)
+def test_generate_token_not_rate_limited():
+    """Generating tokens should not count them, which is left to the joining paths."""
+    for _ in range(3):
+        generate_token(room="my-room", user=AnonymousUser())
+
+
+def generate_color_with_global_random(identity):
+    """Generate a color by reseeding the global random generator, as it used to be."""
+    seed = int(hashlib.sha1(identity.encode("utf-8")).hexdigest(), 16) & 0xFFFF
+    random.seed(seed)
+    hue = random.randint(0, 360)
+    saturation = random.randint(50, 75)
+    lightness = random.randint(25, 60)
+    return f"hsl({hue}, {saturation}%, {lightness}%)"
+
+
+@pytest.mark.parametrize(
+    "identity, color",
+    [
+        ("", "hsl(55, 70%, 42%)"),
+        ("anonymous", "hsl(353, 61%, 36%)"),
+        ("3f8e1ab5-3b1c-4a5e-9b2a-4d3f0c6b7e21", "hsl(152, 66%, 52%)"),
+        ("john.doe@example.com", "hsl(137, 58%, 40%)"),
+        ("Zoë ☃", "hsl(252, 57%, 46%)"),
+    ],
+)
+def test_generate_color_known_identities(identity, color):
+    """Existing identities should keep their color."""
+    assert generate_color(identity) == color
+
+
+def test_generate_color_compatibility():
+    """Colors should be the ones generated by reseeding the global random generator."""
+    state = random.getstate()
+    try:
+        for i in range(5000):
+            identity = str(uuid5(NAMESPACE_URL, str(i)))
+            assert generate_color(identity) == generate_color_with_global_random(
+                identity
+            )
+    finally:
+        random.setstate(state)
+
+
+def test_generate_color_global_random_untouched():
+    """Generating a color should not reseed the global random generator."""
+    generate_color.cache_clear()
+    state = random.getstate()
+
+    generate_color(str(uuid4()))
+
+    assert random.getstate() == state
+
+
+def test_generate_color_memoized():
+    """Colors of recent identities should be memoized."""
+    generate_color.cache_clear()
+    identity = str(uuid4())
+
+    with mock.patch("core.utils.hashlib.sha1", wraps=hashlib.sha1) as mock_sha1:
+        color = generate_color(identity)
+        assert generate_color(identity) == color
+
+    mock_sha1.assert_called_once()
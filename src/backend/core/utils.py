@@ -4,17 +4,24 @@ Utils functions used in the core app
 
 # ruff: noqa:S311
 
+import base64
+import calendar
 import hashlib
+import hmac
 import json
 import random
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import quote, urlsplit
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage
 
 import aiohttp
-import botocore
 from asgiref.sync import async_to_sync
 from livekit.api import (  # pylint: disable=E0611
     AccessToken,
@@ -24,30 +31,174 @@ from livekit.api import (  # pylint: disable=E0611
     TwirpError,
     VideoGrants,
 )
+from livekit.api.access_token import DEFAULT_TTL
+from rest_framework import exceptions as drf_exceptions
 
+from core.instrumentation import get_livekit_trace_config, timed
 
+# Hash of an empty payload, signed for GET requests on the object storage
+EMPTY_SHA256_HASH = hashlib.sha256(b"").hexdigest()
+
+# Validity of LiveKit access tokens in seconds
+LIVEKIT_TOKEN_TTL = int(DEFAULT_TTL.total_seconds())
+
+
+@lru_cache(maxsize=4096)
 def generate_color(identity: str) -> str:
     """Generates a consistent HSL color based on a given identity string.
 
-    The function seeds the random generator with the identity's hash,
+    The function seeds a random generator with the identity's hash,
     ensuring consistent color output. The HSL format allows fine-tuned control
     over saturation and lightness, empirically adjusted to produce visually
     appealing and distinct colors. HSL is preferred over hex to constrain the color
     range and ensure predictability.
+
+    A dedicated generator is used so that the global one is left untouched, and the
+    colors of recent identities are memoized.
     """
 
     # ruff: noqa:S324
-    identity_hash = hashlib.sha1(identity.encode("utf-8"))
+    identity_hash = hashlib.sha1(identity.encode("utf-8")).digest()
     # Keep only hash's last 16 bits, collisions are not a concern
-    seed = int(identity_hash.hexdigest(), 16) & 0xFFFF
-    random.seed(seed)
-    hue = random.randint(0, 360)
-    saturation = random.randint(50, 75)
-    lightness = random.randint(25, 60)
+    generator = random.Random(int.from_bytes(identity_hash[-2:], "big"))
+    hue = generator.randint(0, 360)
+    saturation = generator.randint(50, 75)
+    lightness = generator.randint(25, 60)
 
     return f"hsl({hue}, {saturation}%, {lightness}%)"
 
 
+def base64url_encode(data: bytes) -> bytes:
+    """Encode bytes in unpadded url-safe base64, as in JSON Web Tokens."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+class LiveKitTokenMinter:
+    """Mint LiveKit access tokens for participants joining a room.
+
+    This produces the same JWTs as livekit's `AccessToken` granted with
+    `PARTICIPANT_GRANTS`, but the claims are serialized once into a template in which
+    only the room, the participant and the validity dates are substituted, and the
+    HMAC key is prepared once, instead of building and serializing grants for each
+    token.
+    """
+
+    PARTICIPANT_GRANTS = {
+        "room_join": True,
+        "room_admin": True,
+        "can_update_own_metadata": True,
+        "can_publish_sources": [
+            "camera",
+            "microphone",
+            "screen_share",
+            "screen_share_audio",
+        ],
+    }
+    PLACEHOLDERS = ("room", "sub", "name", "metadata", "nbf", "exp")
+
+    def __init__(self, api_key: str, api_secret: str):
+        self._header = base64url_encode(
+            json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode()
+        )
+        self._hmac = hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+        # Empty claims are left out of tokens, so the name needs its own template
+        self._templates = {
+            True: self._build_template(api_key, api_secret, with_name=True),
+            False: self._build_template(api_key, api_secret, with_name=False),
+        }
+
+    @classmethod
+    def _build_template(cls, api_key: str, api_secret: str, with_name: bool) -> str:
+        """Serialize the claims of a token with placeholders for variable values."""
+        placeholders = {key: f"\x00{key:s}\x00" for key in cls.PLACEHOLDERS}
+
+        token = (
+            AccessToken(api_key=api_key, api_secret=api_secret)
+            .with_grants(
+                VideoGrants(room=placeholders["room"], **cls.PARTICIPANT_GRANTS)
+            )
+            .with_metadata(placeholders["metadata"])
+        )
+        if with_name:
+            token.with_name(placeholders["name"])
+
+        claims = token.claims.asdict()
+        claims.update(
+            {
+                "sub": placeholders["sub"],
+                "iss": api_key,
+                "nbf": placeholders["nbf"],
+                "exp": placeholders["exp"],
+            }
+        )
+
+        template = json.dumps(claims, separators=(",", ":"))
+        template = template.replace("{", "{{").replace("}", "}}")
+        for key, placeholder in placeholders.items():
+            template = template.replace(json.dumps(placeholder), f"{{{key:s}}}")
+        return template
+
+    def mint(self, room: str, identity: str, name: str, metadata: str) -> str:
+        """Return a signed access token for a participant joining a room."""
+        if not room or not identity:
+            raise ValueError("identity and room must be set when joining a room")
+
+        now = calendar.timegm(datetime.now(timezone.utc).utctimetuple())
+        payload = self._templates[bool(name)].format(
+            room=json.dumps(room),
+            sub=json.dumps(identity),
+            name=json.dumps(name),
+            metadata=json.dumps(metadata),
+            nbf=now,
+            exp=now + LIVEKIT_TOKEN_TTL,
+        )
+
+        signing_input = self._header + b"." + base64url_encode(payload.encode("utf-8"))
+        signature = self._hmac.copy()
+        signature.update(signing_input)
+
+        return (signing_input + b"." + base64url_encode(signature.digest())).decode()
+
+
+@lru_cache(maxsize=1)
+def get_livekit_token_minter(api_key: str, api_secret: str) -> LiveKitTokenMinter:
+    """Return the token minter for the given LiveKit credentials."""
+    return LiveKitTokenMinter(api_key, api_secret)
+
+
+class TokenRateLimitExceeded(drf_exceptions.Throttled):
+    """Too many LiveKit access tokens were issued for a room."""
+
+    default_detail = "Too many access tokens were requested for this room."
+
+
+def check_token_rate_limit(room: str) -> None:
+    """Count a token issued for a room and raise if the room exceeds its rate limit.
+
+    Tokens are counted by fixed windows in the cache, so that the limit is shared by
+    all processes. It is checked by the code paths joining a room, before anything is
+    written, rather than when tokens are generated, e.g. by serializers.
+    """
+    limit = settings.LIVEKIT_TOKEN_RATE_LIMIT
+    if not limit:
+        return
+
+    window = settings.LIVEKIT_TOKEN_RATE_LIMIT_WINDOW
+    now = int(time.time())
+    cache_key = f"livekit-token-rate_{room:s}_{now // window:d}"
+
+    cache.add(cache_key, 0, timeout=window)
+    try:
+        count = cache.incr(cache_key)
+    except ValueError:
+        # The window expired in between
+        cache.set(cache_key, 1, timeout=window)
+        count = 1
+
+    if count > limit:
+        raise TokenRateLimitExceeded(wait=window - now % window)
+
+
 def generate_token(
     room: str, user, username: Optional[str] = None, color: Optional[str] = None
 ) -> str:
@@ -64,19 +215,6 @@ def generate_token(
     Returns:
         str: The LiveKit JWT access token.
     """
-    video_grants = VideoGrants(
-        room=room,
-        room_join=True,
-        room_admin=True,
-        can_update_own_metadata=True,
-        can_publish_sources=[
-            "camera",
-            "microphone",
-            "screen_share",
-            "screen_share_audio",
-        ],
-    )
-
     if user.is_anonymous:
         identity = str(uuid4())
         default_username = "Anonymous"
@@ -87,18 +225,16 @@ def generate_token(
     if color is None:
         color = generate_color(identity)
 
-    token = (
-        AccessToken(
-            api_key=settings.LIVEKIT_CONFIGURATION["api_key"],
-            api_secret=settings.LIVEKIT_CONFIGURATION["api_secret"],
-        )
-        .with_grants(video_grants)
-        .with_identity(identity)
-        .with_name(username or default_username)
-        .with_metadata(json.dumps({"color": color}))
+    minter = get_livekit_token_minter(
+        settings.LIVEKIT_CONFIGURATION["api_key"],
+        settings.LIVEKIT_CONFIGURATION["api_secret"],
+    )
+    return minter.mint(
+        room=room,
+        identity=identity,
+        name=username or default_username,
+        metadata=json.dumps({"color": color}),
     )
-
-    return token.to_jwt()
 
 
 def generate_livekit_config(
@@ -123,7 +259,128 @@ def generate_livekit_config(
     }
 
 
-def generate_s3_authorization_headers(key):
+class S3SigV4Signer:
+    """Sign GET-object requests on the media storage with AWS Signature Version 4.
+
+    This is equivalent to running botocore's `S3SigV4Auth` on an unsigned GET-object
+    request, but the canonical request is built directly and the derived signing key,
+    which only depends on the secret key, the day and the region, is computed once
+    a day instead of on each call.
+    """
+
+    algorithm = "AWS4-HMAC-SHA256"
+    service_name = "s3"
+
+    def __init__(self, storage):
+        """Resolve credentials, region and object URL layout once for the storage."""
+        s3_client = storage.connection.meta.client
+        # pylint: disable=protected-access
+        self._credentials = s3_client._request_signer._credentials  # noqa: SLF001
+        self._region_name = s3_client.meta.region_name
+
+        # Let botocore resolve the addressing style and endpoint of the bucket
+        sample_key = "key"
+        sample_url = urlsplit(
+            storage.unsigned_connection.meta.client.generate_presigned_url(
+                "get_object",
+                ExpiresIn=0,
+                Params={"Bucket": storage.bucket_name, "Key": sample_key},
+            )
+        )
+        self._host = self._get_host(sample_url)
+        self._path_prefix = sample_url.path[: -len(sample_key)]
+        self._signing_key = (None, None, None)
+
+    @staticmethod
+    def _get_host(url):
+        """Compute the host header like botocore, without default ports."""
+        host = url.hostname
+        if ":" in host:
+            host = f"[{host}]"
+        if url.port is not None and url.port != {"http": 80, "https": 443}.get(
+            url.scheme
+        ):
+            host = f"{host}:{url.port}"
+        return host
+
+    def _get_signing_key(self, secret_key, datestamp):
+        """Derive the signing key, reusing it for the whole day."""
+        cached_secret_key, cached_datestamp, signing_key = self._signing_key
+        if cached_secret_key == secret_key and cached_datestamp == datestamp:
+            return signing_key
+
+        signing_key = f"AWS4{secret_key}".encode("utf-8")
+        for message in (datestamp, self._region_name, self.service_name):
+            signing_key = hmac.new(
+                signing_key, message.encode("utf-8"), hashlib.sha256
+            ).digest()
+        signing_key = hmac.new(signing_key, b"aws4_request", hashlib.sha256).digest()
+
+        self._signing_key = (secret_key, datestamp, signing_key)
+        return signing_key
+
+    @timed("s3")
+    def sign(self, key) -> dict:
+        """Return the headers authorizing a GET request on an object key."""
+        credentials = self._credentials.get_frozen_credentials()
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        datestamp = timestamp[:8]
+
+        headers = {"X-Amz-Date": timestamp}
+        canonical_headers = [
+            f"host:{self._host:s}",
+            f"x-amz-content-sha256:{EMPTY_SHA256_HASH:s}",
+            f"x-amz-date:{timestamp:s}",
+        ]
+        signed_headers = "host;x-amz-content-sha256;x-amz-date"
+        if credentials.token:
+            headers["X-Amz-Security-Token"] = credentials.token
+            canonical_headers.append(f"x-amz-security-token:{credentials.token:s}")
+            signed_headers += ";x-amz-security-token"
+        headers["X-Amz-Content-SHA256"] = EMPTY_SHA256_HASH
+
+        canonical_request = "\n".join(
+            [
+                "GET",
+                f"{self._path_prefix:s}{quote(key, safe='/~'):s}",
+                "",
+                "\n".join(canonical_headers) + "\n",
+                signed_headers,
+                EMPTY_SHA256_HASH,
+            ]
+        )
+        credential_scope = (
+            f"{datestamp:s}/{self._region_name:s}/{self.service_name:s}/aws4_request"
+        )
+        string_to_sign = "\n".join(
+            [
+                self.algorithm,
+                timestamp,
+                credential_scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+        signature = hmac.new(
+            self._get_signing_key(credentials.secret_key, datestamp),
+            string_to_sign.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+        headers["Authorization"] = (
+            f"{self.algorithm:s} "
+            f"Credential={credentials.access_key:s}/{credential_scope:s}, "
+            f"SignedHeaders={signed_headers:s}, Signature={signature:s}"
+        )
+        return headers
+
+
+@lru_cache(maxsize=1)
+def get_s3_signer() -> S3SigV4Signer:
+    """Return cached signer for the default storage."""
+    return S3SigV4Signer(default_storage)
+
+
+def generate_s3_authorization_headers(key) -> dict:
     """
     Generate authorization headers for an s3 object.
     These headers can be used as an alternative to signed urls with many benefits:
@@ -133,39 +390,41 @@ def generate_s3_authorization_headers(key):
     - access control is truly realtime
     - the object storage service does not need to be exposed on internet
     """
+    return get_s3_signer().sign(key)
 
-    url = default_storage.unsigned_connection.meta.client.generate_presigned_url(
-        "get_object",
-        ExpiresIn=0,
-        Params={"Bucket": default_storage.bucket_name, "Key": key},
-    )
 
-    request = botocore.awsrequest.AWSRequest(method="get", url=url)
+class LiveKitClient(LiveKitAPI):
+    """LiveKit API client closing the HTTP session it is created with."""
 
-    s3_client = default_storage.connection.meta.client
-    # pylint: disable=protected-access
-    credentials = s3_client._request_signer._credentials  # noqa: SLF001
-    frozen_credentials = credentials.get_frozen_credentials()
-    region = s3_client.meta.region_name
-    auth = botocore.auth.S3SigV4Auth(frozen_credentials, "s3", region)
-    auth.add_auth(request)
+    def __init__(self, session: aiohttp.ClientSession, **configuration):
+        super().__init__(session=session, **configuration)
+        self.http_session = session
 
-    return request
+    async def aclose(self):
+        """Close the client, along with its HTTP session."""
+        await super().aclose()
+        await self.http_session.close()
 
 
 def create_livekit_client(custom_configuration=None):
-    """Create and return a configured LiveKit API client."""
+    """Create and return a configured LiveKit API client.
 
-    custom_session = None
+    Its requests are timed for the Server-Timing header of the current request.
+    """
 
+    connector = None
     if not settings.LIVEKIT_VERIFY_SSL:
         connector = aiohttp.TCPConnector(ssl=False)
-        custom_session = aiohttp.ClientSession(connector=connector)
+    session = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=60),
+        trace_configs=[get_livekit_trace_config()],
+    )
 
     # Use default configuration if none provided
     configuration = custom_configuration or settings.LIVEKIT_CONFIGURATION
 
-    return LiveKitAPI(session=custom_session, **configuration)
+    return LiveKitClient(session=session, **configuration)
 
 
 class NotificationError(Exception):
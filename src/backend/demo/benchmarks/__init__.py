@@ -0,0 +1,60 @@
+"""
+Micro-benchmarks of the Meet hot paths, run with the `benchmark` management command.
+
+Each module of this package exposes a `run(iterations)` function returning a list of
+`BenchmarkResult`. Fixtures are created inside the `rollback` context manager so that
+running a benchmark leaves the database untouched.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import transaction
+
+
+class _Rollback(Exception):
+    """Raised to roll back the fixtures transaction of a benchmark."""
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput measured for a benchmarked callable."""
+
+    label: str
+    iterations: int
+    duration: float
+    details: str = ""
+
+    @property
+    def rate(self) -> float:
+        """Number of operations per second."""
+        return self.iterations / self.duration
+
+    def __str__(self):
+        return (
+            f"{self.label:s}: {self.rate:,.0f} ops/s "
+            f"({self.duration / self.iterations * 1e6:,.1f} µs/op, "
+            f"{self.iterations:d} iterations)"
+            + (f", {self.details:s}" if self.details else "")
+        )
+
+
+def measure(label, func, iterations) -> BenchmarkResult:
+    """Call `func` `iterations` times, after a warm-up call, and time it."""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return BenchmarkResult(label, iterations, time.perf_counter() - start)
+
+
+@contextmanager
+def rollback():
+    """Run a block in a transaction that is always rolled back."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback()
+    except _Rollback:
+        pass
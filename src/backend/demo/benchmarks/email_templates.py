@@ -0,0 +1,75 @@
+"""Benchmark rendering recording notifications, Django templates versus compiled."""
+
+from itertools import cycle
+
+from django.template.loader import render_to_string
+from django.utils.translation import override
+
+from core.services.mail import MailService
+
+from . import measure
+
+LANGUAGES = ["en-us", "fr-fr", "nl-nl", "de-de"]
+
+TEMPLATES = ["mail/html/screen_recording.html", "mail/text/screen_recording.txt"]
+
+CONTEXT = {
+    "brandname": "ACME",
+    "support_email": "support@acme.com",
+    "logo_img": "https://acme.com/logo.png",
+    "domain": "acme.com",
+    "recording_expiration_days": 7,
+}
+
+
+def _variables(i):
+    """Return the variables personalized for the i-th owner."""
+    return {
+        "room_name": f"Room {i:d}",
+        "link": f"https://acme.com/recordings/{i:d}",
+        "recording_date": "2025-03-10",
+        "recording_time": f"{i % 24:02d}:30",
+    }
+
+
+def _notify(render):
+    """Return a function rendering the emails of the next owner to notify.
+
+    Owners speak different languages, as in bulk notifications.
+    """
+    owners = cycle(enumerate(LANGUAGES * 25))
+
+    def notify():
+        i, language = next(owners)
+        with override(language):
+            for template_name in TEMPLATES:
+                render(template_name, _variables(i))
+
+    return notify
+
+
+def run(iterations):
+    """Measure owners notified per second, each with an HTML and a text email."""
+    results = [
+        measure(
+            "notification emails (render_to_string)",
+            _notify(
+                lambda template_name, variables: render_to_string(
+                    template_name, {**CONTEXT, **variables}
+                )
+            ),
+            iterations,
+        ),
+        measure(
+            "notification emails (compiled)",
+            _notify(
+                lambda template_name, variables: MailService.render(
+                    template_name, CONTEXT, variables
+                )
+            ),
+            iterations,
+        ),
+    ]
+    for result in results:
+        result.details = f"{result.rate * len(TEMPLATES):,.0f} renders/s"
+    return results
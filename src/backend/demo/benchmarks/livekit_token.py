@@ -0,0 +1,65 @@
+"""Benchmark LiveKit access tokens minting, livekit's AccessToken versus the minter."""
+
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import override_settings
+
+from livekit.api import AccessToken, VideoGrants  # pylint: disable=E0611
+
+from core import utils
+
+from . import measure
+
+ROOM = "8e5a2f0c-2a9b-4bb1-a6a5-6c1b3b1a5c3d"
+IDENTITY = "5c3d8e5a-2f0c-4bb1-a6a5-6c1b3b1a2a9b"
+METADATA = json.dumps({"color": utils.generate_color(IDENTITY)})
+
+
+def mint_with_livekit():
+    """Mint a token by building grants and an AccessToken."""
+    return (
+        AccessToken(
+            api_key=settings.LIVEKIT_CONFIGURATION["api_key"],
+            api_secret=settings.LIVEKIT_CONFIGURATION["api_secret"],
+        )
+        .with_grants(
+            VideoGrants(room=ROOM, **utils.LiveKitTokenMinter.PARTICIPANT_GRANTS)
+        )
+        .with_identity(IDENTITY)
+        .with_name("Anonymous")
+        .with_metadata(METADATA)
+        .to_jwt()
+    )
+
+
+def run(iterations):
+    """Measure tokens per second on one core, with and without the rate limit."""
+    minter = utils.get_livekit_token_minter(
+        settings.LIVEKIT_CONFIGURATION["api_key"],
+        settings.LIVEKIT_CONFIGURATION["api_secret"],
+    )
+    results = [
+        measure("livekit AccessToken", mint_with_livekit, iterations),
+        measure(
+            "LiveKitTokenMinter",
+            lambda: minter.mint(ROOM, IDENTITY, "Anonymous", METADATA),
+            iterations,
+        ),
+    ]
+
+    # Count tokens on a fresh room, with a limit that is never reached
+    room = f"benchmark-{uuid4()!s}"
+    user = AnonymousUser()
+    with override_settings(LIVEKIT_TOKEN_RATE_LIMIT=iterations + 1):
+        results.append(
+            measure(
+                "generate_token (rate limited)",
+                lambda: utils.generate_token(room=room, user=user),
+                iterations,
+            )
+        )
+
+    return results
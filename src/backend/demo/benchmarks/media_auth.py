@@ -0,0 +1,43 @@
+"""Benchmark media-auth subrequests, with and without the decision cache."""
+
+from django.test import override_settings
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core import factories, models
+from core.api.viewsets import RecordingViewSet
+
+from . import measure, rollback
+
+
+def run(iterations):
+    """Measure media-auth subrequests per second before and after caching."""
+    view = RecordingViewSet.as_view({"get": "media_auth"})
+    request_factory = APIRequestFactory()
+    results = []
+
+    with rollback():
+        user = factories.UserFactory()
+        recording = factories.RecordingFactory(
+            status=models.RecordingStatusChoices.SAVED
+        )
+        factories.UserRecordingAccessFactory(
+            user=user, recording=recording, role=models.RoleChoices.OWNER
+        )
+
+        def subrequest():
+            request = request_factory.get(
+                "/api/v1.0/recordings/media-auth/",
+                HTTP_X_ORIGINAL_URL=f"http://localhost/media/{recording.key:s}",
+            )
+            force_authenticate(request, user=user)
+            response = view(request)
+            assert response.status_code == 200  # noqa: S101
+
+        with override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=0):
+            results.append(measure("media-auth (no cache)", subrequest, iterations))
+
+        with override_settings(RECORDING_MEDIA_AUTH_CACHE_TIMEOUT=60):
+            results.append(measure("media-auth (cached)", subrequest, iterations))
+
+    return results
@@ -0,0 +1,38 @@
+"""Benchmark S3 authorization headers signing, botocore versus the dedicated signer."""
+
+from django.core.files.storage import default_storage
+
+import botocore
+
+from core import utils
+
+from . import measure
+
+KEY = "recordings/3f8e1ab5-3b1c-4a5e-9b2a-4d3f0c6b7e21.mp4"
+
+
+def sign_with_botocore():
+    """Sign a GET-object request through a presigned url and botocore's S3SigV4Auth."""
+    url = default_storage.unsigned_connection.meta.client.generate_presigned_url(
+        "get_object",
+        ExpiresIn=0,
+        Params={"Bucket": default_storage.bucket_name, "Key": KEY},
+    )
+    request = botocore.awsrequest.AWSRequest(method="get", url=url)
+    s3_client = default_storage.connection.meta.client
+    # pylint: disable=protected-access
+    credentials = s3_client._request_signer._credentials  # noqa: SLF001
+    auth = botocore.auth.S3SigV4Auth(
+        credentials.get_frozen_credentials(), "s3", s3_client.meta.region_name
+    )
+    auth.add_auth(request)
+    return request.headers
+
+
+def run(iterations):
+    """Measure signatures per second with botocore and with the dedicated signer."""
+    signer = utils.get_s3_signer()
+    return [
+        measure("botocore S3SigV4Auth", sign_with_botocore, iterations),
+        measure("S3SigV4Signer", lambda: signer.sign(KEY), iterations),
+    ]
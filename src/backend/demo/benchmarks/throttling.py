@@ -0,0 +1,71 @@
+"""Benchmark throttling anonymous requests, DRF's throttle versus the GCRA throttle."""
+
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+
+from rest_framework import throttling
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.api.throttling import GCRAAnonRateThrottle
+
+from . import measure
+
+# Rates of the room entry and creation callback endpoints, per minute
+RATES = [150, 600]
+
+
+def _throttle(base, num_requests, prefix):
+    """Return a function checking requests of a client polling at the given rate.
+
+    Requests are timed one emission interval apart, so that once the first period
+    elapsed, the window of the client always holds as many requests as the rate.
+    """
+    clock = SimpleNamespace(now=time.time())
+
+    class BenchmarkThrottle(base):
+        """Throttle of the benchmarked class, at the given rate."""
+
+        rate = f"{num_requests:d}/minute"
+        cache_format = f"{prefix:s}_%(ident)s"
+
+        @staticmethod
+        def timer():
+            """Return the time of the next request, one interval after the last."""
+            clock.now += 60 / num_requests
+            return clock.now
+
+    request = Request(APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1"))
+    request.user = AnonymousUser()
+    view = SimpleNamespace(kwargs={}, lookup_url_kwarg=None, lookup_field="pk")
+
+    def allow_request():
+        BenchmarkThrottle().allow_request(request, view)
+
+    return allow_request
+
+
+def run(iterations):
+    """Measure requests checked per second, with the window of the client full."""
+    results = []
+    for num_requests in RATES:
+        for label, base in [
+            ("DRF AnonRateThrottle", throttling.AnonRateThrottle),
+            ("GCRAAnonRateThrottle", GCRAAnonRateThrottle),
+        ]:
+            prefix = f"benchmark-throttle-{uuid4()!s}"
+            allow_request = _throttle(base, num_requests, prefix)
+            for _ in range(num_requests):
+                allow_request()
+            results.append(
+                measure(
+                    f"{label:s} ({num_requests:d}/minute)", allow_request, iterations
+                )
+            )
+            cache.delete_pattern(f"{prefix:s}_*")
+
+    return results
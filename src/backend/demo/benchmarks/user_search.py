@@ -0,0 +1,143 @@
+"""Benchmark searching users by email or full name on a large users table."""
+
+from django.db import connection
+
+from core import models
+from core.api.viewsets import UserViewSet
+
+from . import measure, rollback
+
+USERS_COUNT = 1_000_000
+
+FIRST_NAMES = [
+    "alice",
+    "bruno",
+    "chloe",
+    "david",
+    "emma",
+    "frank",
+    "hugo",
+    "ines",
+    "jules",
+    "lea",
+    "louis",
+    "manon",
+    "nicole",
+    "paul",
+    "sarah",
+    "victor",
+]
+LAST_NAMES = [
+    "bernard",
+    "bowman",
+    "dubois",
+    "durand",
+    "floyd",
+    "garcia",
+    "lefebvre",
+    "martin",
+    "moreau",
+    "petit",
+    "poole",
+    "richard",
+    "robert",
+    "simon",
+    "thomas",
+    "weber",
+]
+
+QUERIES = {
+    "prefix": "da",
+    "trigram, common": "bowman",
+    "trigram, rare": "david.bowman4242",
+}
+
+# Searches scanning the whole table are slow, only measure a few of them
+UNINDEXED_MAX_ITERATIONS = 5
+
+
+def _seed_users():
+    """
+    Insert users with names combined from a few first and last names. Search indexes
+    are built after inserting users, which is much faster than maintaining them.
+    """
+    search_indexes = [
+        index
+        for index in models.User._meta.indexes  # noqa: SLF001  # pylint: disable=protected-access
+        if index.name.startswith("user_")
+    ]
+    with connection.schema_editor() as schema_editor:
+        for index in search_indexes:
+            schema_editor.remove_index(models.User, index)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO meet_user (
+                id, created_at, updated_at, password, is_superuser, sub, email,
+                language, timezone, is_device, is_staff, is_active, full_name
+            )
+            SELECT gen_random_uuid(), now(), now(), '!', false, 'sub-' || i,
+                first_name || '.' || last_name || i || '@example.com',
+                'en-us', 'UTC', false, false, true,
+                initcap(first_name) || ' ' || initcap(last_name)
+            FROM (
+                SELECT i,
+                    (%(first_names)s::text[])[1 + i %% %(first_count)s] AS first_name,
+                    (%(last_names)s::text[])[1 + i / %(first_count)s %% %(last_count)s]
+                        AS last_name
+                FROM generate_series(1, %(count)s) AS i
+            ) AS names
+            """,
+            {
+                "first_names": FIRST_NAMES,
+                "first_count": len(FIRST_NAMES),
+                "last_names": LAST_NAMES,
+                "last_count": len(LAST_NAMES),
+                "count": USERS_COUNT,
+            },
+        )
+
+    with connection.schema_editor() as schema_editor:
+        for index in search_indexes:
+            schema_editor.add_index(models.User, index)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE meet_user")
+
+
+def _search(query):
+    """Return a function running a search the way the users endpoint does."""
+
+    def search():
+        list(UserViewSet._search(models.User.objects.all(), query))  # noqa: SLF001  # pylint: disable=protected-access
+
+    return search
+
+
+def run(iterations):
+    """Measure indexed searches, and the same searches scanning the whole table."""
+    results = []
+
+    with rollback():
+        _seed_users()
+
+        for label, query in QUERIES.items():
+            results.append(
+                measure(f"user search ({label:s})", _search(query), iterations)
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+        for label, query in QUERIES.items():
+            results.append(
+                measure(
+                    f"user search ({label:s}, unindexed)",
+                    _search(query),
+                    min(iterations, UNINDEXED_MAX_ITERATIONS),
+                )
+            )
+
+    return results
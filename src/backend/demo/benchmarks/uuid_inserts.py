@@ -0,0 +1,67 @@
+"""Benchmark inserts in a table keyed by random or time-ordered UUIDs."""
+
+import uuid
+
+from django.db import connection
+
+from core.models import uuid7
+
+from . import measure, rollback
+
+# Number of rows inserted by each measured operation
+BATCH_SIZE = 1000
+
+
+def _index_size(table):
+    """Return the size in megabytes of the primary key index of a table."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_relation_size(%s)", [f"{table:s}_pkey"])
+        return cursor.fetchone()[0] / 1024**2
+
+
+def _benchmark(label, table, generate_id, iterations):
+    """Measure batches of inserts in a fresh table, and report its index size."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {table:s} "
+            "(id uuid PRIMARY KEY, created_at timestamptz NOT NULL DEFAULT now())"
+        )
+
+        def insert_batch():
+            cursor.execute(
+                f"INSERT INTO {table:s} (id) SELECT unnest(%s::uuid[])",
+                [[generate_id() for _ in range(BATCH_SIZE)]],
+            )
+
+        result = measure(label, insert_batch, iterations)
+
+    result.details = (
+        f"{(iterations + 1) * BATCH_SIZE:,d} rows, "
+        f"primary key index {_index_size(table):,.1f} MB"
+    )
+    return result
+
+
+def run(iterations):
+    """Measure batches of inserts keyed by UUIDv4 and by UUIDv7."""
+    results = []
+
+    with rollback():
+        results.append(
+            _benchmark(
+                f"uuid4 inserts ({BATCH_SIZE:d} rows/op)",
+                "benchmark_uuid4",
+                uuid.uuid4,
+                iterations,
+            )
+        )
+        results.append(
+            _benchmark(
+                f"uuid7 inserts ({BATCH_SIZE:d} rows/op)",
+                "benchmark_uuid7",
+                uuid7,
+                iterations,
+            )
+        )
+
+    return results
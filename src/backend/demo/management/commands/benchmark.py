@@ -0,0 +1,68 @@
+"""benchmark management command"""
+
+import pkgutil
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from demo import benchmarks
+
+
+def get_benchmark_names():
+    """List the benchmarks available in the `demo.benchmarks` package."""
+    return sorted(module.name for module in pkgutil.iter_modules(benchmarks.__path__))
+
+
+class Command(BaseCommand):
+    """A management command to measure the throughput of hot code paths."""
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        """Add arguments to select benchmarks and the number of iterations."""
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Benchmarks to run, all of them if omitted.",
+        )
+        parser.add_argument(
+            "-n",
+            "--iterations",
+            type=int,
+            default=1000,
+            help="Number of iterations for each measure.",
+        )
+        parser.add_argument(
+            "-f",
+            "--force",
+            action="store_true",
+            default=False,
+            help="Force command execution despite DEBUG is set to False",
+        )
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                (
+                    "This command is not meant to be used in production environment "
+                    "except you know what you are doing, if so use --force parameter"
+                )
+            )
+
+        available_names = get_benchmark_names()
+        names = options["names"] or available_names
+
+        for name in names:
+            if name not in available_names:
+                raise CommandError(
+                    f"Unknown benchmark {name:s}, "
+                    f"choose among: {', '.join(available_names):s}"
+                )
+
+        for name in names:
+            module = import_module(f"{benchmarks.__name__:s}.{name:s}")
+            self.stdout.write(f"[{name:s}]")
+            for result in module.run(options["iterations"]):
+                self.stdout.write(f"  {result!s}")
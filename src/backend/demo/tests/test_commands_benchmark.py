@@ -0,0 +1,105 @@
+"""Test the `benchmark` management command"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+import pytest
+
+from core import models
+
+pytestmark = pytest.mark.django_db
+
+
+def test_commands_benchmark_not_debug():
+    """The benchmark command should require forcing execution when DEBUG is off."""
+    with pytest.raises(CommandError, match="--force parameter"):
+        call_command("benchmark", "media_auth")
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_unknown():
+    """Running an unknown benchmark should fail and list the available ones."""
+    with pytest.raises(CommandError, match="choose among: .*media_auth"):
+        call_command("benchmark", "unknown")
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_media_auth():
+    """The media_auth benchmark should report throughput and leave no data behind."""
+    output = StringIO()
+    call_command("benchmark", "media_auth", iterations=2, stdout=output)
+
+    assert "media-auth (no cache): " in output.getvalue()
+    assert "media-auth (cached): " in output.getvalue()
+    assert models.Recording.objects.exists() is False
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_s3_signer():
+    """The s3_signer benchmark should compare botocore with the dedicated signer."""
+    output = StringIO()
+    call_command("benchmark", "s3_signer", iterations=2, stdout=output)
+
+    assert "botocore S3SigV4Auth: " in output.getvalue()
+    assert "S3SigV4Signer: " in output.getvalue()
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_livekit_token():
+    """The livekit_token benchmark should compare livekit with the token minter."""
+    output = StringIO()
+    call_command("benchmark", "livekit_token", iterations=2, stdout=output)
+
+    assert "livekit AccessToken: " in output.getvalue()
+    assert "LiveKitTokenMinter: " in output.getvalue()
+    assert "generate_token (rate limited): " in output.getvalue()
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_uuid_inserts():
+    """The uuid_inserts benchmark should compare random and time-ordered keys."""
+    output = StringIO()
+    call_command("benchmark", "uuid_inserts", iterations=2, stdout=output)
+
+    assert "uuid4 inserts (1000 rows/op): " in output.getvalue()
+    assert "uuid7 inserts (1000 rows/op): " in output.getvalue()
+    assert "3,000 rows, primary key index" in output.getvalue()
+
+
+@override_settings(DEBUG=True)
+@mock.patch("demo.benchmarks.user_search.USERS_COUNT", 100)
+def test_commands_benchmark_user_search():
+    """The user_search benchmark should compare indexed and unindexed searches."""
+    output = StringIO()
+    call_command("benchmark", "user_search", iterations=2, stdout=output)
+
+    assert "user search (prefix): " in output.getvalue()
+    assert "user search (trigram, common): " in output.getvalue()
+    assert "user search (trigram, rare, unindexed): " in output.getvalue()
+    assert models.User.objects.exists() is False
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_email_templates():
+    """The email_templates benchmark should compare Django and compiled templates."""
+    output = StringIO()
+    call_command("benchmark", "email_templates", iterations=2, stdout=output)
+
+    assert "notification emails (render_to_string): " in output.getvalue()
+    assert "notification emails (compiled): " in output.getvalue()
+    assert " renders/s" in output.getvalue()
+
+
+@override_settings(DEBUG=True)
+def test_commands_benchmark_throttling():
+    """The throttling benchmark should compare DRF's throttle with the GCRA one."""
+    output = StringIO()
+    call_command("benchmark", "throttling", iterations=2, stdout=output)
+
+    assert "DRF AnonRateThrottle (150/minute): " in output.getvalue()
+    assert "GCRAAnonRateThrottle (600/minute): " in output.getvalue()
+    assert not cache.keys("benchmark-throttle-*")
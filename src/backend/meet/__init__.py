@@ -0,0 +1,6 @@
+"""Meet project package."""
+
+# Load the celery app when Django starts, so that shared tasks use it
+from .celery_app import app as celery_app
+
+__all__ = ("celery_app",)
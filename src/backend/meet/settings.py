@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
 import json
+import uuid
 from os import path
 from socket import gethostbyname, gethostname
 
@@ -79,6 +80,10 @@ class Base(Configuration):
     ALLOW_UNSECURE_USER_LISTING = values.BooleanValue(
         False, environ_name="ALLOW_UNSECURE_USER_LISTING", environ_prefix=None
     )
+    # Maximum number of users returned by a search on the users endpoint
+    USER_SEARCH_MAX_RESULTS = values.PositiveIntegerValue(
+        50, environ_name="USER_SEARCH_MAX_RESULTS", environ_prefix=None
+    )
 
     # Application definition
     ROOT_URLCONF = "meet.urls"
@@ -198,6 +203,7 @@ class Base(Configuration):
     ]
 
     MIDDLEWARE = [
+        "core.middleware.ServerTimingMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "whitenoise.middleware.WhiteNoiseMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
@@ -252,9 +258,28 @@ class Base(Configuration):
             ),
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "REDIS_CLIENT_CLASS": "core.instrumentation.TimedRedis",
             },
         },
     }
+    # Duration in seconds hot keys of the cache are kept in each process, dropped
+    # from all processes when changed. Set to 0 to disable
+    LOCAL_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        30, environ_name="LOCAL_CACHE_TIMEOUT", environ_prefix=None
+    )
+    LOCAL_CACHE_MAX_ENTRIES = values.PositiveIntegerValue(
+        1000, environ_name="LOCAL_CACHE_MAX_ENTRIES", environ_prefix=None
+    )
+
+    # Share of requests, from 0 to 1, for which the time spent in the database, the
+    # cache, LiveKit and S3 signatures is logged. Set to 0 to disable
+    SERVER_TIMING_SAMPLE_RATE = values.FloatValue(
+        0, environ_name="SERVER_TIMING_SAMPLE_RATE", environ_prefix=None
+    )
+    # Return timings in the Server-Timing header to all clients, not only to staff
+    SERVER_TIMING_HEADER = values.BooleanValue(
+        False, environ_name="SERVER_TIMING_HEADER", environ_prefix=None
+    )
 
     REST_FRAMEWORK = {
         "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -286,6 +311,10 @@ class Base(Configuration):
             ),
         },
     }
+    # Throttle room entry requests per room and client, instead of per client only
+    REQUEST_ENTRY_THROTTLE_PER_ROOM = values.BooleanValue(
+        False, environ_name="REQUEST_ENTRY_THROTTLE_PER_ROOM", environ_prefix=None
+    )
 
     SPECTACULAR_SETTINGS = {
         "TITLE": "Meet API",
@@ -338,6 +367,11 @@ class Base(Configuration):
             None, environ_name="FRONTEND_MANIFEST_LINK", environ_prefix=None
         ),
     }
+    # Duration in seconds for which browsers and CDNs may cache the configuration
+    # before revalidating it
+    FRONTEND_CONFIGURATION_MAX_AGE = values.PositiveIntegerValue(
+        60, environ_name="FRONTEND_CONFIGURATION_MAX_AGE", environ_prefix=None
+    )
 
     # Mail
     EMAIL_BACKEND = values.Value("django.core.mail.backends.smtp.EmailBackend")
@@ -353,6 +387,9 @@ class Base(Configuration):
     EMAIL_LOGO_IMG = values.Value(None)
     EMAIL_DOMAIN = values.Value(None)
     EMAIL_APP_BASE_URL = values.Value(None)
+    # Emails are sent by a Celery worker, retrying with an exponential backoff
+    EMAIL_RETRY_DELAY = values.PositiveIntegerValue(30)
+    EMAIL_MAX_RETRIES = values.PositiveIntegerValue(5)
 
     AUTH_USER_MODEL = "core.User"
 
@@ -374,6 +411,18 @@ class Base(Configuration):
     # Celery
     CELERY_BROKER_URL = values.Value("redis://redis:6379/0")
     CELERY_BROKER_TRANSPORT_OPTIONS = values.DictValue({})
+    # Periodic tasks run by `celery beat`: syncs of marketing contacts left in the
+    # queue, e.g. while Brevo was down, and purges if RECORDING_EXPIRATION_DAYS is set
+    CELERY_BEAT_SCHEDULE = {
+        "sync-marketing-contacts": {
+            "task": "core.tasks.sync_marketing_contacts",
+            "schedule": 60 * 60,
+        },
+        "purge-expired-recordings": {
+            "task": "core.tasks.purge_expired_recordings",
+            "schedule": 24 * 60 * 60,
+        },
+    }
 
     # Session
     SESSION_ENGINE = "django.contrib.sessions.backends.cache"
@@ -503,12 +552,25 @@ class Base(Configuration):
     LIVEKIT_VERIFY_SSL = values.BooleanValue(
         True, environ_name="LIVEKIT_VERIFY_SSL", environ_prefix=None
     )
+    # Maximum number of LiveKit access tokens issued per room and time window in
+    # seconds, shared by all processes. Set the limit to 0 to disable it
+    LIVEKIT_TOKEN_RATE_LIMIT = values.PositiveIntegerValue(
+        1000, environ_name="LIVEKIT_TOKEN_RATE_LIMIT", environ_prefix=None
+    )
+    LIVEKIT_TOKEN_RATE_LIMIT_WINDOW = values.PositiveIntegerValue(
+        60, environ_name="LIVEKIT_TOKEN_RATE_LIMIT_WINDOW", environ_prefix=None
+    )
     RESOURCE_DEFAULT_ACCESS_LEVEL = values.Value(
         "public", environ_name="RESOURCE_DEFAULT_ACCESS_LEVEL", environ_prefix=None
     )
     ALLOW_UNREGISTERED_ROOMS = values.BooleanValue(
         True, environ_name="ALLOW_UNREGISTERED_ROOMS", environ_prefix=None
     )
+    # Cache timeout in seconds of slugs known not to match any room, invalidated when
+    # a room is saved with the slug. Set to 0 to disable caching
+    UNREGISTERED_ROOMS_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        60, environ_name="UNREGISTERED_ROOMS_CACHE_TIMEOUT", environ_prefix=None
+    )
 
     # Recording settings
     RECORDING_ENABLE = values.BooleanValue(
@@ -549,6 +611,12 @@ class Base(Configuration):
     RECORDING_MAX_DURATION = values.IntegerValue(
         None, environ_name="RECORDING_MAX_DURATION", environ_prefix=None
     )
+    # Cache timeout in seconds of authorized media-auth subrequests and their signed
+    # headers - must stay well below the 15 minutes S3 accepts for a signature date.
+    # Set to 0 to disable caching
+    RECORDING_MEDIA_AUTH_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        60, environ_name="RECORDING_MEDIA_AUTH_CACHE_TIMEOUT", environ_prefix=None
+    )
     SUMMARY_SERVICE_ENDPOINT = values.Value(
         None, environ_name="SUMMARY_SERVICE_ENDPOINT", environ_prefix=None
     )
@@ -559,6 +627,21 @@ class Base(Configuration):
         None, environ_name="SCREEN_RECORDING_BASE_URL", environ_prefix=None
     )
 
+    # Teams settings
+    TEAM_PROVIDER_CLASS = values.Value(
+        "core.services.teams.NoTeamProvider",
+        environ_name="TEAM_PROVIDER_CLASS",
+        environ_prefix=None,
+    )
+    TEAM_PROVIDER_STATIC_TEAMS = values.DictValue(
+        {}, environ_name="TEAM_PROVIDER_STATIC_TEAMS", environ_prefix=None
+    )
+    # Cache timeout in seconds of the teams of users, for remote team providers.
+    # Set to 0 to disable caching
+    TEAMS_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        300, environ_name="TEAMS_CACHE_TIMEOUT", environ_prefix=None
+    )
+
     # Marketing and communication settings
     SIGNUP_NEW_USER_TO_MARKETING_EMAIL = values.BooleanValue(
         False,  # When enabled, new users are automatically added to mailing list.
@@ -583,6 +666,21 @@ class Base(Configuration):
     BREVO_API_TIMEOUT = values.PositiveIntegerValue(
         1, environ_name="BREVO_API_TIMEOUT", environ_prefix=None
     )
+    # Bulk imports of contacts take longer than single contact calls
+    BREVO_IMPORT_TIMEOUT = values.PositiveIntegerValue(
+        30, environ_name="BREVO_IMPORT_TIMEOUT", environ_prefix=None
+    )
+    # Contacts are synced by batches, at most once per delay, also the base delay
+    # of retries on failures
+    MARKETING_SYNC_DELAY = values.PositiveIntegerValue(
+        60, environ_name="MARKETING_SYNC_DELAY", environ_prefix=None
+    )
+    MARKETING_SYNC_BATCH_SIZE = values.PositiveIntegerValue(
+        500, environ_name="MARKETING_SYNC_BATCH_SIZE", environ_prefix=None
+    )
+    MARKETING_SYNC_MAX_RETRIES = values.PositiveIntegerValue(
+        5, environ_name="MARKETING_SYNC_MAX_RETRIES", environ_prefix=None
+    )
 
     # Lobby configurations
     LOBBY_KEY_PREFIX = values.Value(
@@ -616,6 +714,12 @@ class Base(Configuration):
         environ_name="ROOM_CREATION_CALLBACK_CACHE_TIMEOUT",
         environ_prefix=None,
     )
+    # Maximum duration in seconds a creation callback request may wait for the room
+    ROOM_CREATION_CALLBACK_MAX_WAIT = values.PositiveIntegerValue(
+        5,
+        environ_name="ROOM_CREATION_CALLBACK_MAX_WAIT",
+        environ_prefix=None,
+    )
 
     # SIP Telephony
     ROOM_TELEPHONY_ENABLED = values.BooleanValue(
@@ -765,6 +869,14 @@ class Test(Base):
 
     CELERY_TASK_ALWAYS_EAGER = values.BooleanValue(True)
 
+    # Redis is shared by tests running in parallel: each process gets its own keys
+    CACHES = {
+        "default": {
+            **Base.CACHES["default"],
+            "KEY_PREFIX": f"test-{uuid.uuid4()!s}",
+        },
+    }
+
     def __init__(self):
         # pylint: disable=invalid-name
         self.INSTALLED_APPS += ["drf_spectacular_sidecar"]
@@ -833,6 +945,7 @@ class Production(Base):
             ),
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "REDIS_CLIENT_CLASS": "core.instrumentation.TimedRedis",
             },
         },
     }